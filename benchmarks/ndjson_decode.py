@@ -0,0 +1,78 @@
+"""
+NDJSON decoding of an Ollama generation: NDJSONDecoder vs. the old approaches
+
+Run from the repository root:
+
+    python -m benchmarks.ndjson_decode [--tokens 20000] [--chunk-bytes 1024]
+
+"buffered split" is the old JSONDecodeError fallback (wait for the whole
+body, then split the text and parse each line); "string re-split" is the
+naive incremental version that appends each chunk to a str and re-splits
+the pending tail, which turns quadratic on long lines such as the final
+record's context array. All are timed over the same chunked byte stream;
+only the incremental decoders can hand records on before the body ends.
+"""
+from __future__ import annotations
+import argparse
+import json
+import timeit
+from typing import Any, List
+
+from src.ai.llm_ndjson import NDJSONDecoder
+
+
+def make_chunks(tokens: int, chunk_bytes: int, context: int) -> List[bytes]:
+    lines = [json.dumps({"model": "llama3.1:latest", "created_at": "2024-01-01T00:00:00Z",
+                         "response": f" token{i}", "done": False}) for i in range(tokens)]
+    lines.append(json.dumps({"done": True, "eval_count": tokens,
+                             "context": list(range(100_000, 100_000 + context))}))
+    body = ("\n".join(lines) + "\n").encode()
+    return [body[i:i + chunk_bytes] for i in range(0, len(body), chunk_bytes)]
+
+
+def buffered_split(chunks: List[bytes]) -> List[Any]:
+    text = b"".join(chunks).decode()
+    return [json.loads(line) for line in text.strip().split("\n") if line]
+
+
+def string_resplit(chunks: List[bytes]) -> List[Any]:
+    pending = ""
+    records = []
+    for chunk in chunks:
+        pending += chunk.decode("utf-8", errors="strict")
+        *complete, pending = pending.split("\n")
+        records.extend(json.loads(line) for line in complete if line)
+    if pending:
+        records.append(json.loads(pending))
+    return records
+
+
+def ndjson_decoder(chunks: List[bytes]) -> List[Any]:
+    decoder = NDJSONDecoder()
+    records = []
+    for chunk in chunks:
+        records.extend(decoder.feed(chunk))
+    return records + decoder.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tokens", type=int, default=20000, help="streamed records per response")
+    parser.add_argument("--chunk-bytes", type=int, default=1024, help="bytes per network read")
+    parser.add_argument("--context", type=int, default=32768,
+                        help="length of the final record's context array (one long line)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    chunks = make_chunks(args.tokens, args.chunk_bytes, args.context)
+    expected = buffered_split(chunks)
+    print(f"{sum(map(len, chunks)) / 1e6:.1f} MB in {len(chunks)} chunks, {len(expected)} records")
+    for name, decode in (("buffered split", buffered_split), ("string re-split", string_resplit),
+                         ("NDJSONDecoder", ndjson_decoder)):
+        assert decode(chunks) == expected
+        best = min(timeit.repeat(lambda: decode(chunks), number=1, repeat=args.repeat))
+        print(f"{name:>16}: {best * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Prefill cost of the confirmation prompt: pre-registry layout vs. the template registry
+
+Run from the repository root:
+
+    python -m benchmarks.prompt_prefix             # offline estimate
+    python -m benchmarks.prompt_prefix --live      # against the configured LLM server
+
+Offline, the server's prompt cache is modelled as one slot that reuses the
+longest common prefix with the previous prompt (what llama.cpp and Ollama do
+for sequential requests), and tokens are counted with TokenCounter
+(LLM_TOKENIZER for exact counts). Live, prompt_eval_count/_duration come from
+the server, which only reports tokens it actually had to prefill.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import os
+import statistics
+from typing import Any, Dict, List, Tuple
+
+from src.ai.config import settings
+from src.ai.llm_prompts import get_template
+from src.ai.llm_tokens import TokenCounter
+
+_EMPTY = {
+    "business_type": None, "business_name": None, "owner_name": None, "address": None,
+    "state": None, "state_code": None, "ein": None, "email": None, "phone": None,
+    "formation_date": None, "raw_entities": [],
+}
+
+REQUESTS: List[Tuple[str, Dict[str, Any]]] = [
+    ("I want to form an LLC called Acme Widgets in Texas",
+     {"business_type": "LLC", "business_name": "Acme Widgets", "state": "Texas", "state_code": "TX",
+      "raw_entities": [{"text": "LLC", "label": "BUSINESS_TYPE"}, {"text": "Acme Widgets", "label": "ORG"},
+                       {"text": "Texas", "label": "GPE"}]}),
+    ("Register Bolt Robotics Inc in Delaware, owner Jane Smith",
+     {"business_type": "Corporation", "business_name": "Bolt Robotics Inc", "owner_name": "Jane Smith",
+      "state": "Delaware", "state_code": "DE",
+      "raw_entities": [{"text": "Bolt Robotics Inc", "label": "ORG"}, {"text": "Delaware", "label": "GPE"},
+                       {"text": "Jane Smith", "label": "PERSON"}]}),
+    ("Can you help me start a nonprofit?",
+     {"business_type": "Nonprofit", "raw_entities": [{"text": "nonprofit", "label": "BUSINESS_TYPE"}]}),
+    ("New sole proprietorship in Florida, email me at sam@example.com",
+     {"business_type": "Sole Proprietorship", "state": "Florida", "state_code": "FL",
+      "email": "sam@example.com",
+      "raw_entities": [{"text": "Florida", "label": "GPE"}, {"text": "sam@example.com", "label": "EMAIL"}]}),
+]
+
+
+def legacy_prompt(user_message: str, entities: Dict[str, Any]) -> str:
+    """The f-string ChatService built before the template registry"""
+    return (
+        "You are a helpful business registration assistant. "
+        "Based on the following request and extracted entities, "
+        "generate a single clear confirmation sentence starting with 'I'll help you'.\n\n"
+        f"User request: {user_message}\n"
+        f"Extracted entities: {entities}\n\n"
+        "Response (one sentence):"
+    )
+
+
+def template_prompt(user_message: str, entities: Dict[str, Any]) -> str:
+    typed = {name: value for name, value in entities.items() if name != "raw_entities"}
+    sections = get_template("confirmation").render(user_message=user_message, entities=typed)
+    return "".join(section.text for section in sections)
+
+
+def workload(rounds: int) -> List[Tuple[str, Dict[str, Any]]]:
+    return [(message, {**_EMPTY, **found}) for _ in range(rounds) for message, found in REQUESTS]
+
+
+def estimate(layout, counter: TokenCounter, rounds: int) -> Dict[str, float]:
+    """Prompt and prefilled tokens per request with a single-slot prefix cache"""
+    previous = ""
+    prompt_tokens, prefilled = [], []
+    for message, entities in workload(rounds):
+        prompt = layout(message, entities)
+        shared = os.path.commonprefix([previous, prompt])
+        prompt_tokens.append(counter.count(prompt))
+        prefilled.append(prompt_tokens[-1] - counter.count(shared))
+        previous = prompt
+    return {"prompt_tokens": statistics.mean(prompt_tokens), "prefilled_tokens": statistics.mean(prefilled)}
+
+
+async def measure(layout, rounds: int) -> Dict[str, float]:
+    """Server-reported prefill per request; layouts run one after the other so they don't evict each other"""
+    from src.ai.llm_service import LLMService
+
+    llm = LLMService(cache=None)
+    prefilled, seconds = [], []
+    try:
+        for message, entities in workload(rounds):
+            response = await llm._generate(layout(message, entities), profile="confirmation",
+                                           use_cache=False)
+            prefilled.append(response.stats.get("prompt_eval_count", 0))
+            seconds.append(response.stats.get("prompt_eval_duration", 0) / 1e9)
+    finally:
+        await llm.aclose()
+    return {"prefilled_tokens": statistics.mean(prefilled), "prefill_ms": statistics.mean(seconds) * 1000}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=5, help="passes over the sample requests")
+    parser.add_argument("--live", action="store_true", help="measure against the configured server")
+    parser.add_argument("--prefill-tokens-per-second", type=float, default=400.0,
+                        help="offline: prefill rate used to turn tokens into time")
+    args = parser.parse_args()
+
+    layouts = {"legacy f-string": legacy_prompt, f"{get_template('confirmation').id}": template_prompt}
+    results = {}
+    for name, layout in layouts.items():
+        if args.live:
+            results[name] = asyncio.run(measure(layout, args.rounds))
+        else:
+            counter = TokenCounter(settings.LLM_TOKENIZER)
+            results[name] = estimate(layout, counter, args.rounds)
+            results[name]["prefill_ms"] = (results[name]["prefilled_tokens"]
+                                           / args.prefill_tokens_per_second * 1000)
+
+    for name, row in results.items():
+        print(f"{name:>24}: " + ", ".join(f"{k}={v:.1f}" for k, v in row.items()))
+    before, after = (row["prefill_ms"] for row in results.values())
+    if before:
+        print(f"prefill time saved per request: {before - after:.1f} ms ({(1 - after / before) * 100:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
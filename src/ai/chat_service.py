@@ -2,7 +2,12 @@ from __future__ import annotations
 from typing import Dict, Any, Optional
 
 from .config import settings
+from .confirmation_cache import ConfirmationCache
+from .llm_deadlines import llm_deadline
+from .llm_errors import LLMOverloadedError, LLMTimeoutError
+from .llm_predicates import SentenceBoundary
 from .llm_service import LLMService
+from .llm_prompts import get_template
 from .nlu_service import NLUService
 from .state_filing_service import StateFilingService
 
@@ -12,21 +17,61 @@ class ChatService:
     def __init__(self, llm: Optional[LLMService] = None, nlu: Optional[NLUService] = None):
         self.llm = llm or LLMService()
         self.nlu = nlu or NLUService()
+        self.prompt = get_template("confirmation")
+        self.confirmations: Optional[ConfirmationCache] = None
+        if settings.CONFIRMATION_CACHE_ENABLED:
+            self.confirmations = ConfirmationCache(
+                variants=settings.CONFIRMATION_CACHE_VARIANTS,
+                max_uses=settings.CONFIRMATION_CACHE_MAX_USES,
+                ttl_seconds=settings.CONFIRMATION_CACHE_TTL_SECONDS,
+                max_signatures=settings.CONFIRMATION_CACHE_MAX_SIGNATURES,
+            )
 
-    async def process_registration_request(self, user_message: str) -> Dict[str, Any]:
+    async def aclose(self) -> None:
+        """Release the LLM connection pool on shutdown"""
+        await self.llm.aclose()
+
+    async def process_registration_request(self, user_message: str,
+                                           conversation_id: Optional[str] = None) -> Dict[str, Any]:
         """Process user message and return structured response"""
         entities = await self.nlu.extract_entities(user_message)
         
-        prompt = (
-            "You are a helpful business registration assistant. "
-            "Based on the following request and extracted entities, "
-            "generate a single clear confirmation sentence starting with 'I'll help you'.\n\n"
-            f"User request: {user_message}\n"
-            f"Extracted entities: {entities}\n\n"
-            "Response (one sentence):"
-        )
+        # Instructions first and unchanged across requests, so the server
+        # can reuse the prefix it has already prefilled. The raw spaCy spans
+        # repeat the typed fields and are left out.
+        typed = {name: value for name, value in entities.items() if name != "raw_entities"}
+        prompt = self.prompt.render(user_message=user_message, entities=typed)
         
-        confirmation = await self.llm.generate(prompt)
+        llm_degraded = False
+        with llm_deadline(settings.CHAT_DEADLINE_SECONDS):
+            try:
+                cached = None
+                if conversation_id is None and self.confirmations is not None:
+                    # Same business type and state as earlier requests: reuse one of their sentences
+                    cached = self.confirmations.get(entities)
+                if cached is not None:
+                    confirmation = cached
+                elif conversation_id is None:
+                    # Only the first sentence is used, so stop paying for tokens after it,
+                    # and retry on the large model if a small one ignores the instructions
+                    result = await self.llm.generate_until(prompt, SentenceBoundary(),
+                                                           profile="confirmation",
+                                                           validate=self._is_confirmation)
+                    confirmation = result.text
+                    # Never hand an off-instruction reply to later requests
+                    if self.confirmations is not None and self._is_confirmation(confirmation):
+                        self.confirmations.put(entities, confirmation)
+                else:
+                    # Follow-up turns continue from Ollama's context, so the
+                    # prefix is only prefilled once per conversation
+                    conversation = self.llm.conversation(conversation_id)
+                    if conversation.has_context:
+                        prompt = self.prompt.render_suffix(user_message=user_message, entities=typed)
+                    confirmation = await conversation.generate(prompt, profile="confirmation")
+            except (LLMOverloadedError, LLMTimeoutError):
+                # LLM is saturated or missed the turn's deadline: answer from the entities
+                confirmation = self._fallback_confirmation(entities)
+                llm_degraded = True
         
         # Check if state is supported for filing
         state_code = entities.get("state_code")
@@ -50,8 +95,27 @@ class ChatService:
             "confirmation": confirmation.strip(),
             "suggested_next": suggested_next,
             "filing_available": filing_available,
-            "supported_states": StateFilingService.get_supported_states() if not filing_available else None
+            "supported_states": StateFilingService.get_supported_states() if not filing_available else None,
+            "llm_degraded": llm_degraded
         }
+
+    @staticmethod
+    def _is_confirmation(text: str) -> bool:
+        """Whether the model produced the requested "I'll help you ..." sentence"""
+        return text.strip().lower().startswith(("i'll help you", "i will help you"))
+
+    @staticmethod
+    def _fallback_confirmation(entities: Dict[str, Any]) -> str:
+        """Template confirmation used when the LLM is unavailable"""
+        business = entities.get("business_type") or "business"
+        name = entities.get("business_name")
+        state = entities.get("state")
+        sentence = f"I'll help you register your {business}"
+        if name:
+            sentence += f" {name}"
+        if state:
+            sentence += f" in {state}"
+        return sentence + "."
     
     async def file_with_state(
         self, 
@@ -1,7 +1,7 @@
 from __future__ import annotations
-from typing import Optional
+from typing import Any, Dict, List, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from pydantic import AnyHttpUrl, Field
+from pydantic import AnyHttpUrl, BaseModel, Field
 
 def _detect_device() -> str:
     try:
@@ -10,16 +10,137 @@ def _detect_device() -> str:
     except Exception:
         return "cpu"
 
+class OllamaHostConfig(BaseModel):
+    url: AnyHttpUrl
+    weight: float = 1.0
+    models: List[str] = Field(default_factory=list, description="Models served; empty means any")
+
 class Settings(BaseSettings):
     # Ollama (preferred if present)
+    LLM_BACKEND: str = Field("ollama", description="Server protocol: ollama, openai (/v1/chat/completions) or fake")
+    LLM_API_KEY: Optional[str] = Field(None, description="Bearer token for OpenAI-compatible servers")
     OLLAMA_HOST: Optional[AnyHttpUrl] = Field("http://localhost:11434", description="Ollama daemon URL")
     OLLAMA_MODEL: Optional[str] = Field("llama3.1:latest", description="Ollama model name")
+    OLLAMA_HOSTS: List[OllamaHostConfig] = Field(
+        default_factory=list,
+        description='Several Ollama daemons as JSON, e.g. [{"url": "http://gpu1:11434", "weight": 2}]; '
+                    "overrides OLLAMA_HOST when set",
+    )
+
+    # Multi-host routing
+    LLM_HOST_MAX_FAILURES: int = Field(3, description="Consecutive failures before a host is ejected")
+    LLM_HOST_EJECT_SECONDS: float = 30.0
+    LLM_STICKY_SESSIONS: int = Field(10_000, description="Conversations remembered for host affinity")
 
     # Device & generation tuning
     DEVICE: str = Field(default_factory=_detect_device, description="Runtime device: cuda or cpu")
     MAX_TOKENS: int = 2048
     TEMPERATURE: float = 0.7
-    TIMEOUT_SECONDS: int = 120
+    TIMEOUT_SECONDS: int = 120  # read/write timeout: max silence between bytes
+    LLM_PROFILES: Dict[str, Dict[str, Any]] = Field(
+        default_factory=dict,
+        description='Generation profile overrides as JSON, e.g. {"confirmation": {"num_predict": 48}}',
+    )
+
+    # Ollama HTTP connection pool
+    CONNECT_TIMEOUT_SECONDS: float = 5.0
+    POOL_TIMEOUT_SECONDS: float = 10.0  # max wait for a free pooled connection
+    OLLAMA_MAX_CONNECTIONS: int = 16
+    OLLAMA_MAX_KEEPALIVE_CONNECTIONS: int = 8
+    OLLAMA_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+
+    # Hedged requests (only with more than one host)
+    LLM_HEDGING_ENABLED: bool = False
+    LLM_HEDGE_PERCENTILE: float = Field(95.0, description="Hedge once a call is slower than this latency percentile")
+    LLM_HEDGE_BUDGET: float = Field(0.05, description="Max extra load from hedges, as a fraction of requests")
+    LLM_HEDGE_MIN_DELAY_SECONDS: float = 0.5
+
+    # Model warm-up and keep-alive
+    OLLAMA_KEEP_ALIVE: Optional[str] = Field("10m", description="keep_alive sent with each request; None uses Ollama's default")
+    LLM_COLD_START_THRESHOLD_SECONDS: float = Field(0.5, description="load_duration above which a call counts as a cold start")
+    LLM_KEEPER_ENABLED: bool = False
+    LLM_KEEPER_HOURS: str = Field("08:00-18:00", description="Window in which the model is kept loaded")
+    LLM_KEEPER_WEEKDAYS: List[int] = Field(default_factory=lambda: [0, 1, 2, 3, 4], description="0 = Monday")
+    LLM_KEEPER_TIMEZONE: Optional[str] = Field(None, description="IANA zone for the window; default server local time")
+    LLM_KEEPER_INTERVAL_SECONDS: float = 240.0
+
+    # Background health probing (cached status for health_check, routing and admission)
+    LLM_HEALTH_PROBE_ENABLED: bool = True
+    LLM_HEALTH_PROBE_INTERVAL_SECONDS: float = 5.0
+    LLM_HEALTH_PROBE_TIMEOUT_SECONDS: float = Field(2.0, description="Slower probes count as failures")
+    LLM_HEALTH_PROBE_MAX_FAILURES: int = Field(3, description="Consecutive failed probes before a host is marked down")
+
+    # Conversation context reuse (Ollama `context` arrays kept between turns)
+    LLM_CONVERSATIONS_MAX: int = 1000
+    LLM_CONVERSATIONS_MAX_BYTES: int = 64 * 1024 * 1024
+    LLM_CONVERSATION_MAX_TOKENS: int = Field(8192, description="Longer contexts restart the conversation")
+
+    # Exact-match LLM response cache
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_MAX_ENTRIES: int = 1024
+    LLM_CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+    LLM_CACHE_TTL_SECONDS: Optional[float] = 3600.0
+    LLM_CACHE_PATH: Optional[str] = Field(None, description="SQLite file for the persistent cache tier")
+    LLM_CACHE_NONDETERMINISTIC: bool = Field(False, description="Also cache calls with temperature > 0")
+
+    # Semantic response cache (opt-in per call via semantic_key; needs numpy)
+    LLM_SEMANTIC_CACHE_ENABLED: bool = False
+    OLLAMA_EMBED_MODEL: str = "nomic-embed-text"
+    LLM_SEMANTIC_CACHE_THRESHOLD: float = Field(0.95, description="Minimum cosine similarity for a hit")
+    LLM_SEMANTIC_CACHE_MAX_ENTRIES: int = 10_000
+    LLM_SEMANTIC_CACHE_ANN_THRESHOLD: int = Field(5_000, description="Index size above which LSH search is used")
+    LLM_SEMANTIC_CACHE_PATH: Optional[str] = Field(None, description="File prefix for persisting the index")
+
+    # Coalesce identical in-flight LLM requests into one Ollama generation
+    LLM_SINGLE_FLIGHT: bool = True
+
+    # Requests kept outstanding by LLMService.generate_many
+    LLM_BATCH_CONCURRENCY: int = 4
+
+    # Client-side admission control in front of Ollama
+    LLM_MAX_IN_FLIGHT: int = Field(4, description="Concurrent generations sent to Ollama")
+    LLM_MAX_QUEUE: int = Field(64, description="Requests allowed to wait per priority class; beyond this calls fail fast")
+    LLM_MAX_QUEUE_WAIT_SECONDS: Optional[float] = 30.0
+    LLM_BATCH_MAX_QUEUE_WAIT_SECONDS: Optional[float] = Field(None, description="Queue wait limit for batch work; None waits its turn however long")
+    LLM_BATCH_MAX_IN_FLIGHT: Optional[int] = Field(None, description="Slots batch work may hold while chat traffic is active (default half)")
+    LLM_BATCH_AGING_SECONDS: Optional[float] = Field(10.0, description="Queue wait after which a batch request competes with chat by arrival time")
+
+    # Prompt token budgets
+    LLM_CONTEXT_WINDOW: int = Field(8192, description="Model context (num_ctx); prompt budget is this minus num_predict")
+    LLM_TOKENIZER: Optional[str] = Field(None, description="tokenizer.json path or HF hub id for exact counts (needs tokenizers)")
+
+    # Prompt templates
+    LLM_PROMPT_VERSIONS: Dict[str, int] = Field(
+        default_factory=dict,
+        description='Pin templates to an older version as JSON, e.g. {"confirmation": 1}; default latest',
+    )
+
+    # Retries of transient failures (connection refused/reset, 5xx)
+    LLM_RETRY_ENABLED: bool = True
+    LLM_RETRY_MAX_ATTEMPTS: int = Field(3, description="Attempts per call, the first included")
+    LLM_RETRY_BASE_DELAY_SECONDS: float = 0.1
+    LLM_RETRY_MAX_DELAY_SECONDS: float = 2.0
+    LLM_RETRY_BUDGET: float = Field(0.1, description="Retries allowed per request, process-wide (token bucket)")
+
+    # Timeouts learned per profile (capped by the profile's limit, or TIMEOUT_SECONDS)
+    LLM_ADAPTIVE_TIMEOUTS: bool = True
+    LLM_TIMEOUT_PERCENTILE: float = 99.0
+    LLM_TIMEOUT_MULTIPLIER: float = Field(2.0, description="Learned timeout = percentile latency x this")
+    LLM_TIMEOUT_MIN_SECONDS: float = 5.0
+    CHAT_DEADLINE_SECONDS: Optional[float] = Field(20.0, description="Budget for the LLM part of a chat turn")
+
+    # Model tiering: routine profiles on a small model, escalating on invalid output
+    LLM_SMALL_MODEL: Optional[str] = Field(None, description="e.g. llama3.2:3b; unset sends everything to OLLAMA_MODEL")
+    LLM_SMALL_MODEL_PROFILES: List[str] = ["confirmation", "extraction_json"]
+    LLM_SMALL_MODEL_MAX_PROMPT_CHARS: int = 4000
+    LLM_SMALL_MODEL_MAX_COMPLEXITY: float = Field(0.5, description="Highest caller complexity score (0-1) for the small model")
+
+    # Confirmation templates (ChatService)
+    CONFIRMATION_CACHE_ENABLED: bool = True
+    CONFIRMATION_CACHE_VARIANTS: int = Field(3, description="Templates per (business_type, state) before reuse starts")
+    CONFIRMATION_CACHE_MAX_USES: int = Field(100, description="Renders before a template is regenerated")
+    CONFIRMATION_CACHE_TTL_SECONDS: Optional[float] = 86400.0
+    CONFIRMATION_CACHE_MAX_SIGNATURES: int = 1000
 
     # NLU / spaCy
     SPACY_MODEL: str = "en_core_web_trf"
@@ -0,0 +1,166 @@
+from __future__ import annotations
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+# Entity values that change between requests sharing a signature; they become placeholders
+TEMPLATE_FIELDS = ("business_name", "owner_name")
+
+Signature = Tuple[str, str, Tuple[str, ...]]
+
+
+@dataclass
+class _Template:
+    text: str
+    created: float = field(default_factory=time.monotonic)
+    uses: int = 0
+
+
+def signature_of(entities: Dict[str, Any]) -> Optional[Signature]:
+    """(business_type, state_code, present placeholder fields), or None if the request is not cacheable"""
+    business_type = entities.get("business_type")
+    state_code = entities.get("state_code")
+    if not business_type or not state_code:
+        return None
+    present = tuple(name for name in TEMPLATE_FIELDS if entities.get(name))
+    return str(business_type).lower(), str(state_code).upper(), present
+
+
+def _whole(value: Any) -> "re.Pattern[str]":
+    """Case-sensitive pattern for value as a whole word run, never a fragment of a longer word"""
+    return re.compile(r"(?<!\w)" + re.escape(str(value)) + r"(?!\w)")
+
+
+def templatize(text: str, entities: Dict[str, Any]) -> Optional[str]:
+    """Replace entity values in text with {field} placeholders
+
+    Returns None when the text can't be reused safely for other values: a value is missing,
+    appears more than once, or overlaps the state name or another value.
+    """
+    state = entities.get("state")
+    taken = [m.span() for m in _whole(state).finditer(text)] if state else []
+    spans = []
+    for name in TEMPLATE_FIELDS:
+        value = entities.get(name)
+        if not value:
+            continue
+        matches = list(_whole(value).finditer(text))
+        if len(matches) != 1:
+            # Missing: the sentence can't carry another request's value. Repeated: any one
+            # occurrence might be ordinary prose that happens to spell the value.
+            return None
+        start, end = matches[0].span()
+        if any(start < other_end and other_start < end for other_start, other_end in taken):
+            return None
+        taken.append((start, end))
+        spans.append((start, end, name))
+    for start, end, name in sorted(spans, reverse=True):
+        text = text[:start] + "{" + name + "}" + text[end:]
+    return text
+
+
+def render(template: str, entities: Dict[str, Any]) -> str:
+    """Substitute this request's entity values into a stored template"""
+    for name in TEMPLATE_FIELDS:
+        template = template.replace("{" + name + "}", str(entities.get(name) or ""))
+    return template
+
+
+class ConfirmationCache:
+    """Confirmation sentences stored as templates, keyed by entity signature
+
+    Each signature keeps up to ``variants`` templates and serves them round-robin once all
+    are generated, so repeat visitors don't see one fixed sentence. A template is retired
+    after ``max_uses`` renders or ``ttl_seconds``, and its slot is refilled by the LLM.
+    """
+
+    def __init__(self, variants: int = 3, max_uses: int = 100,
+                 ttl_seconds: Optional[float] = 86400.0, max_signatures: int = 1000):
+        """
+        Args:
+            variants: Templates generated per signature before the cache starts answering
+            max_uses: Renders before a template is retired
+            ttl_seconds: Template lifetime; None disables expiry
+            max_signatures: Maximum number of signatures kept (least recently used evicted)
+        """
+        self.variants = max(1, variants)
+        self.max_uses = max_uses
+        self.ttl_seconds = ttl_seconds
+        self.max_signatures = max_signatures
+        self._templates: "OrderedDict[Signature, List[_Template]]" = OrderedDict()
+        self._cursor: Dict[Signature, int] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+        self.retired = 0
+
+    def _fresh(self, template: _Template, now: float) -> bool:
+        if template.uses >= self.max_uses:
+            return False
+        return self.ttl_seconds is None or now - template.created < self.ttl_seconds
+
+    def get(self, entities: Dict[str, Any]) -> Optional[str]:
+        """Rendered confirmation for these entities, or None when the LLM should generate one"""
+        signature = signature_of(entities)
+        if signature is None:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            templates = self._templates.get(signature)
+            if templates is not None:
+                live = [t for t in templates if self._fresh(t, now)]
+                self.retired += len(templates) - len(live)
+                templates[:] = live
+                self._templates.move_to_end(signature)
+            if not templates or len(templates) < self.variants:
+                self.misses += 1
+                return None
+            index = self._cursor.get(signature, 0) % len(templates)
+            self._cursor[signature] = index + 1
+            template = templates[index]
+            template.uses += 1
+            self.hits += 1
+        return render(template.text, entities)
+
+    def put(self, entities: Dict[str, Any], confirmation: str) -> bool:
+        """Store an LLM-generated confirmation as a template; returns False if it can't be reused"""
+        signature = signature_of(entities)
+        if signature is None:
+            return False
+        template = templatize(confirmation.strip(), entities)
+        if not template:
+            return False
+        with self._lock:
+            templates = self._templates.setdefault(signature, [])
+            self._templates.move_to_end(signature)
+            if len(templates) >= self.variants:
+                return False
+            templates.append(_Template(template))
+            self.stored += 1
+            while len(self._templates) > self.max_signatures:
+                evicted, _ = self._templates.popitem(last=False)
+                self._cursor.pop(evicted, None)
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._templates.clear()
+            self._cursor.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "signatures": len(self._templates),
+                "templates": sum(len(t) for t in self._templates.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "stored": self.stored,
+                "retired": self.retired,
+            }
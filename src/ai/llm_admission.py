@@ -0,0 +1,234 @@
+from __future__ import annotations
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Optional
+
+from .llm_errors import LLMOverloadedError
+from .llm_metrics import Histogram
+
+QUEUE_DEPTH_BUCKETS = (0, 1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+# Priority classes: live chat turns vs. background jobs
+INTERACTIVE = "interactive"
+BATCH = "batch"
+PRIORITIES = (INTERACTIVE, BATCH)
+
+
+@dataclass(eq=False)
+class _Waiter:
+    future: asyncio.Future
+    priority: str
+    enqueued: float
+
+
+class _ClassStats:
+    def __init__(self):
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.promoted = 0
+        self.wait_time = Histogram()
+        self.waiters: Deque[_Waiter] = deque()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "queued": len(self.waiters),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "promoted": self.promoted,
+            "wait_seconds": self.wait_time.snapshot(),
+        }
+
+
+class AdmissionController:
+    """
+    Client-side limit on concurrent Ollama generations with bounded, prioritised wait queues
+
+    Interactive requests are always served before batch ones. While any
+    interactive request is running or waiting, batch requests may hold at
+    most `max_batch_in_flight` slots; otherwise they can use every slot. A
+    batch request that has waited `batch_aging_seconds` competes with
+    interactive requests by arrival time, so it cannot starve.
+    """
+
+    def __init__(self, max_in_flight: int, max_queue: int, max_wait_seconds: Optional[float] = None,
+                 max_batch_wait_seconds: Optional[float] = None,
+                 max_batch_in_flight: Optional[int] = None,
+                 batch_aging_seconds: Optional[float] = 10.0,
+                 is_available: Optional[Callable[[], bool]] = None):
+        """
+        Args:
+            max_in_flight: Requests allowed on the wire at once
+            max_queue: Requests allowed to wait for a slot, per priority class;
+                more are rejected immediately
+            max_wait_seconds: Longest an interactive request may wait for a slot;
+                None waits forever
+            max_batch_wait_seconds: The same for batch requests, which queue behind
+                chat by design; None (the default) waits forever
+            max_batch_in_flight: Batch slots while interactive load exists
+                (default: half of max_in_flight, at least 1)
+            batch_aging_seconds: Wait after which a batch request is promoted;
+                None disables aging
+            is_available: Cached health check; while it returns False every
+                request is rejected at once instead of waiting on a dead backend
+        """
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.max_wait_seconds = max_wait_seconds
+        self.max_batch_wait_seconds = max_batch_wait_seconds
+        if max_batch_in_flight is None:
+            max_batch_in_flight = max_in_flight // 2
+        self.max_batch_in_flight = max(1, max_batch_in_flight)
+        self.batch_aging_seconds = batch_aging_seconds
+        self.is_available = is_available
+        self.in_flight = 0
+        self.classes: Dict[str, _ClassStats] = {name: _ClassStats() for name in PRIORITIES}
+
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.unavailable = 0
+        self.wait_time = Histogram()
+        self.queue_depth = Histogram(buckets=QUEUE_DEPTH_BUCKETS)
+
+    @property
+    def queued(self) -> int:
+        return sum(len(c.waiters) for c in self.classes.values())
+
+    @asynccontextmanager
+    async def slot(self, priority: str = INTERACTIVE) -> AsyncIterator[None]:
+        """Hold one in-flight slot for the duration of the block"""
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release(priority)
+
+    def _class(self, priority: str) -> _ClassStats:
+        try:
+            return self.classes[priority]
+        except KeyError:
+            raise ValueError(f"Unknown priority {priority!r}; expected one of {PRIORITIES}") from None
+
+    def _batch_allowed(self) -> bool:
+        interactive = self.classes[INTERACTIVE]
+        if not interactive.in_flight and not interactive.waiters:
+            return True
+        return self.classes[BATCH].in_flight < self.max_batch_in_flight
+
+    def _next_waiter(self, now: float) -> Optional[_Waiter]:
+        """Waiter that should get the next free slot"""
+        interactive = self.classes[INTERACTIVE].waiters
+        batch = self.classes[BATCH].waiters
+        if batch and self._batch_allowed():
+            head = batch[0]
+            aged = (self.batch_aging_seconds is not None
+                    and now - head.enqueued >= self.batch_aging_seconds)
+            if not interactive or (aged and head.enqueued < interactive[0].enqueued):
+                return head
+        return interactive[0] if interactive else None
+
+    def _dispatch(self) -> None:
+        """Hand free slots to waiters in priority order"""
+        now = time.perf_counter()
+        while self.in_flight < self.max_in_flight:
+            waiter = self._next_waiter(now)
+            if waiter is None:
+                return
+            cls = self.classes[waiter.priority]
+            cls.waiters.popleft()
+            if waiter.future.done():
+                continue  # gave up already
+            if waiter.priority == BATCH and self.classes[INTERACTIVE].waiters:
+                cls.promoted += 1
+            self.in_flight += 1
+            cls.in_flight += 1
+            waiter.future.set_result(None)
+
+    async def acquire(self, priority: str = INTERACTIVE) -> None:
+        """
+        Wait for a slot
+
+        Raises:
+            LLMOverloadedError: If no backend is available, the class's wait
+                queue is full or the class's wait limit elapses
+            ValueError: If priority is not one of PRIORITIES
+        """
+        cls = self._class(priority)
+        if self.is_available is not None and not self.is_available():
+            self.unavailable += 1
+            raise LLMOverloadedError("LLM unavailable: no host passed its last health probe")
+        started = time.perf_counter()
+        if self.in_flight < self.max_in_flight and not cls.waiters and (
+                priority == INTERACTIVE or (not self.classes[INTERACTIVE].waiters
+                                            and self._batch_allowed())):
+            self.in_flight += 1
+            cls.in_flight += 1
+            self._admit(cls, started)
+            return
+
+        if len(cls.waiters) >= self.max_queue:
+            self.rejected += 1
+            cls.rejected += 1
+            raise LLMOverloadedError(
+                f"LLM overloaded: {self.in_flight} in flight, {len(cls.waiters)} {priority} queued"
+            )
+
+        max_wait = self.max_wait_seconds if priority == INTERACTIVE else self.max_batch_wait_seconds
+        waiter = _Waiter(asyncio.get_running_loop().create_future(), priority, started)
+        cls.waiters.append(waiter)
+        self.queue_depth.observe(self.queued)
+        try:
+            await asyncio.wait_for(waiter.future, max_wait)
+        except (asyncio.CancelledError, asyncio.TimeoutError) as e:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # A slot was handed over just as we gave up: pass it on
+                self.release(priority)
+            else:
+                try:
+                    cls.waiters.remove(waiter)
+                except ValueError:
+                    pass
+                # Leaving may lift the batch cap for others
+                self._dispatch()
+            if isinstance(e, asyncio.TimeoutError):
+                self.timed_out += 1
+                cls.timed_out += 1
+                raise LLMOverloadedError(
+                    f"LLM overloaded: no slot free after {max_wait}s"
+                ) from e
+            raise
+        self._admit(cls, started)
+
+    def release(self, priority: str = INTERACTIVE) -> None:
+        """Free the slot and give it to the next eligible waiter"""
+        self.in_flight -= 1
+        self.classes[priority].in_flight -= 1
+        self._dispatch()
+
+    def _admit(self, cls: _ClassStats, started: float) -> None:
+        waited = time.perf_counter() - started
+        self.admitted += 1
+        cls.admitted += 1
+        self.wait_time.observe(waited)
+        cls.wait_time.observe(waited)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters and histograms for monitoring, overall and per priority class"""
+        return {
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "unavailable": self.unavailable,
+            "wait_seconds": self.wait_time.snapshot(),
+            "queue_depth": self.queue_depth.snapshot(),
+            "classes": {name: cls.snapshot() for name, cls in self.classes.items()},
+        }
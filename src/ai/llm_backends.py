@@ -0,0 +1,369 @@
+from __future__ import annotations
+import asyncio
+import hashlib
+import json
+import math
+import re
+import zlib
+from abc import ABC, abstractmethod
+from contextlib import aclosing
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+from .llm_ndjson import aiter_ndjson
+
+
+@dataclass
+class LLMChunk:
+    """Incremental piece of a streamed generation"""
+    text: str
+    done: bool = False
+    stats: Optional[Dict[str, Any]] = None  # Ollama's final record (timings, counts) when done
+
+
+@dataclass
+class LLMResponse:
+    """Completed generation with Ollama's stats record (empty for cache hits)"""
+    text: str
+    stats: Dict[str, Any] = field(default_factory=dict)
+    context: Optional[List[int]] = None  # Ollama's encoded conversation, for the next turn
+
+
+def _stats_of(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Ollama's final record minus the generated text and the (large) context array"""
+    return {k: v for k, v in record.items() if k not in ("response", "context")}
+
+
+class LLMBackend(ABC):
+    """
+    Wire protocol of one kind of inference server
+
+    Requests are described by the Ollama /api/generate payload that LLMService
+    builds (model, prompt, options.num_predict/temperature/stop, context), and
+    stats come back under Ollama's field names (eval_count, done_reason,
+    *_duration in ns) so metrics and profiles work unchanged. Adapters for
+    other servers translate both ways.
+    """
+
+    name = "backend"
+
+    @abstractmethod
+    async def generate(self, client: httpx.AsyncClient, payload: Dict[str, Any]) -> LLMResponse:
+        """Whole completion for one payload"""
+
+    @abstractmethod
+    def stream(self, client: httpx.AsyncClient, payload: Dict[str, Any]) -> AsyncIterator[LLMChunk]:
+        """Completion as it is generated (an async generator); the last chunk has done=True and the stats"""
+
+    @abstractmethod
+    async def embed(self, client: httpx.AsyncClient, model: str,
+                    texts: Sequence[str]) -> List[List[float]]:
+        """One embedding per text, in input order"""
+
+    @abstractmethod
+    async def health(self, client: httpx.AsyncClient) -> bool:
+        """Whether the server answers; never raises"""
+
+    async def probe(self, client: httpx.AsyncClient) -> List[str]:
+        """Health check for the background prober: models currently loaded; raises if the server is down"""
+        if not await self.health(client):
+            raise RuntimeError("health check failed")
+        return []
+
+    async def load(self, client: httpx.AsyncClient, model: str,
+                   keep_alive: Optional[Any]) -> Dict[str, Any]:
+        """Make the server load the model; returns its stats. Servers without lazy loading do nothing"""
+        return {}
+
+
+class OllamaBackend(LLMBackend):
+    """Ollama's native /api/generate, /api/embed, /api/tags and /api/ps endpoints"""
+
+    name = "ollama"
+
+    async def _records(self, client: httpx.AsyncClient,
+                       payload: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """/api/generate response records, decoded as the bytes arrive
+
+        A non-streamed reply is a single record; a streamed one (including
+        servers that stream despite "stream": false) is NDJSON.
+        """
+        async with client.stream("POST", "/api/generate", json=payload) as response:
+            response.raise_for_status()
+            async for record in aiter_ndjson(response.aiter_bytes()):
+                if "error" in record:
+                    raise RuntimeError(f"Ollama error: {record['error']}")
+                yield record
+
+    async def generate(self, client: httpx.AsyncClient, payload: Dict[str, Any]) -> LLMResponse:
+        parts: List[str] = []
+        final: Dict[str, Any] = {}
+        try:
+            async with aclosing(self._records(client, payload)) as records:
+                async for record in records:
+                    parts.append(record.get("response", ""))
+                    if record.get("done"):
+                        final = record
+                        break
+        except RuntimeError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Ollama API call failed: {str(e)}") from e
+        return LLMResponse(text="".join(parts).strip(), stats=_stats_of(final),
+                           context=final.get("context"))
+
+    async def stream(self, client: httpx.AsyncClient,
+                     payload: Dict[str, Any]) -> AsyncIterator[LLMChunk]:
+        try:
+            async with aclosing(self._records(client, payload)) as records:
+                async for record in records:
+                    if record.get("done"):
+                        yield LLMChunk(text=record.get("response", ""), done=True,
+                                       stats=_stats_of(record))
+                        return
+                    yield LLMChunk(text=record.get("response", ""))
+        except RuntimeError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Ollama API call failed: {str(e)}") from e
+        # Connection closed before Ollama sent its final record
+        raise RuntimeError("Ollama stream ended without a final record")
+
+    async def embed(self, client: httpx.AsyncClient, model: str,
+                    texts: Sequence[str]) -> List[List[float]]:
+        try:
+            response = await client.post("/api/embed", json={"model": model, "input": list(texts)})
+            response.raise_for_status()
+            return response.json()["embeddings"]
+        except Exception as e:
+            raise RuntimeError(f"Ollama embedding call failed: {str(e)}") from e
+
+    async def health(self, client: httpx.AsyncClient) -> bool:
+        try:
+            response = await client.get("/api/tags", timeout=5)
+            response.raise_for_status()
+            return True
+        except Exception:
+            return False
+
+    async def probe(self, client: httpx.AsyncClient) -> List[str]:
+        # /api/ps is as cheap as /api/tags and also says which models are in memory
+        response = await client.get("/api/ps")
+        response.raise_for_status()
+        return [m["name"] for m in response.json().get("models", [])]
+
+    async def load(self, client: httpx.AsyncClient, model: str,
+                   keep_alive: Optional[Any]) -> Dict[str, Any]:
+        # A request without a prompt loads the model and holds it for keep_alive
+        payload: Dict[str, Any] = {"model": model, "stream": False}
+        if keep_alive is not None:
+            payload["keep_alive"] = keep_alive
+        response = await client.post("/api/generate", json=payload)
+        response.raise_for_status()
+        return response.json()
+
+
+class OpenAICompatibleBackend(LLMBackend):
+    """/v1/chat/completions servers: vLLM, llama.cpp server, LM Studio
+
+    The prompt is sent as a single user message. These servers keep no
+    Ollama-style context, so conversation turns resend nothing and start fresh.
+    """
+
+    name = "openai"
+
+    def __init__(self, api_key: Optional[str] = None):
+        self.headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+
+    @staticmethod
+    def _request(payload: Dict[str, Any], stream: bool) -> Dict[str, Any]:
+        options = payload.get("options", {})
+        body: Dict[str, Any] = {
+            "model": payload["model"],
+            "messages": [{"role": "user", "content": payload["prompt"]}],
+            "max_tokens": options.get("num_predict"),
+            "temperature": options.get("temperature"),
+            "stream": stream,
+        }
+        if options.get("stop"):
+            body["stop"] = options["stop"]
+        if stream:
+            body["stream_options"] = {"include_usage": True}
+        return body
+
+    @staticmethod
+    def _stats(finish_reason: Optional[str], usage: Optional[Dict[str, Any]],
+               timings: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """OpenAI usage (and llama.cpp timings) under Ollama's stat names"""
+        stats: Dict[str, Any] = {"done": True,
+                                 "done_reason": "length" if finish_reason == "length" else "stop"}
+        if usage:
+            stats["prompt_eval_count"] = usage.get("prompt_tokens", 0)
+            stats["eval_count"] = usage.get("completion_tokens", 0)
+        if timings:
+            stats["prompt_eval_duration"] = int(timings.get("prompt_ms", 0) * 1e6)
+            stats["eval_duration"] = int(timings.get("predicted_ms", 0) * 1e6)
+        return stats
+
+    async def generate(self, client: httpx.AsyncClient, payload: Dict[str, Any]) -> LLMResponse:
+        try:
+            response = await client.post("/v1/chat/completions", json=self._request(payload, False),
+                                         headers=self.headers)
+            response.raise_for_status()
+            data = response.json()
+            choice = data["choices"][0]
+            return LLMResponse(text=(choice["message"].get("content") or "").strip(),
+                               stats=self._stats(choice.get("finish_reason"), data.get("usage"),
+                                                 data.get("timings")))
+        except Exception as e:
+            raise RuntimeError(f"OpenAI-compatible API call failed: {str(e)}") from e
+
+    async def stream(self, client: httpx.AsyncClient,
+                     payload: Dict[str, Any]) -> AsyncIterator[LLMChunk]:
+        finish_reason: Optional[str] = None
+        usage = timings = None
+        try:
+            async with client.stream("POST", "/v1/chat/completions",
+                                     json=self._request(payload, True),
+                                     headers=self.headers) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        yield LLMChunk(text="", done=True,
+                                       stats=self._stats(finish_reason, usage, timings))
+                        return
+                    record = json.loads(data)
+                    if "error" in record:
+                        raise RuntimeError(f"OpenAI-compatible stream error: {record['error']}")
+                    usage = record.get("usage") or usage
+                    timings = record.get("timings") or timings
+                    for choice in record.get("choices") or ():
+                        finish_reason = choice.get("finish_reason") or finish_reason
+                        text = (choice.get("delta") or {}).get("content")
+                        if text:
+                            yield LLMChunk(text=text)
+        except RuntimeError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"OpenAI-compatible API call failed: {str(e)}") from e
+        raise RuntimeError("OpenAI-compatible stream ended without [DONE]")
+
+    async def embed(self, client: httpx.AsyncClient, model: str,
+                    texts: Sequence[str]) -> List[List[float]]:
+        try:
+            response = await client.post("/v1/embeddings", json={"model": model, "input": list(texts)},
+                                         headers=self.headers)
+            response.raise_for_status()
+            rows = sorted(response.json()["data"], key=lambda row: row.get("index", 0))
+            return [row["embedding"] for row in rows]
+        except Exception as e:
+            raise RuntimeError(f"OpenAI-compatible embedding call failed: {str(e)}") from e
+
+    async def health(self, client: httpx.AsyncClient) -> bool:
+        try:
+            response = await client.get("/v1/models", headers=self.headers, timeout=5)
+            response.raise_for_status()
+            return True
+        except Exception:
+            return False
+
+    async def probe(self, client: httpx.AsyncClient) -> List[str]:
+        response = await client.get("/v1/models", headers=self.headers)
+        response.raise_for_status()
+        return [m["id"] for m in response.json().get("data", [])]
+
+
+def _echo_last_line(prompt: str) -> str:
+    lines = prompt.strip().splitlines()
+    return "Echo: " + (lines[-1] if lines else "")
+
+
+class FakeBackend(LLMBackend):
+    """In-process, deterministic backend for tests and benchmarks; never touches the network
+
+    The reply is `responder(prompt)` (by default an echo of the prompt's last
+    line), cut at stop sequences and at num_predict whitespace-separated tokens.
+    """
+
+    name = "fake"
+
+    def __init__(self, responder: Optional[Callable[[str], str]] = None,
+                 token_delay_seconds: float = 0.0, embedding_dim: int = 64):
+        self.responder = responder or _echo_last_line
+        self.token_delay_seconds = token_delay_seconds
+        self.embedding_dim = embedding_dim
+        self.healthy = True  # flip to simulate an outage
+        self.calls = 0
+
+    def _reply(self, payload: Dict[str, Any]) -> Tuple[List[str], str]:
+        options = payload.get("options", {})
+        text = self.responder(payload.get("prompt", ""))
+        for stop in options.get("stop") or ():
+            text = text.split(stop, 1)[0]
+        tokens = text.split()
+        limit = options.get("num_predict") or len(tokens)
+        done_reason = "length" if len(tokens) > limit else "stop"
+        return tokens[:limit], done_reason
+
+    def _final(self, payload: Dict[str, Any], tokens: List[str], done_reason: str) -> Dict[str, Any]:
+        prompt_tokens = payload.get("prompt", "").split()
+        context = list(payload.get("context") or []) + [
+            zlib.crc32(word.encode()) & 0xFFFF for word in prompt_tokens + tokens]
+        return {"done": True, "done_reason": done_reason, "prompt_eval_count": len(prompt_tokens),
+                "eval_count": len(tokens), "context": context}
+
+    async def generate(self, client: httpx.AsyncClient, payload: Dict[str, Any]) -> LLMResponse:
+        self.calls += 1
+        tokens, done_reason = self._reply(payload)
+        if self.token_delay_seconds:
+            await asyncio.sleep(self.token_delay_seconds * len(tokens))
+        final = self._final(payload, tokens, done_reason)
+        return LLMResponse(text=" ".join(tokens), stats=_stats_of(final), context=final["context"])
+
+    async def stream(self, client: httpx.AsyncClient,
+                     payload: Dict[str, Any]) -> AsyncIterator[LLMChunk]:
+        self.calls += 1
+        tokens, done_reason = self._reply(payload)
+        for i, token in enumerate(tokens):
+            if self.token_delay_seconds:
+                await asyncio.sleep(self.token_delay_seconds)
+            yield LLMChunk(text=token if i == 0 else " " + token)
+        yield LLMChunk(text="", done=True, stats=_stats_of(self._final(payload, tokens, done_reason)))
+
+    async def embed(self, client: httpx.AsyncClient, model: str,
+                    texts: Sequence[str]) -> List[List[float]]:
+        # Hashed bag of words: texts sharing words get similar vectors
+        vectors = []
+        for text in texts:
+            vector = [0.0] * self.embedding_dim
+            for word in re.findall(r"\w+", text.lower()):
+                digest = hashlib.blake2b(word.encode(), digest_size=4).digest()
+                vector[int.from_bytes(digest, "little") % self.embedding_dim] += 1.0
+            norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+            vectors.append([v / norm for v in vector])
+        return vectors
+
+    async def health(self, client: httpx.AsyncClient) -> bool:
+        return self.healthy
+
+
+BACKENDS: Dict[str, Callable[[], LLMBackend]] = {
+    "ollama": OllamaBackend,
+    "openai": OpenAICompatibleBackend,
+    "fake": FakeBackend,
+}
+
+
+def create_backend(name: str, api_key: Optional[str] = None) -> LLMBackend:
+    """Backend adapter by name; raises ValueError if unknown"""
+    if name == "openai":
+        return OpenAICompatibleBackend(api_key=api_key)
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown LLM backend {name!r}; expected one of {sorted(BACKENDS)}") from None
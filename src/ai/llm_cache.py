@@ -0,0 +1,216 @@
+from __future__ import annotations
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """
+    Exact-match LLM response cache: in-memory LRU with TTL and a byte cap, plus optional SQLite tier
+
+    On the event loop use aget()/aput(): SQLite lookups run in a worker
+    thread, and stores are written behind, with every store that arrives
+    while a write is in progress committed together in the next one.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 16 * 1024 * 1024,
+                 ttl_seconds: Optional[float] = 3600.0, path: Optional[str] = None):
+        """
+        Args:
+            max_entries: Maximum number of responses kept in memory
+            max_bytes: Maximum total size (UTF-8 bytes of responses) kept in memory
+            ttl_seconds: Entry lifetime; None disables expiry
+            path: SQLite file for the persistent tier; None keeps the cache in memory only
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[str, float, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()  # serialises SQLite use across worker threads
+        self._pending: Dict[str, Tuple[str, float]] = {}  # stores not yet written to disk
+        self._flush_task: Optional[asyncio.Task] = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+            self._db.commit()
+
+    @staticmethod
+    def make_key(model: str, prompt: str, temperature: float, num_predict: int, **extra: Any) -> str:
+        """Stable digest of everything that determines the model output"""
+        material = json.dumps([model, prompt, temperature, num_predict, extra], sort_keys=True)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _expiry(self) -> float:
+        return time.time() + self.ttl_seconds if self.ttl_seconds is not None else float("inf")
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response or None; promotes persistent hits into memory (blocks on disk)"""
+        value = self._memory_get(key)
+        if value is None and self._db is not None:
+            value = self._disk_get(key)
+        if value is None:
+            self._count_miss()
+        return value
+
+    async def aget(self, key: str) -> Optional[str]:
+        """get() for the event loop: the SQLite lookup runs in a worker thread"""
+        value = self._memory_get(key)
+        if value is None and self._db is not None:
+            value = await asyncio.to_thread(self._disk_get, key)
+        if value is None:
+            self._count_miss()
+        return value
+
+    def put(self, key: str, value: str) -> None:
+        """Store a response in memory and, if configured, on disk (blocks on disk)"""
+        if self._store(key, value):
+            self._flush()
+
+    async def aput(self, key: str, value: str) -> None:
+        """put() for the event loop: the disk write happens behind, in a worker thread"""
+        if self._store(key, value) and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = asyncio.create_task(self._flush_behind())
+
+    def _memory_get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at, size = entry
+            if expires_at > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+            self._bytes -= size
+            self.expirations += 1
+            return None
+
+    def _disk_get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._db_lock:
+            with self._lock:
+                row = self._pending.get(key)
+            if row is None and self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+        if row is None or row[1] <= now:
+            return None
+        with self._lock:
+            self._insert(key, row[0], row[1])
+            self.hits += 1
+            self.disk_hits += 1
+        return row[0]
+
+    def _count_miss(self) -> None:
+        with self._lock:
+            self.misses += 1
+
+    def _store(self, key: str, value: str) -> bool:
+        """Insert into memory and queue for disk; True if there is a disk write to do"""
+        expires_at = self._expiry()
+        with self._lock:
+            self._insert(key, value, expires_at)
+            if self._db is None:
+                return False
+            self._pending[key] = (value, expires_at)
+            return True
+
+    def _flush(self) -> None:
+        """Write every queued store in one transaction"""
+        with self._db_lock:
+            with self._lock:
+                rows = [(key, value, expires_at if expires_at != float("inf") else 1e18)
+                        for key, (value, expires_at) in self._pending.items()]
+                self._pending.clear()
+            if rows and self._db is not None:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO responses (key, value, expires_at) VALUES (?, ?, ?)", rows
+                )
+                self._db.commit()
+
+    async def _flush_behind(self) -> None:
+        # Checked on the loop, where aput() queues, so no store is left behind
+        while self._pending:
+            try:
+                await asyncio.to_thread(self._flush)
+            except Exception as e:
+                logger.warning("Writing the LLM response cache to disk failed: %s", e)
+                return
+
+    def _insert(self, key: str, value: str, expires_at: float) -> None:
+        """Insert into the LRU and evict until both caps hold (caller holds the lock)"""
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old[2]
+        self._entries[key] = (value, expires_at, size)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, (_, _, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry from both tiers"""
+        with self._db_lock, self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._pending.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for monitoring"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self) -> None:
+        """Write queued stores and close the persistent tier"""
+        self._flush()
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    async def aclose(self) -> None:
+        """close() for the event loop: waits for the write-behind, then closes in a worker thread"""
+        if self._flush_task is not None:
+            await self._flush_task
+        await asyncio.to_thread(self.close)
@@ -0,0 +1,95 @@
+from __future__ import annotations
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence
+
+from .llm_tokens import Prompt
+
+_TOKEN_TYPECODE = "I"  # 4-byte unsigned ints keep each context compact
+
+
+class ConversationStore:
+    """LRU of Ollama `context` token arrays, bounded by conversation count and total bytes"""
+
+    def __init__(self, max_conversations: int = 1000, max_bytes: int = 64 * 1024 * 1024,
+                 max_context_tokens: int = 8192):
+        """
+        Args:
+            max_conversations: Conversations remembered at once
+            max_bytes: Memory budget for all stored contexts
+            max_context_tokens: Longer contexts are dropped so the next turn starts fresh
+                instead of overflowing the model's window
+        """
+        self.max_conversations = max_conversations
+        self.max_bytes = max_bytes
+        self.max_context_tokens = max_context_tokens
+        self._contexts: "OrderedDict[str, array]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.resets = 0
+
+    def get(self, conversation_id: str) -> Optional[List[int]]:
+        with self._lock:
+            tokens = self._contexts.get(conversation_id)
+            if tokens is None:
+                return None
+            self._contexts.move_to_end(conversation_id)
+            return tokens.tolist()
+
+    def __contains__(self, conversation_id: str) -> bool:
+        return conversation_id in self._contexts
+
+    def put(self, conversation_id: str, context: Sequence[int]) -> None:
+        with self._lock:
+            self._discard(conversation_id)
+            if len(context) > self.max_context_tokens:
+                self.resets += 1
+                return
+            tokens = array(_TOKEN_TYPECODE, context)
+            self._contexts[conversation_id] = tokens
+            self._bytes += tokens.itemsize * len(tokens)
+            while self._contexts and (len(self._contexts) > self.max_conversations
+                                      or self._bytes > self.max_bytes):
+                _, evicted = self._contexts.popitem(last=False)
+                self._bytes -= evicted.itemsize * len(evicted)
+                self.evictions += 1
+
+    def drop(self, conversation_id: str) -> None:
+        with self._lock:
+            self._discard(conversation_id)
+
+    def _discard(self, conversation_id: str) -> None:
+        tokens = self._contexts.pop(conversation_id, None)
+        if tokens is not None:
+            self._bytes -= tokens.itemsize * len(tokens)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for monitoring"""
+        return {
+            "conversations": len(self._contexts),
+            "bytes": self._bytes,
+            "evictions": self.evictions,
+            "resets": self.resets,
+        }
+
+
+class Conversation:
+    """Handle for a multi-turn exchange whose Ollama context is carried between turns"""
+
+    def __init__(self, llm: Any, conversation_id: str):
+        self.llm = llm
+        self.id = conversation_id
+
+    @property
+    def has_context(self) -> bool:
+        """True once a turn has completed and its context is still stored"""
+        return self.id in self.llm.conversations
+
+    async def generate(self, prompt: Prompt, **kwargs: Any) -> str:
+        """Send only the new turn; earlier turns are already in the stored context"""
+        return await self.llm.generate(prompt, conversation_id=self.id, **kwargs)
+
+    def reset(self) -> None:
+        self.llm.conversations.drop(self.id)
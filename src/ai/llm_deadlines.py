@@ -0,0 +1,70 @@
+from __future__ import annotations
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+from .llm_metrics import Histogram
+
+# Absolute time.monotonic() by which the current request must be answered
+_deadline: ContextVar[Optional[float]] = ContextVar("llm_deadline", default=None)
+
+
+@contextmanager
+def llm_deadline(seconds: Optional[float]) -> Iterator[Optional[float]]:
+    """
+    Bound every LLM call made inside the block to finish within `seconds`
+
+    Nested deadlines can only tighten the budget. None leaves the current one.
+    Yields the absolute (time.monotonic) deadline in force.
+    """
+    current = _deadline.get()
+    if seconds is None:
+        yield current
+        return
+    expires = time.monotonic() + seconds
+    if current is not None:
+        expires = min(expires, current)
+    token = _deadline.set(expires)
+    try:
+        yield expires
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current deadline (negative once passed), or None without one"""
+    expires = _deadline.get()
+    return None if expires is None else expires - time.monotonic()
+
+
+class AdaptiveTimeouts:
+    """
+    Per-profile timeouts learned from recent latency
+
+    Once a profile has `min_samples` completed calls, its timeout is the
+    `percentile` latency times `multiplier`, kept between `floor_seconds` and
+    the profile's configured limit. Until then, the configured limit applies.
+    """
+
+    def __init__(self, percentile: float = 99.0, multiplier: float = 2.0,
+                 floor_seconds: float = 5.0, min_samples: int = 20):
+        self.percentile = percentile
+        self.multiplier = multiplier
+        self.floor_seconds = floor_seconds
+        self.min_samples = min_samples
+        self.latency: Dict[str, Histogram] = {}
+
+    def record(self, profile: str, seconds: float) -> None:
+        self.latency.setdefault(profile, Histogram()).observe(seconds)
+
+    def timeout_for(self, profile: str, ceiling: Optional[float]) -> Optional[float]:
+        """Timeout for the next call of `profile`; `ceiling` is the configured limit"""
+        histogram = self.latency.get(profile)
+        if histogram is None or histogram.count < self.min_samples:
+            return ceiling
+        learned = max(self.floor_seconds, histogram.percentile(self.percentile) * self.multiplier)
+        return learned if ceiling is None else min(learned, ceiling)
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        return {profile: self.timeout_for(profile, None) for profile in self.latency}
@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+
+class LLMError(RuntimeError):
+    """Base class for LLM service failures (a RuntimeError, like every LLMService error)"""
+
+
+class LLMOverloadedError(LLMError):
+    """Raised when admission control rejects a request instead of queueing it"""
+
+
+class LLMTimeoutError(LLMError):
+    """Raised when a generation does not finish within its time limit"""
+
+
+class LLMOutputError(LLMError):
+    """Raised when the model's output cannot be parsed or validated, even after repair"""
@@ -0,0 +1,112 @@
+from __future__ import annotations
+import asyncio
+import logging
+import time
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from .llm_router import OllamaHost
+    from .llm_service import LLMService
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class HostStatus:
+    """Result of the latest probe of one host"""
+    url: str
+    healthy: Optional[bool] = None  # None until the first success or max_failures failures
+    latency_seconds: Optional[float] = None
+    loaded_models: List[str] = field(default_factory=list)
+    last_error: Optional[str] = None
+    checked_at: Optional[float] = None  # time.time() of the last probe
+    consecutive_failures: int = 0
+
+
+class HealthProber:
+    """
+    Background task that probes every host at a fixed interval
+
+    Readers (health_check, routing, admission control) use the cached
+    result instead of making a request of their own.
+    """
+
+    def __init__(self, llm: "LLMService", interval_seconds: float, timeout_seconds: float = 2.0,
+                 max_failures: int = 3):
+        """
+        Args:
+            llm: Service whose hosts are probed
+            interval_seconds: Time between probe rounds
+            timeout_seconds: Limit for one host's probe; slower counts as a failure
+            max_failures: Consecutive failed probes before a host is marked down,
+                so one slow or dropped probe doesn't take it out of service
+        """
+        self.llm = llm
+        self.interval_seconds = interval_seconds
+        self.timeout_seconds = timeout_seconds
+        self.max_failures = max(1, max_failures)
+        self.status: Dict[str, HostStatus] = {h.url: HostStatus(h.url) for h in llm.router.hosts}
+        self.healthy_hosts = 0
+        self.rounds = 0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def probed(self) -> bool:
+        return self.rounds > 0
+
+    @property
+    def available(self) -> bool:
+        """Whether any host is not marked down (True until the first round finishes)"""
+        return not self.probed or self.healthy_hosts > 0
+
+    async def probe_once(self) -> None:
+        """Probe every host concurrently and publish the results"""
+        hosts = self.llm.router.hosts
+        await asyncio.gather(*(self._probe(h) for h in hosts))
+        self.healthy_hosts = sum(1 for h in hosts if self.status[h.url].healthy is not False)
+        self.rounds += 1
+
+    async def _probe(self, host: "OllamaHost") -> None:
+        status = self.status[host.url]
+        started = time.perf_counter()
+        try:
+            models = await asyncio.wait_for(
+                self.llm.backend.probe(self.llm._client_for(host)), self.timeout_seconds)
+        except Exception as e:
+            status.last_error = str(e) or type(e).__name__
+            status.consecutive_failures += 1
+            if status.consecutive_failures >= self.max_failures and status.healthy is not False:
+                logger.warning("LLM host %s failed %d health probes in a row: %s",
+                               host.url, status.consecutive_failures, e)
+                status.healthy = False
+        else:
+            if status.healthy is False:
+                logger.info("LLM host %s is healthy again", host.url)
+            status.healthy = True
+            status.loaded_models = models
+            status.consecutive_failures = 0
+        status.latency_seconds = time.perf_counter() - started
+        status.checked_at = time.time()
+        host.healthy = status.healthy is not False
+
+    def start_background(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await self.probe_once()
+            await asyncio.sleep(self.interval_seconds)
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        return [asdict(status) for status in self.status.values()]
@@ -0,0 +1,64 @@
+from __future__ import annotations
+from typing import Any, Dict, Optional
+
+from .llm_metrics import Histogram
+
+
+class HedgePolicy:
+    """
+    When to send a duplicate ("hedged") request, within a load budget
+    
+    A hedge is sent once the primary request has been running longer than
+    the `percentile` of recent latencies. Every primary request earns
+    `budget_ratio` of a hedge token and each hedge spends a whole token, so
+    hedges add at most `budget_ratio` extra load over time.
+    """
+
+    def __init__(self, percentile: float = 95.0, budget_ratio: float = 0.05,
+                 min_delay_seconds: float = 0.5, min_samples: int = 20, max_burst: float = 10.0):
+        self.percentile = percentile
+        self.budget_ratio = budget_ratio
+        self.min_delay_seconds = min_delay_seconds
+        self.min_samples = min_samples
+        self.max_burst = max_burst
+        self.latency = Histogram()
+        self._tokens = 0.0
+
+        self.requests = 0
+        self.hedges_issued = 0
+        self.hedges_won = 0
+        self.hedges_denied = 0
+
+    def on_request(self) -> None:
+        self.requests += 1
+        self._tokens = min(self.max_burst, self._tokens + self.budget_ratio)
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None until enough latency samples exist"""
+        if self.latency.count < self.min_samples:
+            return None
+        return max(self.min_delay_seconds, self.latency.percentile(self.percentile))
+
+    def try_acquire(self) -> bool:
+        """Spend one hedge token if the budget allows"""
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            self.hedges_issued += 1
+            return True
+        self.hedges_denied += 1
+        return False
+
+    def record(self, latency_seconds: float, hedge_won: bool) -> None:
+        self.latency.observe(latency_seconds)
+        if hedge_won:
+            self.hedges_won += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for monitoring"""
+        return {
+            "requests": self.requests,
+            "hedges_issued": self.hedges_issued,
+            "hedges_won": self.hedges_won,
+            "hedges_denied": self.hedges_denied,
+            "hedge_delay_seconds": self.hedge_delay(),
+        }
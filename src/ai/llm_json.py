@@ -0,0 +1,65 @@
+from __future__ import annotations
+import json
+from typing import Any, List, Tuple
+
+
+class IncrementalJSONObject:
+    """
+    Incremental parser for one streamed top-level JSON object
+    
+    feed() takes text as it arrives and returns the (key, value) members
+    whose values have closed since the last call, so callers can act on
+    early fields before the model has finished the rest.
+    """
+
+    def __init__(self):
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._member_start = -1
+        self.done = False
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        if self.done or not chunk:
+            return []
+        self._text += chunk
+        members: List[Tuple[str, Any]] = []
+        text = self._text
+        for index in range(self._pos, len(text)):
+            char = text[index]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+            if char == '"' and self._depth > 0:
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+                if self._depth == 1:
+                    if char == "[":
+                        raise ValueError("Expected a JSON object, got an array")
+                    self._member_start = index + 1
+            elif char in "}]" and self._depth > 0:
+                self._depth -= 1
+                if self._depth == 0:
+                    members.extend(self._close_member(text, index))
+                    self.done = True
+                    self._pos = index + 1
+                    return members
+            elif char == "," and self._depth == 1:
+                members.extend(self._close_member(text, index))
+                self._member_start = index + 1
+        self._pos = len(text)
+        return members
+
+    def _close_member(self, text: str, end: int) -> List[Tuple[str, Any]]:
+        member = text[self._member_start:end].strip()
+        if not member:
+            return []
+        return list(json.loads("{" + member + "}").items())
@@ -0,0 +1,117 @@
+from __future__ import annotations
+import bisect
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+class Histogram:
+    """Cumulative bucketed histogram plus a rolling window of recent samples for percentiles"""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS, window: int = 1024):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.total = 0.0
+        self._recent: Deque[float] = deque(maxlen=window)
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        self._recent.append(value)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """q-th percentile (0-100) of the recent window, or None before any sample"""
+        if not self._recent:
+            return None
+        ordered = sorted(self._recent)
+        index = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def snapshot(self) -> Dict[str, Any]:
+        cumulative, buckets = 0, {}
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            cumulative += count
+            buckets["+Inf" if bound == float("inf") else str(bound)] = cumulative
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "mean": self.total / self.count if self.count else None,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "buckets": buckets,
+        }
+
+
+THROUGHPUT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+_NS = 1e9  # Ollama reports durations in nanoseconds
+
+
+class CallMetrics:
+    """Latency breakdown for one (model, profile) series"""
+
+    def __init__(self):
+        self.calls = 0
+        self.ttft_seconds = Histogram()
+        self.load_seconds = Histogram()
+        self.prefill_tokens_per_second = Histogram(buckets=THROUGHPUT_BUCKETS)
+        self.decode_tokens_per_second = Histogram(buckets=THROUGHPUT_BUCKETS)
+        self.total_seconds = Histogram()
+        # Wall time Ollama did not account for: network, HTTP and server-side queueing
+        self.overhead_seconds = Histogram()
+
+    def record(self, stats: Dict[str, Any], wall_seconds: float,
+               ttft_seconds: Optional[float] = None) -> None:
+        self.calls += 1
+        self.total_seconds.observe(wall_seconds)
+        load = stats.get("load_duration", 0) / _NS
+        prefill = stats.get("prompt_eval_duration", 0) / _NS
+        decode = stats.get("eval_duration", 0) / _NS
+        if "load_duration" in stats:
+            self.load_seconds.observe(load)
+        if prefill > 0 and stats.get("prompt_eval_count"):
+            self.prefill_tokens_per_second.observe(stats["prompt_eval_count"] / prefill)
+        if decode > 0 and stats.get("eval_count"):
+            self.decode_tokens_per_second.observe(stats["eval_count"] / decode)
+        if ttft_seconds is None and "prompt_eval_duration" in stats:
+            # Non-streamed call: first token follows model load and prefill
+            ttft_seconds = wall_seconds - (stats.get("total_duration", 0) / _NS) + load + prefill
+        if ttft_seconds is not None:
+            self.ttft_seconds.observe(max(0.0, ttft_seconds))
+        if "total_duration" in stats:
+            self.overhead_seconds.observe(max(0.0, wall_seconds - stats["total_duration"] / _NS))
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "ttft_seconds": self.ttft_seconds.snapshot(),
+            "load_seconds": self.load_seconds.snapshot(),
+            "prefill_tokens_per_second": self.prefill_tokens_per_second.snapshot(),
+            "decode_tokens_per_second": self.decode_tokens_per_second.snapshot(),
+            "total_seconds": self.total_seconds.snapshot(),
+            "overhead_seconds": self.overhead_seconds.snapshot(),
+        }
+
+
+class LLMMetrics:
+    """Per-model, per-profile metrics built from Ollama's timing fields"""
+
+    def __init__(self):
+        self._series: Dict[Tuple[str, str], CallMetrics] = {}
+
+    def record(self, model: str, profile: str, stats: Dict[str, Any], wall_seconds: float,
+               ttft_seconds: Optional[float] = None) -> None:
+        series = self._series.get((model, profile))
+        if series is None:
+            series = self._series[(model, profile)] = CallMetrics()
+        series.record(stats, wall_seconds, ttft_seconds)
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """{model: {profile: breakdown}}"""
+        result: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for (model, profile), series in self._series.items():
+            result.setdefault(model, {})[profile] = series.snapshot()
+        return result
@@ -0,0 +1,55 @@
+from __future__ import annotations
+import json
+from typing import Any, AsyncIterable, AsyncIterator, List
+
+
+class NDJSONDecoder:
+    """
+    Incremental decoder for newline-delimited JSON arriving as raw byte chunks
+
+    feed() returns the records completed by each chunk. Bytes are appended
+    to one bytearray; each chunk is searched for a newline only from the
+    offset where the previous search stopped, and every completed run of
+    lines is cut off, decoded and split in one pass. A line spread over many
+    chunks therefore costs linear time, not a re-scan and copy per chunk.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._scan = 0  # bytes of the pending line already known to hold no newline
+
+    def feed(self, data: bytes) -> List[Any]:
+        """
+        Decode every line completed by `data`
+
+        Raises:
+            json.JSONDecodeError: If a complete line is not valid JSON
+        """
+        buffer = self._buffer
+        buffer += data
+        end = buffer.rfind(b"\n", self._scan)
+        if end < 0:
+            self._scan = len(buffer)
+            return []
+        # Ends on a newline, so no UTF-8 sequence is cut in half
+        complete = buffer[:end].decode()
+        del buffer[:end + 1]
+        self._scan = 0
+        return [json.loads(line) for line in complete.split("\n") if line.strip()]
+
+    def close(self) -> List[Any]:
+        """Decode a final line that had no trailing newline"""
+        line = self._buffer.decode()
+        self._buffer.clear()
+        self._scan = 0
+        return [json.loads(line)] if line.strip() else []
+
+
+async def aiter_ndjson(chunks: AsyncIterable[bytes]) -> AsyncIterator[Any]:
+    """Records of an NDJSON byte stream (e.g. httpx Response.aiter_bytes()) as they complete"""
+    decoder = NDJSONDecoder()
+    async for chunk in chunks:
+        for record in decoder.feed(chunk):
+            yield record
+    for record in decoder.close():
+        yield record
@@ -0,0 +1,114 @@
+from __future__ import annotations
+import re
+from abc import ABC, abstractmethod
+from typing import Optional, Pattern, Union
+
+# Words whose trailing period does not end a sentence
+_ABBREVIATIONS = frozenset({
+    "inc", "llc", "corp", "co", "ltd", "l.l.c", "mr", "mrs", "ms", "dr", "st", "jr", "sr",
+    "e.g", "i.e", "etc", "vs", "u.s", "no", "dept", "ave",
+})
+# Company suffixes often end a sentence too ("... your Texas LLC. First, ..."):
+# they do when the next word is capitalised
+_COMPANY_SUFFIXES = frozenset({"inc", "llc", "corp", "co", "ltd", "l.l.c"})
+_SENTENCE_END = re.compile(r"[.!?][\"')\]]*(?=\s)")
+
+
+class CompletionPredicate(ABC):
+    """
+    Decides from the text streamed so far whether the answer is complete
+    
+    Called with the full accumulated text after every chunk; returns the
+    length of the complete answer (text is cut there) or None to keep reading.
+    Instances may keep scan state, so create a new one per call.
+    """
+
+    @abstractmethod
+    def __call__(self, text: str) -> Optional[int]:
+        """Length of the complete answer within `text`, or None to keep reading"""
+
+    def __repr__(self) -> str:
+        return type(self).__name__
+
+
+class SentenceBoundary(CompletionPredicate):
+    """
+    Complete after `count` sentences (terminator followed by whitespace)
+    
+    A period after an abbreviation does not count, except after a company
+    suffix followed by a capitalised word.
+    """
+
+    def __init__(self, count: int = 1):
+        self.count = count
+
+    def __call__(self, text: str) -> Optional[int]:
+        found = 0
+        for match in _SENTENCE_END.finditer(text):
+            word = text[:match.start()].rsplit(None, 1)[-1] if text[:match.start()].strip() else ""
+            abbreviation = word.lower().rstrip(".")
+            if match.group(0)[0] == "." and abbreviation in _ABBREVIATIONS:
+                if abbreviation not in _COMPANY_SUFFIXES:
+                    continue
+                following = text[match.end():].lstrip()
+                if not following:
+                    return None  # the next word decides
+                if not following[0].isupper():
+                    continue
+            found += 1
+            if found == self.count:
+                return match.end()
+        return None
+
+    def __repr__(self) -> str:
+        return f"SentenceBoundary({self.count})"
+
+
+class BalancedJSON(CompletionPredicate):
+    """Complete once the first top-level JSON object or array is closed"""
+
+    def __init__(self):
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._started = False
+
+    def __call__(self, text: str) -> Optional[int]:
+        if len(text) < self._pos:
+            self.__init__()  # fresh text: start over
+        for index in range(self._pos, len(text)):
+            char = text[index]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"' and self._started:
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+                self._started = True
+            elif char in "}]" and self._started:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._pos = index + 1
+                    return index + 1
+        self._pos = len(text)
+        return None
+
+
+class RegexMatch(CompletionPredicate):
+    """Complete at the end of the first match of `pattern`"""
+
+    def __init__(self, pattern: Union[str, Pattern[str]]):
+        self.pattern = re.compile(pattern)
+
+    def __call__(self, text: str) -> Optional[int]:
+        match = self.pattern.search(text)
+        return match.end() if match else None
+
+    def __repr__(self) -> str:
+        return f"RegexMatch({self.pattern.pattern!r})"
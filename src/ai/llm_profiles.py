@@ -0,0 +1,112 @@
+from __future__ import annotations
+from dataclasses import dataclass, replace
+from typing import Any, Dict, Optional, Tuple
+
+from .config import settings
+from .llm_metrics import Histogram
+
+TOKEN_BUCKETS = (8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096)
+PROMPT_TOKEN_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768)
+
+
+@dataclass(frozen=True)
+class GenerationProfile:
+    """Generation budget for one kind of request"""
+    name: str
+    num_predict: int
+    temperature: float
+    stop: Tuple[str, ...] = ()
+    timeout_seconds: Optional[float] = None  # limit for a whole generation, streamed or not
+    max_prompt_tokens: Optional[int] = None  # default: LLM_CONTEXT_WINDOW minus num_predict
+
+
+_BUILTIN_PROFILES: Dict[str, GenerationProfile] = {
+    profile.name: profile
+    for profile in (
+        # One sentence: stop at a paragraph break or an invented next turn
+        GenerationProfile("confirmation", num_predict=64, temperature=0.3,
+                          stop=("\n\n", "\nUser request:"), timeout_seconds=30),
+        GenerationProfile("extraction_json", num_predict=512, temperature=0.0, timeout_seconds=60),
+        GenerationProfile("explanation", num_predict=768, temperature=0.7, timeout_seconds=120),
+    )
+}
+
+_profiles: Dict[str, GenerationProfile] = dict(_BUILTIN_PROFILES)
+for _name, _overrides in settings.LLM_PROFILES.items():
+    _base = _profiles.get(_name) or GenerationProfile(_name, settings.MAX_TOKENS, settings.TEMPERATURE)
+    if "stop" in _overrides:
+        _overrides = {**_overrides, "stop": tuple(_overrides["stop"])}
+    _profiles[_name] = replace(_base, **_overrides)
+
+
+def default_profile() -> GenerationProfile:
+    """Profile used when none is named: the global MAX_TOKENS/TEMPERATURE/TIMEOUT_SECONDS"""
+    return GenerationProfile("default", settings.MAX_TOKENS, settings.TEMPERATURE)
+
+
+def get_profile(name: Optional[str]) -> GenerationProfile:
+    """
+    Look up a profile by name (None -> default)
+    
+    Raises:
+        ValueError: If the profile is not registered
+    """
+    if name is None or name == "default":
+        return default_profile()
+    try:
+        return _profiles[name]
+    except KeyError:
+        raise ValueError(f"Unknown generation profile {name!r}. Known: {', '.join(sorted(_profiles))}")
+
+
+def register_profile(profile: GenerationProfile) -> None:
+    """Add or replace a profile at runtime"""
+    _profiles[profile.name] = profile
+
+
+class ProfileStats:
+    """Observed output lengths for one profile, to tune its budget from data"""
+
+    def __init__(self):
+        self.calls = 0
+        self.truncated = 0  # stopped by num_predict rather than by the model or a stop sequence
+        self.output_tokens = Histogram(buckets=TOKEN_BUCKETS)
+        self.output_chars = Histogram(buckets=tuple(b * 4 for b in TOKEN_BUCKETS))
+        self.early_stops = 0
+        self.tokens_saved = 0
+        self.prompt_tokens = Histogram(buckets=PROMPT_TOKEN_BUCKETS)
+        self.prompts_trimmed = 0
+
+    def expected_tokens(self, num_predict: int) -> int:
+        """Typical output length of complete runs, or the budget before any are seen"""
+        median = self.output_tokens.percentile(50)
+        return min(num_predict, int(median)) if median is not None else num_predict
+
+    def record_prompt(self, tokens: int, trimmed: bool) -> None:
+        self.prompt_tokens.observe(tokens)
+        if trimmed:
+            self.prompts_trimmed += 1
+
+    def record_early_stop(self, tokens_saved: int) -> None:
+        self.early_stops += 1
+        self.tokens_saved += tokens_saved
+
+    def record(self, text: str, stats: Dict[str, Any], num_predict: int) -> None:
+        self.calls += 1
+        self.output_chars.observe(len(text))
+        if "eval_count" in stats:
+            self.output_tokens.observe(stats["eval_count"])
+        if stats.get("done_reason") == "length" or stats.get("eval_count", 0) >= num_predict:
+            self.truncated += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "truncated": self.truncated,
+            "early_stops": self.early_stops,
+            "tokens_saved": self.tokens_saved,
+            "output_tokens": self.output_tokens.snapshot(),
+            "output_chars": self.output_chars.snapshot(),
+            "prompt_tokens": self.prompt_tokens.snapshot(),
+            "prompts_trimmed": self.prompts_trimmed,
+        }
@@ -0,0 +1,152 @@
+from __future__ import annotations
+import hashlib
+from dataclasses import dataclass
+from string import Formatter
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from .config import settings
+from .llm_tokens import REQUIRED, PromptSection
+
+
+@dataclass(frozen=True)
+class Slot:
+    """
+    Variable part of a template, filled in per request
+
+    `text` is a str.format string over the request's values. `priority` and
+    `keep` control trimming as for PromptSection.
+    """
+    text: str
+    priority: float = REQUIRED
+    keep: str = "head"
+    name: str = ""
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    """
+    Versioned prompt: a fixed prefix followed by compact per-request slots
+
+    The prefix never changes between requests, so the server can reuse its
+    KV cache for it; everything that varies goes in `slots`, after it.
+    Changing either means bumping `version`.
+    """
+    name: str
+    version: int
+    prefix: str
+    slots: Tuple[Slot, ...]
+
+
+def compact(value: Any) -> str:
+    """Short rendering of a slot value: `key=value; ...` for mappings, empty values dropped"""
+    if value is None:
+        return ""
+    if isinstance(value, Mapping):
+        return "; ".join(f"{k}={compact(v)}" for k, v in value.items() if v not in (None, "", [], {}))
+    if isinstance(value, (list, tuple, set)):
+        return ", ".join(compact(v) for v in value)
+    return str(value)
+
+
+class CompiledTemplate:
+    """Template with its slots parsed and its prefix section built once"""
+
+    def __init__(self, template: PromptTemplate):
+        """
+        Raises:
+            ValueError: If a slot's format string is malformed
+        """
+        self.template = template
+        self.id = f"{template.name}@v{template.version}"
+        self.prefix = PromptSection(template.prefix, name=f"{template.name} prefix")
+        self._slots: List[Tuple[Slot, Tuple[str, ...]]] = []
+        for slot in template.slots:
+            try:
+                fields = tuple(f for _, f, _, _ in Formatter().parse(slot.text) if f is not None)
+            except ValueError as e:
+                raise ValueError(f"Bad slot {slot.text!r} in prompt template {self.id}: {e}") from None
+            self._slots.append((slot, fields))
+        self.fields = frozenset(f for _, fields in self._slots for f in fields)
+        content = "\0".join([template.prefix, *(slot.text for slot in template.slots)])
+        self.fingerprint = hashlib.sha256(content.encode()).hexdigest()[:12]
+
+    def render(self, **values: Any) -> List[PromptSection]:
+        """Prefix plus filled-in slots, ready for LLMService.generate"""
+        return [self.prefix, *self.render_suffix(**values)]
+
+    def render_suffix(self, **values: Any) -> List[PromptSection]:
+        """
+        Filled-in slots only, for turns continuing a conversation that has seen the prefix
+
+        Raises:
+            ValueError: If a value the slots need is missing
+        """
+        missing = self.fields.difference(values)
+        if missing:
+            raise ValueError(f"Prompt template {self.id} needs {', '.join(sorted(missing))}")
+        rendered = {name: compact(values[name]) for name in self.fields}
+        return [PromptSection(slot.text.format(**rendered), slot.priority, slot.keep, slot.name)
+                for slot, _ in self._slots]
+
+
+_BUILTIN_TEMPLATES = (
+    PromptTemplate(
+        "confirmation", version=1,
+        prefix=(
+            "You are a helpful business registration assistant. "
+            "Given a user's request and the entities extracted from it, "
+            "generate a single clear confirmation sentence starting with 'I'll help you'.\n\n"
+        ),
+        # Over the token budget, the entities are cut first, then the message
+        slots=(
+            Slot("User request: {user_message}\n", priority=2, name="user request"),
+            Slot("Entities: {entities}\n\n", priority=1, name="entities"),
+            Slot("Response (one sentence):"),
+        ),
+    ),
+)
+
+_templates: Dict[str, Dict[int, CompiledTemplate]] = {}
+
+
+def register_template(template: PromptTemplate) -> CompiledTemplate:
+    """
+    Compile and register a template version
+
+    Raises:
+        ValueError: If the same name and version is already registered with
+            different content (edit the template by adding a new version)
+    """
+    compiled = CompiledTemplate(template)
+    versions = _templates.setdefault(template.name, {})
+    existing = versions.get(template.version)
+    if existing is not None:
+        if existing.fingerprint != compiled.fingerprint:
+            raise ValueError(f"Prompt template {compiled.id} is already registered with other content; "
+                             f"register it as a new version")
+        return existing
+    versions[template.version] = compiled
+    return compiled
+
+
+def get_template(name: str, version: Optional[int] = None) -> CompiledTemplate:
+    """
+    Look up a compiled template (default: version pinned in LLM_PROMPT_VERSIONS, else the latest)
+
+    Raises:
+        ValueError: If the template or version is not registered
+    """
+    versions = _templates.get(name)
+    if not versions:
+        raise ValueError(f"Unknown prompt template {name!r}. Known: {', '.join(sorted(_templates))}")
+    if version is None:
+        version = settings.LLM_PROMPT_VERSIONS.get(name, max(versions))
+    try:
+        return versions[version]
+    except KeyError:
+        raise ValueError(f"Prompt template {name!r} has no version {version}. "
+                         f"Known: {', '.join(map(str, sorted(versions)))}") from None
+
+
+for _template in _BUILTIN_TEMPLATES:
+    register_template(_template)
@@ -0,0 +1,134 @@
+from __future__ import annotations
+import random
+from typing import Any, Dict, Optional
+
+import httpx
+
+from .llm_deadlines import remaining
+from .llm_errors import LLMError
+
+# Failures that happen before the server did any work, or that it reports as temporary
+_RETRYABLE_TRANSPORT = (
+    httpx.ConnectError,        # refused
+    httpx.ConnectTimeout,
+    httpx.ReadError,           # reset
+    httpx.WriteError,
+    httpx.RemoteProtocolError,  # closed mid-response
+)
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Connection refused/reset and 5xx (including Ollama's 503 while a model loads)"""
+    while exc is not None:
+        if isinstance(exc, LLMError):
+            return False  # our own timeouts, overload and output errors
+        if isinstance(exc, _RETRYABLE_TRANSPORT):
+            return True
+        if isinstance(exc, httpx.HTTPStatusError):
+            return exc.response.status_code >= 500
+        exc = exc.__cause__
+    return False
+
+
+class RetryBudget:
+    """
+    Token bucket limiting retries to a fraction of requests
+
+    Every request deposits `ratio` of a token (up to `max_burst`) and every
+    retry spends a whole one, so during an outage retries add at most `ratio`
+    extra load instead of multiplying it.
+    """
+
+    def __init__(self, ratio: float = 0.1, max_burst: float = 10.0):
+        self.ratio = ratio
+        self.max_burst = max_burst
+        self.tokens = max_burst
+
+    def deposit(self) -> None:
+        self.tokens = min(self.max_burst, self.tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+_process_budget: Optional[RetryBudget] = None
+
+
+def process_budget(ratio: float = 0.1, max_burst: float = 10.0) -> RetryBudget:
+    """
+    The budget shared by every LLMService in the process
+
+    Each ChatService builds its own LLMService, and they all load the same
+    servers, so their retries are limited together. The first caller's
+    settings create it.
+    """
+    global _process_budget
+    if _process_budget is None:
+        _process_budget = RetryBudget(ratio, max_burst)
+    return _process_budget
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter, limited by a retry budget
+
+    The budget (see RetryBudget) is normally the process-wide one from
+    process_budget(); without one the policy gets a private bucket. A retry
+    is also skipped when its backoff would overrun the caller's deadline.
+    """
+
+    def __init__(self, max_attempts: int = 3, base_delay_seconds: float = 0.1,
+                 max_delay_seconds: float = 2.0, budget_ratio: float = 0.1,
+                 max_burst: float = 10.0, budget: Optional[RetryBudget] = None):
+        self.max_attempts = max_attempts
+        self.base_delay_seconds = base_delay_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self.budget = budget if budget is not None else RetryBudget(budget_ratio, max_burst)
+
+        self.requests = 0
+        self.retries = 0
+        self.give_ups: Dict[str, int] = {"attempts": 0, "budget": 0, "deadline": 0}
+
+    def on_request(self) -> None:
+        self.requests += 1
+        self.budget.deposit()
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter delay before retry number `attempt` (0-based)"""
+        ceiling = min(self.max_delay_seconds, self.base_delay_seconds * 2 ** attempt)
+        return random.uniform(0, ceiling)
+
+    def next_delay(self, exc: BaseException, attempt: int) -> Optional[float]:
+        """
+        Seconds to wait before retrying after `exc`, or None to give up
+
+        Args:
+            exc: Failure of the attempt that just ran
+            attempt: Retries already made for this request
+        """
+        if not is_retryable(exc):
+            return None
+        if attempt + 1 >= self.max_attempts:
+            self.give_ups["attempts"] += 1
+            return None
+        delay = self.backoff(attempt)
+        left = remaining()
+        if left is not None and delay >= left:
+            self.give_ups["deadline"] += 1
+            return None
+        if not self.budget.try_spend():
+            self.give_ups["budget"] += 1
+            return None
+        self.retries += 1
+        return delay
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "give_ups": dict(self.give_ups),
+            "budget_tokens": self.budget.tokens,
+        }
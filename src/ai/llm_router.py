@@ -0,0 +1,187 @@
+from __future__ import annotations
+import random
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import httpx
+
+from .llm_errors import LLMError
+
+
+@dataclass(eq=False)
+class OllamaHost:
+    """One Ollama backend plus the live routing state kept for it"""
+    url: str
+    weight: float = 1.0
+    models: Tuple[str, ...] = ()  # empty: serves any model
+    client: Optional[httpx.AsyncClient] = None
+    owns_client: bool = True
+
+    outstanding: int = 0
+    consecutive_failures: int = 0
+    ejected_until: float = 0.0
+    probing: bool = False
+    healthy: bool = True  # last background health probe; True until probed
+    requests: int = 0
+    failures: int = 0
+    ejections: int = 0
+
+    def __post_init__(self) -> None:
+        self.url = self.url.rstrip("/")
+        self.models = tuple(self.models)
+        if self.weight <= 0:
+            raise ValueError(f"Host weight must be positive: {self.url}")
+
+    def serves(self, model: str) -> bool:
+        return not self.models or model in self.models
+
+    @property
+    def ejected(self) -> bool:
+        return self.ejected_until > 0
+
+
+def is_host_failure(exc: BaseException) -> bool:
+    """Transport errors and 5xx responses count against a host; 4xx and parse errors do not"""
+    while exc is not None:
+        if isinstance(exc, httpx.TransportError):
+            return True
+        if isinstance(exc, httpx.HTTPStatusError):
+            return exc.response.status_code >= 500
+        exc = exc.__cause__
+    return False
+
+
+class HostRouter:
+    """
+    Least-outstanding-requests routing across Ollama hosts
+    
+    Hosts are ejected after `max_failures` consecutive failures. Once
+    `eject_seconds` have passed, a single trial request is let through
+    (half-open); success restores the host, failure ejects it again.
+    Hosts that failed their last background health probe are skipped until
+    a probe succeeds. Sessions stick to the host that served them last so Ollama can reuse
+    its KV cache for the conversation.
+    """
+
+    def __init__(self, hosts: Sequence[OllamaHost], max_failures: int = 3,
+                 eject_seconds: float = 30.0, sticky_capacity: int = 10_000):
+        if not hosts:
+            raise ValueError("At least one Ollama host must be configured")
+        self.hosts: List[OllamaHost] = list(hosts)
+        self.max_failures = max_failures
+        self.eject_seconds = eject_seconds
+        self.sticky_capacity = sticky_capacity
+        self._sticky: "OrderedDict[str, OllamaHost]" = OrderedDict()
+
+    def _routable(self, host: OllamaHost, now: float) -> bool:
+        if not host.healthy:
+            return False
+        if not host.ejected:
+            return True
+        # Cooldown over: allow exactly one trial request at a time
+        return now >= host.ejected_until and not host.probing
+
+    def pick(self, model: str, session_id: Optional[str] = None,
+             exclude: Iterable[OllamaHost] = ()) -> OllamaHost:
+        """
+        Choose a host for one request
+        
+        Raises:
+            LLMError: If no configured host serves the model
+        """
+        excluded = set(exclude)
+        serving = [h for h in self.hosts if h.serves(model) and h not in excluded]
+        if not serving:
+            raise LLMError(f"No Ollama host configured for model {model}")
+
+        now = time.monotonic()
+        candidates = [h for h in serving if self._routable(h, now)]
+        if not candidates:
+            # Every host is down: fail open to the one that recovers soonest
+            # rather than refusing all traffic
+            return min(serving, key=lambda h: (not h.healthy, h.ejected_until))
+
+        if session_id is not None:
+            sticky = self._sticky.get(session_id)
+            if sticky in candidates:
+                self._sticky.move_to_end(session_id)
+                return sticky
+
+        best = min((h.outstanding + 1) / h.weight for h in candidates)
+        return random.choice([h for h in candidates if (h.outstanding + 1) / h.weight == best])
+
+    def can_route(self, model: str, exclude: Iterable[OllamaHost] = ()) -> bool:
+        """Whether a routable host outside `exclude` serves the model
+
+        Stricter than pick(), which fails open to ejected or unhealthy hosts
+        rather than refusing a request outright.
+        """
+        excluded = set(exclude)
+        now = time.monotonic()
+        return any(h.serves(model) and h not in excluded and self._routable(h, now)
+                   for h in self.hosts)
+
+    @asynccontextmanager
+    async def route(self, model: str, session_id: Optional[str] = None,
+                    exclude: Iterable[OllamaHost] = ()) -> AsyncIterator[OllamaHost]:
+        """Pick a host and account for the request's outcome when the block exits"""
+        host = self.pick(model, session_id, exclude)
+        if host.ejected:
+            host.probing = True
+        host.outstanding += 1
+        host.requests += 1
+        try:
+            yield host
+        except BaseException as e:
+            if is_host_failure(e):
+                self.record_failure(host)
+            elif host.probing:
+                host.probing = False
+            raise
+        else:
+            self.record_success(host)
+            if session_id is not None:
+                self._remember(session_id, host)
+        finally:
+            host.outstanding -= 1
+
+    def record_success(self, host: OllamaHost) -> None:
+        host.consecutive_failures = 0
+        host.ejected_until = 0.0
+        host.probing = False
+
+    def record_failure(self, host: OllamaHost) -> None:
+        host.failures += 1
+        host.consecutive_failures += 1
+        host.probing = False
+        if host.ejected or host.consecutive_failures >= self.max_failures:
+            if not host.ejected:
+                host.ejections += 1
+            host.ejected_until = time.monotonic() + self.eject_seconds
+
+    def _remember(self, session_id: str, host: OllamaHost) -> None:
+        self._sticky[session_id] = host
+        self._sticky.move_to_end(session_id)
+        while len(self._sticky) > self.sticky_capacity:
+            self._sticky.popitem(last=False)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Per-host routing state for monitoring"""
+        return [
+            {
+                "url": h.url,
+                "weight": h.weight,
+                "models": list(h.models),
+                "outstanding": h.outstanding,
+                "requests": h.requests,
+                "failures": h.failures,
+                "consecutive_failures": h.consecutive_failures,
+                "ejected": h.ejected,
+                "healthy": h.healthy,
+                "ejections": h.ejections,
+            }
+            for h in self.hosts
+        ]
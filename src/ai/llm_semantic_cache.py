@@ -0,0 +1,212 @@
+from __future__ import annotations
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency: only needed when the semantic cache is enabled
+    np = None
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_request(text: str) -> str:
+    """Case-, punctuation- and whitespace-insensitive form of a request, for embedding"""
+    return _WHITESPACE.sub(" ", _PUNCTUATION.sub(" ", text.lower())).strip()
+
+
+class _HyperplaneLSH:
+    """Random-hyperplane LSH over unit vectors: candidate lookup for large indexes"""
+
+    def __init__(self, dim: int, tables: int = 8, bits: int = 10, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        self.planes = rng.standard_normal((tables, bits, dim)).astype(np.float32)
+        self.weights = 1 << np.arange(bits)
+        self.buckets: List[Dict[int, Set[int]]] = [{} for _ in range(tables)]
+
+    def _signatures(self, vector: "np.ndarray") -> List[int]:
+        bits = (self.planes @ vector) > 0  # (tables, bits)
+        return [int(code) for code in bits @ self.weights]
+
+    def add(self, entry_id: int, vector: "np.ndarray") -> None:
+        for table, signature in zip(self.buckets, self._signatures(vector)):
+            table.setdefault(signature, set()).add(entry_id)
+
+    def remove(self, entry_id: int, vector: "np.ndarray") -> None:
+        for table, signature in zip(self.buckets, self._signatures(vector)):
+            bucket = table.get(signature)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del table[signature]
+
+    def candidates(self, vector: "np.ndarray") -> Set[int]:
+        found: Set[int] = set()
+        for table, signature in zip(self.buckets, self._signatures(vector)):
+            found |= table.get(signature, set())
+        return found
+
+
+class SemanticCache:
+    """
+    Nearest-neighbour response cache over request embeddings
+    
+    Small indexes are searched by brute-force cosine similarity in NumPy;
+    past `ann_threshold` entries a random-hyperplane LSH narrows the search
+    to candidate buckets before exact re-ranking. Entries are scoped by a
+    namespace (model and generation options) and evicted least recently used.
+    """
+
+    def __init__(self, threshold: float = 0.95, max_entries: int = 10_000,
+                 ann_threshold: int = 5_000, path: Optional[str] = None):
+        """
+        Args:
+            threshold: Minimum cosine similarity to serve a cached response
+            max_entries: Index capacity; least recently used entries are evicted
+            ann_threshold: Index size above which LSH candidate search is used
+            path: File prefix for persistence (<path>.npy and <path>.json); None keeps it in memory
+        """
+        if np is None:
+            raise RuntimeError("The semantic cache requires numpy (pip install numpy)")
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ann_threshold = ann_threshold
+        self.path = path
+        self._lock = threading.Lock()
+
+        self._vectors: Optional["np.ndarray"] = None  # (capacity, dim) unit rows
+        self._ids: List[int] = []                     # row -> entry id
+        self._rows: Dict[int, int] = {}               # entry id -> row
+        self._entries: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()  # id -> entry, LRU order
+        self._next_id = 0
+        self._lsh: Optional[_HyperplaneLSH] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if path and os.path.exists(path + ".json"):
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @staticmethod
+    def _unit(embedding: Sequence[float]) -> "np.ndarray":
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else vector
+
+    def lookup(self, embedding: Sequence[float], namespace: str) -> Optional[Tuple[str, float]]:
+        """Return (response, similarity) of the closest entry above the threshold, if any"""
+        query = self._unit(embedding)
+        with self._lock:
+            match = self._nearest(query, namespace)
+            if match is None:
+                self.misses += 1
+                return None
+            entry_id, similarity = match
+            self._entries.move_to_end(entry_id)
+            self.hits += 1
+            return self._entries[entry_id]["response"], similarity
+
+    def _nearest(self, query: "np.ndarray", namespace: str) -> Optional[Tuple[int, float]]:
+        if not self._ids:
+            return None
+        if self._lsh is not None:
+            rows = [self._rows[i] for i in self._lsh.candidates(query)]
+            if not rows:
+                return None
+            rows_array = np.fromiter(rows, dtype=np.int64, count=len(rows))
+            scores = self._vectors[rows_array] @ query
+        else:
+            rows_array = np.arange(len(self._ids))
+            scores = self._vectors[:len(self._ids)] @ query
+        for position in np.argsort(-scores):
+            score = float(scores[position])
+            if score < self.threshold:
+                return None
+            entry_id = self._ids[int(rows_array[position])]
+            if self._entries[entry_id]["namespace"] == namespace:
+                return entry_id, score
+        return None
+
+    def add(self, embedding: Sequence[float], namespace: str, response: str) -> None:
+        vector = self._unit(embedding)
+        with self._lock:
+            self._insert(vector, {"namespace": namespace, "response": response})
+            while len(self._ids) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _insert(self, vector: "np.ndarray", entry: Dict[str, Any]) -> None:
+        if self._vectors is None:
+            self._vectors = np.zeros((16, vector.shape[0]), dtype=np.float32)
+        elif vector.shape[0] != self._vectors.shape[1]:
+            raise ValueError("Embedding dimension changed; clear the semantic cache")
+        if len(self._ids) == self._vectors.shape[0]:
+            grown = np.zeros((self._vectors.shape[0] * 2, self._vectors.shape[1]), dtype=np.float32)
+            grown[:len(self._ids)] = self._vectors[:len(self._ids)]
+            self._vectors = grown
+        entry_id, row = self._next_id, len(self._ids)
+        self._next_id += 1
+        self._vectors[row] = vector
+        self._ids.append(entry_id)
+        self._rows[entry_id] = row
+        self._entries[entry_id] = entry
+        if self._lsh is not None:
+            self._lsh.add(entry_id, vector)
+        elif len(self._ids) > self.ann_threshold:
+            self._lsh = _HyperplaneLSH(self._vectors.shape[1])
+            for i, r in self._rows.items():
+                self._lsh.add(i, self._vectors[r])
+
+    def _remove(self, entry_id: int) -> None:
+        """Delete by moving the last row into the freed slot"""
+        row, last = self._rows.pop(entry_id), len(self._ids) - 1
+        if self._lsh is not None:
+            self._lsh.remove(entry_id, self._vectors[row])
+        if row != last:
+            moved = self._ids[last]
+            self._vectors[row] = self._vectors[last]
+            self._ids[row] = moved
+            self._rows[moved] = row
+        self._ids.pop()
+        del self._entries[entry_id]
+
+    def save(self) -> None:
+        """Persist vectors and entries to `path` (no-op without a path)"""
+        if not self.path:
+            return
+        with self._lock:
+            order = list(self._entries)  # least recently used first, so reloading keeps LRU order
+            rows = [self._rows[i] for i in order]
+            vectors = self._vectors[rows] if rows else np.zeros((0, 0), dtype=np.float32)
+            entries = [self._entries[i] for i in order]
+        np.save(self.path + ".npy", vectors)
+        with open(self.path + ".json", "w", encoding="utf-8") as f:
+            json.dump(entries, f)
+
+    def _load(self) -> None:
+        vectors = np.load(self.path + ".npy")
+        with open(self.path + ".json", encoding="utf-8") as f:
+            entries = json.load(f)
+        for vector, entry in zip(vectors, entries):
+            self._insert(vector.astype(np.float32), entry)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for monitoring"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._ids),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "ann": self._lsh is not None,
+        }
@@ -1,99 +1,1130 @@
 from __future__ import annotations
 import asyncio
-import json
-from typing import Optional
-import requests
+import logging
+import time
+from contextlib import aclosing, asynccontextmanager
+from dataclasses import dataclass, field
+from typing import (Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Sequence, Tuple,
+                    Type, TypeVar, Union)
+import httpx
+from pydantic import BaseModel, ValidationError
 
 from .config import settings
+from .llm_admission import BATCH, INTERACTIVE, AdmissionController
+from .llm_backends import LLMBackend, LLMChunk, LLMResponse, create_backend
+from .llm_cache import ResponseCache
+from .llm_conversations import Conversation, ConversationStore
+from .llm_deadlines import AdaptiveTimeouts, llm_deadline, remaining
+from .llm_hedging import HedgePolicy
+from .llm_errors import LLMOutputError, LLMTimeoutError
+from .llm_health import HealthProber
+from .llm_json import IncrementalJSONObject
+from .llm_metrics import Histogram, LLMMetrics
+from .llm_predicates import CompletionPredicate
+from .llm_retry import RetryPolicy, process_budget
+from .llm_profiles import GenerationProfile, ProfileStats, get_profile
+from .llm_router import HostRouter, OllamaHost
+from .llm_semantic_cache import SemanticCache, normalize_request
+from .llm_singleflight import SingleFlight
+from .llm_tokens import Prompt, PromptSection, TokenCounter, fit_prompt
+from .llm_tiers import TierPolicy
+from .llm_warmup import ModelKeeper
+
+logger = logging.getLogger(__name__)
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+@dataclass
+class EarlyStopResult:
+    """Outcome of generate_until"""
+    text: str
+    stopped_early: bool  # predicate fired and the connection was closed
+    tokens_generated: int
+    tokens_saved: int  # estimate: typical full-run length for the profile minus tokens_generated
+
+
+@dataclass
+class BatchResult:
+    """Outcome of generate_many: results in input order plus throughput"""
+    results: List[Union[str, BaseException]] = field(default_factory=list)
+    completed: int = 0
+    failed: int = 0
+    tokens: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def prompts_per_second(self) -> float:
+        return self.completed / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    @property
+    def tokens_per_second(self) -> float:
+        return self.tokens / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
 
 class LLMService:
-    """LLM service adapter that supports Ollama API calls"""
+    """LLM service over Ollama or another inference server (see llm_backends)"""
     
-    def __init__(self):
-        """Initialize LLM service with Ollama configuration"""
-        if not settings.OLLAMA_HOST or not settings.OLLAMA_MODEL:
+    def __init__(self, client: Optional[httpx.AsyncClient] = None,
+                 cache: Optional[ResponseCache] = None,
+                 hosts: Optional[List[OllamaHost]] = None,
+                 backend: Optional[LLMBackend] = None):
+        """
+        Initialize LLM service with Ollama configuration
+        
+        Args:
+            client: Optional pre-configured HTTP client for a single host. When
+                omitted, each host gets a pooled keep-alive client on first use,
+                owned by the service.
+            cache: Optional response cache. When omitted, one is built from
+                settings (if LLM_CACHE_ENABLED).
+            hosts: Optional Ollama backends to route across. When omitted they
+                come from OLLAMA_HOSTS, or the single OLLAMA_HOST.
+            backend: Optional server adapter. When omitted, LLM_BACKEND picks one.
+        """
+        if not settings.OLLAMA_MODEL or not (hosts or settings.OLLAMA_HOSTS or settings.OLLAMA_HOST):
             raise ValueError("OLLAMA_HOST and OLLAMA_MODEL must be configured")
-        self.host = str(settings.OLLAMA_HOST).rstrip("/")
         self.model = settings.OLLAMA_MODEL
+        self.backend = backend or create_backend(settings.LLM_BACKEND, api_key=settings.LLM_API_KEY)
+        if hosts is None:
+            if settings.OLLAMA_HOSTS:
+                hosts = [OllamaHost(url=str(h.url), weight=h.weight, models=tuple(h.models))
+                         for h in settings.OLLAMA_HOSTS]
+            else:
+                hosts = [OllamaHost(url=str(settings.OLLAMA_HOST))]
+        if client is not None:
+            if len(hosts) != 1:
+                raise ValueError("An explicit client can only be used with a single host")
+            hosts[0].client, hosts[0].owns_client = client, False
+        self.router = HostRouter(
+            hosts,
+            max_failures=settings.LLM_HOST_MAX_FAILURES,
+            eject_seconds=settings.LLM_HOST_EJECT_SECONDS,
+            sticky_capacity=settings.LLM_STICKY_SESSIONS,
+        )
+        self.host = self.router.hosts[0].url
+        self.hedging: Optional[HedgePolicy] = None
+        if settings.LLM_HEDGING_ENABLED and len(self.router.hosts) > 1:
+            self.hedging = HedgePolicy(
+                percentile=settings.LLM_HEDGE_PERCENTILE,
+                budget_ratio=settings.LLM_HEDGE_BUDGET,
+                min_delay_seconds=settings.LLM_HEDGE_MIN_DELAY_SECONDS,
+            )
+        self._owns_cache = cache is None
+        if cache is None and settings.LLM_CACHE_ENABLED:
+            cache = ResponseCache(
+                max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+                max_bytes=settings.LLM_CACHE_MAX_BYTES,
+                ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+                path=settings.LLM_CACHE_PATH,
+            )
+        self.cache = cache
+        self.semantic_cache: Optional[SemanticCache] = None
+        if settings.LLM_SEMANTIC_CACHE_ENABLED:
+            self.semantic_cache = SemanticCache(
+                threshold=settings.LLM_SEMANTIC_CACHE_THRESHOLD,
+                max_entries=settings.LLM_SEMANTIC_CACHE_MAX_ENTRIES,
+                ann_threshold=settings.LLM_SEMANTIC_CACHE_ANN_THRESHOLD,
+                path=settings.LLM_SEMANTIC_CACHE_PATH,
+            )
+        self.flights = SingleFlight() if settings.LLM_SINGLE_FLIGHT else None
+        self.tiers: Optional[TierPolicy] = None
+        if settings.LLM_SMALL_MODEL:
+            self.tiers = TierPolicy(
+                small_model=settings.LLM_SMALL_MODEL,
+                large_model=self.model,
+                small_profiles=settings.LLM_SMALL_MODEL_PROFILES,
+                max_prompt_chars=settings.LLM_SMALL_MODEL_MAX_PROMPT_CHARS,
+                max_complexity=settings.LLM_SMALL_MODEL_MAX_COMPLEXITY,
+            )
+        self.retries: Optional[RetryPolicy] = None
+        if settings.LLM_RETRY_ENABLED:
+            self.retries = RetryPolicy(
+                max_attempts=settings.LLM_RETRY_MAX_ATTEMPTS,
+                base_delay_seconds=settings.LLM_RETRY_BASE_DELAY_SECONDS,
+                max_delay_seconds=settings.LLM_RETRY_MAX_DELAY_SECONDS,
+                budget=process_budget(settings.LLM_RETRY_BUDGET),
+            )
+        self.admission = AdmissionController(
+            max_in_flight=settings.LLM_MAX_IN_FLIGHT,
+            max_queue=settings.LLM_MAX_QUEUE,
+            max_wait_seconds=settings.LLM_MAX_QUEUE_WAIT_SECONDS,
+            max_batch_wait_seconds=settings.LLM_BATCH_MAX_QUEUE_WAIT_SECONDS,
+            max_batch_in_flight=settings.LLM_BATCH_MAX_IN_FLIGHT,
+            batch_aging_seconds=settings.LLM_BATCH_AGING_SECONDS,
+            is_available=self._backend_available,
+        )
+        self.conversations = ConversationStore(
+            max_conversations=settings.LLM_CONVERSATIONS_MAX,
+            max_bytes=settings.LLM_CONVERSATIONS_MAX_BYTES,
+            max_context_tokens=settings.LLM_CONVERSATION_MAX_TOKENS,
+        )
+        self.profile_stats: Dict[str, ProfileStats] = {}
+        self.tokens = TokenCounter(settings.LLM_TOKENIZER)
+        self.timeouts: Optional[AdaptiveTimeouts] = None
+        if settings.LLM_ADAPTIVE_TIMEOUTS:
+            self.timeouts = AdaptiveTimeouts(
+                percentile=settings.LLM_TIMEOUT_PERCENTILE,
+                multiplier=settings.LLM_TIMEOUT_MULTIPLIER,
+                floor_seconds=settings.LLM_TIMEOUT_MIN_SECONDS,
+            )
+        self.metrics = LLMMetrics()
+        # Calls that paid for loading the model are tracked apart from steady state
+        self.cold_start_latency = Histogram()
+        self.steady_latency = Histogram()
+        self.keeper: Optional[ModelKeeper] = None
+        if settings.LLM_KEEPER_ENABLED:
+            self.keeper = ModelKeeper(
+                self,
+                hours=settings.LLM_KEEPER_HOURS,
+                weekdays=settings.LLM_KEEPER_WEEKDAYS,
+                interval_seconds=settings.LLM_KEEPER_INTERVAL_SECONDS,
+                timezone=settings.LLM_KEEPER_TIMEZONE,
+            )
+        self.prober: Optional[HealthProber] = None
+        if settings.LLM_HEALTH_PROBE_ENABLED:
+            self.prober = HealthProber(
+                self,
+                interval_seconds=settings.LLM_HEALTH_PROBE_INTERVAL_SECONDS,
+                timeout_seconds=settings.LLM_HEALTH_PROBE_TIMEOUT_SECONDS,
+                max_failures=settings.LLM_HEALTH_PROBE_MAX_FAILURES,
+            )
+        self._prober_started = False
+
+    @staticmethod
+    def _build_client(base_url: str) -> httpx.AsyncClient:
+        """Create the long-lived per-host connection pool used for every Ollama call"""
+        limits = httpx.Limits(
+            max_connections=settings.OLLAMA_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.OLLAMA_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.OLLAMA_KEEPALIVE_EXPIRY_SECONDS,
+        )
+        timeout = httpx.Timeout(
+            connect=settings.CONNECT_TIMEOUT_SECONDS,
+            read=settings.TIMEOUT_SECONDS,
+            write=settings.TIMEOUT_SECONDS,
+            pool=settings.POOL_TIMEOUT_SECONDS,
+        )
+        return httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout)
+
+    def _client_for(self, host: OllamaHost) -> httpx.AsyncClient:
+        """Host's shared HTTP client, created lazily inside the running event loop"""
+        if host.client is None or host.client.is_closed:
+            host.client = self._build_client(host.url)
+            host.owns_client = True
+        return host.client
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """HTTP client of the primary host"""
+        return self._client_for(self.router.hosts[0])
+
+    async def aclose(self) -> None:
+        """Stop background tasks and close the connection pools (only those this service created)"""
+        if self.keeper is not None:
+            await self.keeper.stop()
+        if self.prober is not None:
+            await self.prober.stop()
+        for host in self.router.hosts:
+            if host.client is not None and host.owns_client:
+                await host.client.aclose()
+                host.client = None
+        if self.cache is not None and self._owns_cache:
+            await self.cache.aclose()
+        if self.semantic_cache is not None:
+            self.semantic_cache.save()
+
+    async def __aenter__(self) -> "LLMService":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+        
+    def _build_payload(self, prompt: Prompt, max_tokens: Optional[int],
+                       temperature: Optional[float], stream: bool,
+                       profile: GenerationProfile,
+                       complexity: Optional[float] = None) -> Dict[str, Any]:
+        """Build the /api/generate request body; explicit arguments override the profile"""
+        num_predict = max_tokens or profile.num_predict
+        prompt = self._fit_prompt(prompt, profile, num_predict)
+        model = self.model
+        if self.tiers is not None:
+            model = self.tiers.choose(profile.name, prompt, complexity)
+        payload = {
+            "model": model,
+            "prompt": prompt,
+            "stream": stream,
+            "options": {
+                "temperature": temperature if temperature is not None else profile.temperature,
+                "num_predict": num_predict
+            }
+        }
+        if profile.stop:
+            payload["options"]["stop"] = list(profile.stop)
+        if settings.OLLAMA_KEEP_ALIVE is not None:
+            payload["keep_alive"] = settings.OLLAMA_KEEP_ALIVE
+        return payload
+
+    def _fit_prompt(self, prompt: Prompt, profile: GenerationProfile, num_predict: int) -> str:
+        """Trim low-priority sections to the profile's prompt token budget and record the size"""
+        budget = profile.max_prompt_tokens or max(1, settings.LLM_CONTEXT_WINDOW - num_predict)
+        sections = [PromptSection(prompt)] if isinstance(prompt, str) else prompt
+        text, tokens, trimmed = fit_prompt(sections, budget, self.tokens)
+        self.profile_stats.setdefault(profile.name, ProfileStats()).record_prompt(tokens, bool(trimmed))
+        logger.debug("Prompt: %d tokens (%s profile, budget %d)", tokens, profile.name, budget)
+        if trimmed:
+            logger.info("Trimmed %s to fit the %s profile's %d-token prompt budget",
+                        ", ".join(trimmed), profile.name, budget)
+        if tokens > budget:
+            logger.warning("Prompt is %d tokens, over the %s profile's %d-token budget",
+                           tokens, profile.name, budget)
+        return text
+
+    def _record_output(self, profile: GenerationProfile, text: str, stats: Dict[str, Any],
+                       num_predict: int) -> None:
+        """Track actual output length per profile so budgets can be tuned from data"""
+        self.profile_stats.setdefault(profile.name, ProfileStats()).record(text, stats, num_predict)
+
+    def profile_report(self) -> Dict[str, Dict[str, Any]]:
+        """Observed output lengths and truncation counts per generation profile"""
+        return {name: stats.snapshot() for name, stats in self.profile_stats.items()}
+
+    def _record_call(self, payload: Dict[str, Any], profile: GenerationProfile,
+                     stats: Dict[str, Any], wall_seconds: float,
+                     ttft_seconds: Optional[float] = None) -> None:
+        """Record a completed generation's latency breakdown"""
+        self._record_latency(wall_seconds, stats)
+        if self.tiers is not None:
+            self.tiers.record(payload["model"], wall_seconds)
+        self.metrics.record(payload["model"], profile.name, stats, wall_seconds, ttft_seconds)
+
+    def metrics_snapshot(self) -> Dict[str, Any]:
+        """
+        In-process view of every LLM metric, for dashboards and debugging
+        
+        `latency` breaks calls down by model and profile into time to first
+        token, model load time, prefill and decode throughput, and overhead
+        (wall time Ollama did not account for: network and queueing).
+        """
+        return {
+            "latency": self.metrics.snapshot(),
+            "cold_start_seconds": self.cold_start_latency.snapshot(),
+            "steady_state_seconds": self.steady_latency.snapshot(),
+            "profiles": self.profile_report(),
+            "admission": self.admission.stats(),
+            "timeouts": self.timeouts.stats() if self.timeouts is not None else None,
+            "cache": self.cache.stats() if self.cache is not None else None,
+            "semantic_cache": self.semantic_cache.stats() if self.semantic_cache is not None else None,
+            "single_flight": self.flights.stats() if self.flights is not None else None,
+            "hedging": self.hedging.stats() if self.hedging is not None else None,
+            "retries": self.retries.stats() if self.retries is not None else None,
+            "tiers": self.tiers.stats() if self.tiers is not None else None,
+            "hosts": self.router.stats(),
+            "health": self.prober.snapshot() if self.prober is not None else None,
+            "conversations": self.conversations.stats(),
+        }
+
+    def _record_latency(self, seconds: float, stats: Dict[str, Any]) -> None:
+        """File a call's latency as cold-start or steady-state using Ollama's load_duration"""
+        load_seconds = stats.get("load_duration", 0) / 1e9
+        if load_seconds >= settings.LLM_COLD_START_THRESHOLD_SECONDS:
+            self.cold_start_latency.observe(seconds)
+        else:
+            self.steady_latency.observe(seconds)
+
+    async def warmup(self, keep_alive: Optional[Union[int, str]] = None
+                     ) -> Dict[str, Dict[str, Optional[float]]]:
+        """
+        Preload every model in use (each tier's, when tiering is on) on every host that serves it
+        
+        Sends a zero-token request, which makes Ollama load the model and
+        hold it for `keep_alive`.
         
-    async def generate(self, prompt: str, max_tokens: Optional[int] = None, 
-                      temperature: Optional[float] = None) -> str:
+        Args:
+            keep_alive: Ollama keep_alive (seconds or duration string);
+                default OLLAMA_KEEP_ALIVE
+            
+        Returns:
+            Seconds each host took to answer, keyed by model and then host URL
+            (None if it failed)
+        """
+        if keep_alive is None:
+            keep_alive = settings.OLLAMA_KEEP_ALIVE
+
+        async def load(model: str, host: OllamaHost) -> Optional[float]:
+            started = time.perf_counter()
+            try:
+                stats = await self.backend.load(self._client_for(host), model, keep_alive)
+            except Exception as e:
+                logger.warning("Warm-up of %s on %s failed: %s", model, host.url, e)
+                return None
+            elapsed = time.perf_counter() - started
+            self._record_latency(elapsed, stats)
+            return elapsed
+
+        models = [self.model]
+        if self.tiers is not None and self.tiers.small_model != self.model:
+            models.append(self.tiers.small_model)
+        targets = [(m, h) for m in models for h in self.router.hosts if h.serves(m)]
+        timings = await asyncio.gather(*(load(m, h) for m, h in targets))
+        result: Dict[str, Dict[str, Optional[float]]] = {m: {} for m in models}
+        for (model, host), seconds in zip(targets, timings):
+            result[model][host.url] = seconds
+        return result
+
+    def start_keeper(self) -> None:
+        """Start the business-hours keep-alive task (requires LLM_KEEPER_ENABLED)"""
+        if self.keeper is None:
+            raise RuntimeError("Model keeper is disabled; set LLM_KEEPER_ENABLED")
+        self.keeper.start_background()
+
+    def start_health_prober(self) -> None:
+        """
+        Start probing every host in the background (requires LLM_HEALTH_PROBE_ENABLED)
+        
+        Called automatically by the first health_check() or generation, so
+        services only need it to start probing earlier.
+        """
+        if self.prober is None:
+            raise RuntimeError("Health prober is disabled; set LLM_HEALTH_PROBE_ENABLED")
+        self._prober_started = True
+        self.prober.start_background()
+
+    def _ensure_prober(self) -> None:
+        """Start the health prober on first use, since that is the first point with a running loop"""
+        if self.prober is not None and not self._prober_started:
+            self.start_health_prober()
+
+    def _backend_available(self) -> bool:
+        return self.prober is None or self.prober.available
+
+    @staticmethod
+    def _request_key(payload: Dict[str, Any], **extra: Any) -> str:
+        """Digest identifying requests that must produce the same output"""
+        options = payload["options"]
+        if "stop" in options:
+            extra["stop"] = options["stop"]
+        return ResponseCache.make_key(
+            payload["model"], payload["prompt"], options["temperature"], options["num_predict"],
+            **extra
+        )
+
+    def _use_cache(self, payload: Dict[str, Any], use_cache: Optional[bool]) -> bool:
+        """Whether a request may be served from / stored in the response cache"""
+        if self.cache is None:
+            return False
+        if use_cache is None:
+            # Sampled output is not reproducible, so only cache it when opted in
+            return payload["options"]["temperature"] <= 0 or settings.LLM_CACHE_NONDETERMINISTIC
+        return use_cache
+
+    def conversation(self, conversation_id: str) -> Conversation:
+        """Handle whose turns reuse Ollama's context instead of re-sending earlier prompts"""
+        return Conversation(self, conversation_id)
+
+    async def generate(self, prompt: Prompt, max_tokens: Optional[int] = None, 
+                      temperature: Optional[float] = None,
+                      use_cache: Optional[bool] = None,
+                      session_id: Optional[str] = None,
+                      conversation_id: Optional[str] = None,
+                      profile: Optional[str] = None,
+                      semantic_key: Optional[str] = None,
+                      complexity: Optional[float] = None,
+                      validate: Optional[Callable[[str], bool]] = None,
+                      priority: str = INTERACTIVE,
+                      timeout: Optional[float] = None) -> str:
         """
         Generate text from Ollama API
         
         Args:
-            prompt: Input text to generate from
-            max_tokens: Maximum tokens to generate (default from settings)
-            temperature: Generation temperature (default from settings)
+            prompt: Input text to generate from, or PromptSections; low-priority
+                sections are trimmed to the profile's prompt token budget
+            max_tokens: Maximum tokens to generate (default from the profile)
+            temperature: Generation temperature (default from the profile)
+            use_cache: Force the response cache on/off for this call. By default
+                only deterministic (temperature <= 0) calls are cached.
+            session_id: Conversation id; keeps its requests on the same host
+            conversation_id: Continue this conversation from its stored Ollama
+                context, so only `prompt` is prefilled (implies session_id)
+            profile: Generation profile name (e.g. "confirmation"); supplies
+                num_predict, stop sequences, temperature and timeout. Default
+                uses MAX_TOKENS/TEMPERATURE.
+            semantic_key: Opt into the semantic cache, matching on this text
+                (typically the user's request rather than the whole prompt).
+                Differently phrased requests above LLM_SEMANTIC_CACHE_THRESHOLD
+                similarity share one answer.
+            complexity: Optional 0-1 difficulty score; above
+                LLM_SMALL_MODEL_MAX_COMPLEXITY the large model is used
+            validate: Output check; if the small model's answer fails it, the
+                request is retried once on the large model
+            priority: Admission class, "interactive" (default) or "batch";
+                interactive calls are scheduled first
+            timeout: Seconds this call may take, queueing included. Narrows
+                any deadline set with llm_deadline(); the profile's (learned)
+                limit applies as well.
             
         Returns:
             Generated text response
             
         Raises:
+            LLMOverloadedError: If admission control has no capacity for the call
+            LLMTimeoutError: If the deadline or the profile's time limit passes
             RuntimeError: If Ollama API call fails
         """
-        url = f"{self.host}/api/generate"
-        payload = {
-            "model": self.model,
-            "prompt": prompt,
-            "stream": False,  # Disable streaming for simpler response handling
-            "options": {
-                "temperature": temperature if temperature is not None else settings.TEMPERATURE,
-                "num_predict": max_tokens or settings.MAX_TOKENS
-            }
-        }
+        with llm_deadline(timeout):
+            response = await self._generate(prompt, max_tokens=max_tokens, temperature=temperature,
+                                            use_cache=use_cache, session_id=session_id,
+                                            conversation_id=conversation_id, profile=profile,
+                                            semantic_key=semantic_key, complexity=complexity,
+                                            validate=validate, priority=priority)
+        return response.text
+
+    async def _generate(self, prompt: Prompt, max_tokens: Optional[int] = None,
+                        temperature: Optional[float] = None,
+                        use_cache: Optional[bool] = None,
+                        session_id: Optional[str] = None,
+                        conversation_id: Optional[str] = None,
+                        profile: Optional[str] = None,
+                        semantic_key: Optional[str] = None,
+                        complexity: Optional[float] = None,
+                        validate: Optional[Callable[[str], bool]] = None,
+                        priority: str = INTERACTIVE) -> LLMResponse:
+        """generate() returning the full LLMResponse (text plus Ollama stats)"""
+        spec = get_profile(profile)
+        payload = self._build_payload(prompt, max_tokens, temperature, stream=False, profile=spec,
+                                      complexity=complexity)
+        if conversation_id is not None:
+            # Ollama's context tokens belong to one model, so conversations are not tiered
+            payload["model"] = self.model
+            return await self._generate_in_conversation(payload, conversation_id, session_id, spec,
+                                                        priority)
+        response = await self._generate_payload(payload, spec, use_cache, session_id, semantic_key,
+                                                priority)
+        if validate is not None and not validate(response.text):
+            larger = self.tiers.escalate(payload["model"]) if self.tiers is not None else None
+            if larger is not None:
+                payload = {**payload, "model": larger}
+                response = await self._generate_payload(payload, spec, use_cache, session_id,
+                                                        semantic_key, priority)
+        return response
+
+    async def _generate_payload(self, payload: Dict[str, Any], spec: GenerationProfile,
+                                use_cache: Optional[bool], session_id: Optional[str],
+                                semantic_key: Optional[str], priority: str) -> LLMResponse:
+        """Serve a built request from the caches, a coalesced flight or a new generation"""
+        key = self._request_key(payload)
+        cacheable = self._use_cache(payload, use_cache)
+        if cacheable:
+            cached = await self.cache.aget(key)
+            if cached is not None:
+                return LLMResponse(text=cached)
+
+        embedding: Optional[List[float]] = None
+        namespace = self._request_key({**payload, "prompt": ""})  # model and options only
+        if semantic_key is not None and self.semantic_cache is not None:
+            embedding = await self._semantic_embedding(semantic_key)
+            if embedding is not None:
+                hit = self.semantic_cache.lookup(embedding, namespace)
+                if hit is not None:
+                    return LLMResponse(text=hit[0])
+
+        async def fetch() -> LLMResponse:
+            response = await self._admitted_post(payload, session_id, spec, priority)
+            if cacheable:
+                await self.cache.aput(key, response.text)
+            if embedding is not None:
+                self.semantic_cache.add(embedding, namespace, response.text)
+            return response
+
+        if self.flights is None:
+            return await fetch()
+        # Identical requests already on the wire share that generation (within a priority
+        # class, so a chat turn never waits behind a queued batch request). The shared call
+        # runs to the leader's deadline; each follower stops waiting at its own.
+        async with self._within_deadline():
+            return await self.flights.do(f"{key}:{cacheable}:{priority}", fetch)
+
+    async def _semantic_embedding(self, text: str) -> Optional[List[float]]:
+        """Embedding for a semantic-cache lookup; failures just skip the cache"""
+        try:
+            return (await self.embed([normalize_request(text)]))[0]
+        except Exception as e:
+            logger.warning("Semantic cache skipped, embedding failed: %s", e)
+            return None
+
+    async def embed(self, texts: Sequence[str], model: Optional[str] = None) -> List[List[float]]:
+        """
+        Embed texts with the backend's embedding endpoint
         
+        Args:
+            texts: Inputs to embed
+            model: Embedding model (default OLLAMA_EMBED_MODEL)
+            
+        Returns:
+            One vector per input, in order
+            
+        Raises:
+            RuntimeError: If the API call fails
+        """
+        model = model or settings.OLLAMA_EMBED_MODEL
+        async with self.router.route(model) as host:
+            return await self.backend.embed(self._client_for(host), model, texts)
+
+    async def _generate_in_conversation(self, payload: Dict[str, Any], conversation_id: str,
+                                        session_id: Optional[str], profile: GenerationProfile,
+                                        priority: str = INTERACTIVE) -> LLMResponse:
+        """Stateful turn: never cached or coalesced, and pinned to the conversation's host"""
+        context = self.conversations.get(conversation_id)
+        if context:
+            payload["context"] = context
+        response = await self._admitted_post(payload, session_id or conversation_id, profile,
+                                             priority)
+        if response.context:
+            self.conversations.put(conversation_id, response.context)
+        else:
+            self.conversations.drop(conversation_id)
+        return response
+
+    async def _admitted_post(self, payload: Dict[str, Any], session_id: Optional[str],
+                             profile: GenerationProfile,
+                             priority: str = INTERACTIVE) -> LLMResponse:
+        """Send a request once admission control grants a slot, recording latency and output"""
+        self._ensure_prober()
+        timeout = self._call_timeout(profile)
+        started = time.perf_counter()
+        try:
+            # Queueing counts against the budget. Cancelling on expiry closes the
+            # connection, which stops the generation and frees the Ollama slot.
+            async with asyncio.timeout(timeout):
+                async with self.admission.slot(priority):
+                    call_started = time.perf_counter()
+                    response = await self._post_generate(payload, session_id)
+                    self._record_call(payload, profile, response.stats,
+                                      time.perf_counter() - call_started)
+        except TimeoutError as e:
+            raise LLMTimeoutError(
+                f"LLM generation exceeded {timeout:.2f}s ({profile.name} profile)"
+            ) from e
+        self._record_duration(profile, started)
+        self._record_output(profile, response.text, response.stats, payload["options"]["num_predict"])
+        return response
+
+    def _call_timeout(self, profile: GenerationProfile) -> Optional[float]:
+        """Seconds a call may take: the profile's (learned) limit, cut to the caller's deadline"""
+        timeout = profile.timeout_seconds
+        if self.timeouts is not None:
+            timeout = self.timeouts.timeout_for(profile.name, timeout or settings.TIMEOUT_SECONDS)
+        left = remaining()
+        if left is not None:
+            if left <= 0:
+                raise LLMTimeoutError("LLM call deadline already passed")
+            timeout = left if timeout is None else min(timeout, left)
+        return timeout
+
+    @staticmethod
+    @asynccontextmanager
+    async def _within_deadline(expires: Optional[float] = None) -> AsyncIterator[None]:
+        """Cancel the enclosed await when the caller's deadline (llm_deadline) or `expires` passes
+        
+        `expires` is an absolute time.monotonic(), e.g. the end of a profile's time limit.
+        """
+        left = remaining()
+        if expires is not None:
+            own = expires - time.monotonic()
+            left = own if left is None else min(left, own)
         try:
-            # Make API call in thread pool to avoid blocking
-            response = await asyncio.to_thread(
-                requests.post,
-                url,
-                json=payload,
-                timeout=settings.TIMEOUT_SECONDS
+            async with asyncio.timeout(left):
+                yield
+        except TimeoutError as e:
+            raise LLMTimeoutError("LLM call deadline passed") from e
+
+    async def _post_generate(self, payload: Dict[str, Any],
+                             session_id: Optional[str] = None) -> LLMResponse:
+        """Send a non-streaming request to the best available host, retrying transient failures"""
+        if self.retries is not None:
+            self.retries.on_request()
+        attempt = 0
+        while True:
+            try:
+                if self.hedging is None:
+                    return await self._routed_post(payload, session_id, [])
+                return await self._post_generate_hedged(payload, session_id)
+            except Exception as e:
+                delay = self.retries.next_delay(e, attempt) if self.retries is not None else None
+                if delay is None:
+                    raise
+                logger.info("Retrying LLM call in %.2fs after: %s", delay, e)
+                attempt += 1
+                await asyncio.sleep(delay)
+
+    async def _routed_post(self, payload: Dict[str, Any], session_id: Optional[str],
+                           used: List[OllamaHost]) -> LLMResponse:
+        """Route one request, avoiding and then recording hosts in `used`"""
+        async with self.router.route(payload["model"], session_id, exclude=used) as host:
+            used.append(host)
+            return await self._post_generate_to(host, payload)
+
+    async def _post_generate_hedged(self, payload: Dict[str, Any],
+                                    session_id: Optional[str]) -> LLMResponse:
+        """Race a duplicate request on another host if the first one runs slow"""
+        policy = self.hedging
+        policy.on_request()
+        started = time.perf_counter()
+        used: List[OllamaHost] = []
+        primary = asyncio.ensure_future(self._routed_post(payload, session_id, used))
+        racers = [primary]
+        try:
+            delay = policy.hedge_delay()
+            if delay is not None:
+                await asyncio.wait({primary}, timeout=delay)
+                # Only spend budget when another host can actually take the duplicate
+                if (not primary.done() and self.router.can_route(payload["model"], exclude=used)
+                        and policy.try_acquire()):
+                    racers.append(asyncio.ensure_future(self._routed_post(payload, None, used)))
+
+            pending = set(racers)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        policy.record(time.perf_counter() - started, hedge_won=task is not primary)
+                        return task.result()
+            # Every racer failed: the primary's error is the one that says what went wrong
+            raise primary.exception()
+        finally:
+            # The loser is cancelled, which closes its connection and frees the Ollama slot
+            for task in racers:
+                if not task.done():
+                    task.cancel()
+
+    async def _post_generate_to(self, host: OllamaHost, payload: Dict[str, Any]) -> LLMResponse:
+        """Send a non-streaming generation request to one host"""
+        return await self.backend.generate(self._client_for(host), payload)
+    
+    async def generate_many(self, prompts: Iterable[str], concurrency: Optional[int] = None,
+                            return_exceptions: bool = False, max_tokens: Optional[int] = None,
+                            temperature: Optional[float] = None,
+                            profile: Optional[str] = None,
+                            priority: str = BATCH) -> BatchResult:
+        """
+        Generate completions for many prompts with bounded concurrency
+        
+        Args:
+            prompts: Prompts to run
+            concurrency: Requests kept outstanding to Ollama (default LLM_BATCH_CONCURRENCY)
+            return_exceptions: Put exceptions in the results instead of raising the first one
+            max_tokens: Maximum tokens to generate per prompt (default from the profile)
+            temperature: Generation temperature (default from the profile)
+            profile: Generation profile name applied to every prompt
+            priority: Admission class (default "batch", yielding to chat traffic)
+            
+        Returns:
+            BatchResult with results in input order and throughput figures
+            
+        Raises:
+            RuntimeError: First failure, unless return_exceptions is set
+        """
+        prompts = list(prompts)
+        batch = BatchResult(results=[None] * len(prompts))
+        async for index, result in self._run_batch(prompts, concurrency, return_exceptions,
+                                                    max_tokens, temperature, profile, priority,
+                                                    batch):
+            batch.results[index] = result
+        return batch
+
+    async def generate_many_as_completed(
+        self, prompts: Iterable[str], concurrency: Optional[int] = None,
+        return_exceptions: bool = False, max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None, profile: Optional[str] = None,
+        priority: str = BATCH,
+    ) -> AsyncIterator[Tuple[int, Union[str, BaseException]]]:
+        """
+        Like generate_many, but yield (input_index, result) pairs in completion order
+        
+        Throughput is logged once the iterator is exhausted.
+        """
+        async for item in self._run_batch(list(prompts), concurrency, return_exceptions,
+                                          max_tokens, temperature, profile, priority,
+                                          BatchResult()):
+            yield item
+
+    async def _run_batch(self, prompts: List[str], concurrency: Optional[int],
+                         return_exceptions: bool, max_tokens: Optional[int],
+                         temperature: Optional[float], profile: Optional[str],
+                         priority: str, batch: BatchResult,
+                         ) -> AsyncIterator[Tuple[int, Union[str, BaseException]]]:
+        """Worker pool that keeps `concurrency` requests outstanding and reports as they finish"""
+        concurrency = max(1, concurrency or settings.LLM_BATCH_CONCURRENCY)
+        pending = iter(enumerate(prompts))
+        finished: asyncio.Queue = asyncio.Queue()
+        started = time.perf_counter()
+
+        async def worker() -> None:
+            # Workers share one iterator, so each prompt is taken exactly once
+            for index, prompt in pending:
+                try:
+                    response = await self._generate(prompt, max_tokens=max_tokens,
+                                                    temperature=temperature, profile=profile,
+                                                    priority=priority)
+                    await finished.put((index, response, None))
+                except Exception as e:
+                    await finished.put((index, None, e))
+
+        workers = [asyncio.create_task(worker()) for _ in range(min(concurrency, len(prompts)))]
+        try:
+            for _ in range(len(prompts)):
+                index, response, error = await finished.get()
+                if error is not None:
+                    batch.failed += 1
+                    if not return_exceptions:
+                        raise error
+                    yield index, error
+                else:
+                    batch.completed += 1
+                    batch.tokens += response.stats.get("eval_count", 0)
+                    yield index, response.text
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            batch.elapsed_seconds = time.perf_counter() - started
+            logger.info(
+                "LLM batch: %d ok, %d failed in %.1fs (%.2f prompts/s, %.1f tokens/s)",
+                batch.completed, batch.failed, batch.elapsed_seconds,
+                batch.prompts_per_second, batch.tokens_per_second,
             )
-            response.raise_for_status()
+
+    async def generate_until(self, prompt: Prompt, predicate: CompletionPredicate,
+                             max_tokens: Optional[int] = None,
+                             temperature: Optional[float] = None,
+                             session_id: Optional[str] = None,
+                             profile: Optional[str] = None,
+                             complexity: Optional[float] = None,
+                             validate: Optional[Callable[[str], bool]] = None,
+                             priority: str = INTERACTIVE,
+                             timeout: Optional[float] = None) -> EarlyStopResult:
+        """
+        Stream a generation and hang up as soon as the answer is complete
+        
+        Closing the connection makes Ollama stop generating, which frees its
+        slot instead of spending it on tokens we would throw away.
+        
+        Args:
+            prompt: Input text to generate from, or PromptSections; low-priority
+                sections are trimmed to the profile's prompt token budget
+            predicate: Completion test, e.g. SentenceBoundary(), BalancedJSON() or
+                RegexMatch(...) from llm_predicates; use a fresh instance per call
+            max_tokens: Maximum tokens to generate (default from the profile)
+            temperature: Generation temperature (default from the profile)
+            session_id: Conversation id; keeps its requests on the same host
+            profile: Generation profile name
+            complexity: Optional 0-1 difficulty score used for model tiering
+            validate: Output check; if the small model's answer fails it, the
+                request is retried once on the large model
+            priority: Admission class, "interactive" (default) or "batch"
+            timeout: Seconds this call may take; narrows any llm_deadline()
             
-            # Parse response
-            data = response.json()
+        Returns:
+            EarlyStopResult with the text cut at the predicate's boundary
             
-            # Ollama non-streaming response format
-            if isinstance(data, dict) and "response" in data:
-                return data["response"].strip()
+        Raises:
+            LLMOverloadedError: If admission control has no capacity for the call
+            LLMTimeoutError: If the deadline passes
+            RuntimeError: If Ollama API call fails
+        """
+        spec = get_profile(profile)
+        payload = self._build_payload(prompt, max_tokens, temperature, stream=True, profile=spec,
+                                      complexity=complexity)
+        with llm_deadline(timeout):
+            result = await self._stream_until(payload, predicate, session_id, spec, priority)
+            if validate is not None and not validate(result.text):
+                larger = self.tiers.escalate(payload["model"]) if self.tiers is not None else None
+                if larger is not None:
+                    result = await self._stream_until({**payload, "model": larger}, predicate,
+                                                      session_id, spec, priority)
+        return result
+
+    async def _stream_until(self, payload: Dict[str, Any], predicate: CompletionPredicate,
+                            session_id: Optional[str], spec: GenerationProfile,
+                            priority: str) -> EarlyStopResult:
+        """One generate_until attempt for a built request"""
+        num_predict = payload["options"]["num_predict"]
+        key = self._request_key(payload, until=repr(predicate))
+        cacheable = self._use_cache(payload, None)
+        if cacheable:
+            cached = await self.cache.aget(key)
+            if cached is not None:
+                return EarlyStopResult(text=cached, stopped_early=False, tokens_generated=0,
+                                       tokens_saved=0)
+
+        # Not coalesced: hanging up would cut off every other subscriber
+        text = ""
+        tokens = 0
+        cut: Optional[int] = None
+        async with aclosing(self._admitted_stream(payload, session_id, spec, priority)) as stream:
+            async for chunk in stream:
+                text += chunk.text
+                if chunk.done:
+                    break
+                tokens += 1  # Ollama streams one token per record
+                cut = predicate(text)
+                if cut is not None:
+                    break
+
+        saved = 0
+        if cut is not None:
+            text = text[:cut]
+            stats = self.profile_stats.setdefault(spec.name, ProfileStats())
+            saved = max(0, stats.expected_tokens(num_predict) - tokens)
+            stats.record_early_stop(saved)
+        text = text.strip()
+        if cacheable:
+            await self.cache.aput(key, text)
+        return EarlyStopResult(text=text, stopped_early=cut is not None,
+                               tokens_generated=tokens, tokens_saved=saved)
+
+    async def generate_json(self, prompt: str, schema: Type[ModelT],
+                            on_field: Optional[Callable[[str, Any], None]] = None,
+                            max_tokens: Optional[int] = None,
+                            temperature: Optional[float] = None,
+                            session_id: Optional[str] = None,
+                            profile: Optional[str] = "extraction_json",
+                            repair_attempts: int = 1,
+                            complexity: Optional[float] = None,
+                            priority: str = INTERACTIVE) -> ModelT:
+        """
+        Generate structured output constrained to a pydantic model's JSON schema
+        
+        The schema is passed as Ollama's `format`, the object is parsed while it
+        streams, and the result is validated at the end. Invalid output gets a
+        bounded number of repair round-trips that show the model its errors.
+        
+        Args:
+            prompt: Input text to generate from
+            schema: Pydantic model class describing the expected object
+            on_field: Called with (name, value) as soon as each top-level field
+                is complete, before the rest of the object has arrived
+            max_tokens: Maximum tokens to generate (default from the profile)
+            temperature: Generation temperature (default from the profile)
+            session_id: Conversation id; keeps its requests on the same host
+            profile: Generation profile name (default "extraction_json")
+            repair_attempts: Extra attempts after invalid output (invalid
+                small-model output is first escalated to the large model)
+            complexity: Optional 0-1 difficulty score used for model tiering
+            priority: Admission class, "interactive" (default) or "batch"
             
-            # Fallback
-            return json.dumps(data)
+        Returns:
+            Validated instance of `schema`
             
-        except requests.exceptions.JSONDecodeError as e:
-            # If we still get streaming response, parse line by line
+        Raises:
+            LLMOutputError: If the output is still invalid after the repair attempts
+            LLMOverloadedError: If admission control has no capacity for the call
+            RuntimeError: If Ollama API call fails
+        """
+        spec = get_profile(profile)
+        json_schema = schema.model_json_schema()
+        attempt_prompt = prompt
+        model: Optional[str] = None
+        error: Optional[Exception] = None
+        attempts = repair_attempts + 1
+        while attempts > 0:
+            payload = self._build_payload(attempt_prompt, max_tokens, temperature, stream=True,
+                                          profile=spec, complexity=complexity)
+            payload["model"] = model or payload["model"]
+            payload["format"] = json_schema
+            raw = await self._stream_json(payload, session_id, spec, on_field, priority)
             try:
-                lines = response.text.strip().split('\n')
-                full_response = []
-                for line in lines:
-                    if line:
-                        chunk = json.loads(line)
-                        if "response" in chunk:
-                            full_response.append(chunk["response"])
-                return "".join(full_response).strip()
-            except Exception as parse_error:
-                raise RuntimeError(f"Failed to parse Ollama response: {parse_error}") from parse_error
-        except Exception as e:
-            raise RuntimeError(f"Ollama API call failed: {str(e)}") from e
+                return schema.model_validate_json(raw)
+            except ValidationError as e:
+                error = e
+                larger = self.tiers.escalate(payload["model"]) if self.tiers is not None else None
+                if larger is not None:
+                    # The large model gets a clean attempt before any repair round-trips
+                    model = larger
+                    continue
+                attempts -= 1
+                attempt_prompt = (
+                    f"{prompt}\n\nYour previous answer was not valid:\n{raw}\n\n"
+                    f"Problems:\n{e}\n\nReply with only the corrected JSON object."
+                )
+        raise LLMOutputError(f"Model output does not match {schema.__name__}: {error}") from error
+
+    async def _stream_json(self, payload: Dict[str, Any], session_id: Optional[str],
+                           profile: GenerationProfile,
+                           on_field: Optional[Callable[[str, Any], None]],
+                           priority: str = INTERACTIVE) -> str:
+        """Stream a JSON-format generation, reporting top-level fields as they close"""
+        key = self._request_key(payload, format=payload["format"])
+        cacheable = self._use_cache(payload, None)
+        raw = await self.cache.aget(key) if cacheable else None
+        if raw is None:
+            if self.flights is None:
+                source = self._admitted_stream(payload, session_id, profile, priority)
+            else:
+                source = self.flights.stream(
+                    f"{key}:{priority}",
+                    lambda: self._admitted_stream(payload, session_id, profile, priority))
+            parts: List[str] = []
+            parser = IncrementalJSONObject()
+            async for chunk in source:
+                parts.append(chunk.text)
+                if on_field is not None:
+                    for name, value in self._feed_json(parser, chunk.text):
+                        on_field(name, value)
+            raw = "".join(parts)
+            if cacheable:
+                await self.cache.aput(key, raw)
+        elif on_field is not None:
+            for name, value in self._feed_json(IncrementalJSONObject(), raw):
+                on_field(name, value)
+        return raw
+
+    @staticmethod
+    def _feed_json(parser: IncrementalJSONObject, text: str) -> List[Tuple[str, Any]]:
+        """Early fields are best-effort; malformed output is caught by final validation"""
+        try:
+            return parser.feed(text)
+        except ValueError:
+            parser.done = True
+            return []
+
+    async def generate_stream(self, prompt: Prompt, max_tokens: Optional[int] = None,
+                              temperature: Optional[float] = None,
+                              session_id: Optional[str] = None,
+                              profile: Optional[str] = None,
+                              priority: str = INTERACTIVE) -> AsyncIterator[LLMChunk]:
+        """
+        Stream generated tokens from Ollama API as they arrive
+        
+        Args:
+            prompt: Input text to generate from, or PromptSections; low-priority
+                sections are trimmed to the profile's prompt token budget
+            max_tokens: Maximum tokens to generate (default from the profile)
+            temperature: Generation temperature (default from the profile)
+            session_id: Conversation id; keeps its requests on the same host
+            profile: Generation profile name (num_predict, stop sequences, temperature)
+            priority: Admission class, "interactive" (default) or "batch"
+            
+        Yields:
+            LLMChunk per token batch; the last chunk has done=True and carries
+            Ollama's final stats record
+            
+        Raises:
+            LLMOverloadedError: If admission control has no capacity for the call
+            RuntimeError: If Ollama API call fails or reports an error mid-stream
+        """
+        spec = get_profile(profile)
+        payload = self._build_payload(prompt, max_tokens, temperature, stream=True, profile=spec)
+        if self.flights is None:
+            source = self._admitted_stream(payload, session_id, spec, priority)
+        else:
+            source = self.flights.stream(f"{self._request_key(payload)}:{priority}",
+                                         lambda: self._admitted_stream(payload, session_id, spec,
+                                                                       priority))
+        async for chunk in source:
+            yield chunk
+
+    async def _admitted_stream(self, payload: Dict[str, Any], session_id: Optional[str],
+                               profile: GenerationProfile,
+                               priority: str = INTERACTIVE) -> AsyncIterator[LLMChunk]:
+        """Hold an admission slot and a routed host for as long as the stream is open
+        
+        The caller's deadline and the profile's (learned) time limit bound each
+        wait (queueing and every chunk); on expiry the connection is closed,
+        which stops the generation.
+        """
+        self._ensure_prober()
+        timeout = self._call_timeout(profile)
+        expires = None if timeout is None else time.monotonic() + timeout
+        started = time.perf_counter()
+        async with self._within_deadline(expires):
+            await self.admission.acquire(priority)
+        if self.retries is not None:
+            self.retries.on_request()
+        attempt = 0
+        try:
+            while True:
+                streamed = False
+                try:
+                    async with aclosing(self._routed_stream(payload, session_id, profile,
+                                                            expires)) as stream:
+                        async for chunk in stream:
+                            streamed = True
+                            yield chunk
+                    self._record_duration(profile, started)
+                    return
+                except GeneratorExit:
+                    # The consumer has what it needs (e.g. generate_until): the call is over
+                    self._record_duration(profile, started)
+                    raise
+                except Exception as e:
+                    # Only a stream that has not produced anything yet can be retried
+                    delay = None
+                    if not streamed and self.retries is not None:
+                        delay = self.retries.next_delay(e, attempt)
+                    if delay is None:
+                        raise
+                    logger.info("Retrying LLM stream in %.2fs after: %s", delay, e)
+                    attempt += 1
+                    async with self._within_deadline(expires):
+                        await asyncio.sleep(delay)
+        finally:
+            self.admission.release(priority)
+
+    def _record_duration(self, profile: GenerationProfile, started: float) -> None:
+        """Feed a finished call's duration (queueing included) to the learned timeouts"""
+        if self.timeouts is not None:
+            self.timeouts.record(profile.name, time.perf_counter() - started)
+
+    async def _routed_stream(self, payload: Dict[str, Any], session_id: Optional[str],
+                             profile: GenerationProfile,
+                             expires: Optional[float] = None) -> AsyncIterator[LLMChunk]:
+        """One streaming attempt on a routed host, recording latency and output at the end"""
+        async with self.router.route(payload["model"], session_id) as host:
+            started = time.perf_counter()
+            first_token: Optional[float] = None
+            parts: List[str] = []
+            stream = self._stream_generate(host, payload)
+            try:
+                while True:
+                    try:
+                        async with self._within_deadline(expires):
+                            chunk = await anext(stream)
+                    except StopAsyncIteration:
+                        break
+                    parts.append(chunk.text)
+                    if first_token is None and chunk.text:
+                        first_token = time.perf_counter() - started
+                    if chunk.done:
+                        self._record_call(payload, profile, chunk.stats,
+                                          time.perf_counter() - started, first_token)
+                        self._record_output(profile, "".join(parts), chunk.stats,
+                                            payload["options"]["num_predict"])
+                    yield chunk
+            finally:
+                await stream.aclose()
+
+    def _stream_generate(self, host: OllamaHost,
+                         payload: Dict[str, Any]) -> AsyncIterator[LLMChunk]:
+        """Send a streaming generation request to one host and yield parsed chunks"""
+        return self.backend.stream(self._client_for(host), payload)
     
     async def health_check(self) -> bool:
         """
-        Check if Ollama API is responsive
+        Check if the LLM server is responsive
+        
+        Answers from the background prober's last round, so frequent callers
+        (load balancer checks) cost nothing. The first call starts the prober
+        and, like calls with probing disabled, checks every host now.
         
         Returns:
-            True if API is healthy, False otherwise
+            True if at least one configured host is healthy, False otherwise
         """
-        try:
-            url = f"{self.host}/api/tags"
-            response = await asyncio.to_thread(
-                requests.get,
-                url,
-                timeout=5
-            )
-            response.raise_for_status()
-            return True
-        except Exception:
-            return False
\ No newline at end of file
+        self._ensure_prober()
+        if self.prober is not None and self.prober.probed:
+            return self.prober.available
+        results = await asyncio.gather(*(self._check_host(h) for h in self.router.hosts))
+        return any(results)
+
+    async def _check_host(self, host: OllamaHost) -> bool:
+        return await self.backend.health(self._client_for(host))
@@ -0,0 +1,120 @@
+from __future__ import annotations
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable, Dict, Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class _StreamFlight(Generic[T]):
+    """One upstream stream fanned out to any number of subscribers, with replay"""
+
+    def __init__(self, source: AsyncIterator[T], on_finish: Callable[[], None]):
+        self.buffer: List[T] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.subscribers = 0
+        self._changed = asyncio.Event()
+        self._on_finish = on_finish
+        self.task = asyncio.ensure_future(self._pump(source))
+
+    async def _pump(self, source: AsyncIterator[T]) -> None:
+        try:
+            async for item in source:
+                self.buffer.append(item)
+                self._notify()
+        except asyncio.CancelledError:
+            self.error = RuntimeError("Shared stream was cancelled")
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done = True
+            self._on_finish()
+            self._notify()
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def subscribe(self) -> AsyncIterator[T]:
+        """Replay everything buffered so far, then follow the live stream"""
+        self.subscribers += 1
+        index = 0
+        try:
+            while True:
+                if index < len(self.buffer):
+                    item = self.buffer[index]
+                    index += 1
+                    yield item
+                    continue
+                if self.done:
+                    if self.error is not None:
+                        raise self.error
+                    return
+                await self._changed.wait()
+        finally:
+            self.subscribers -= 1
+            if self.subscribers == 0 and not self.done:
+                # Nobody is listening any more: stop the upstream generation
+                self.task.cancel()
+
+
+class SingleFlight:
+    """Coalesce identical concurrent requests so only one reaches the backend"""
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Future] = {}
+        self._streams: Dict[str, _StreamFlight] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, factory: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run factory() once per key at a time; concurrent callers share its result
+        
+        The shared call is shielded, so one caller being cancelled does not
+        cancel the work the others are waiting on.
+        """
+        task = self._calls.get(key)
+        if task is None:
+            self.leaders += 1
+            task = asyncio.ensure_future(factory())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._forget(self._calls, key, t))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    async def stream(self, key: str, factory: Callable[[], AsyncIterator[T]]) -> AsyncIterator[T]:
+        """
+        Share one upstream stream per key; late subscribers get buffered items replayed
+        
+        The upstream is cancelled once every subscriber has stopped reading.
+        """
+        flight = self._streams.get(key)
+        if flight is None:
+            self.leaders += 1
+            flight = _StreamFlight(factory(), lambda: self._forget_stream(key, flight))
+            self._streams[key] = flight
+        else:
+            self.coalesced += 1
+        async for item in flight.subscribe():
+            yield item
+
+    @staticmethod
+    def _forget(calls: Dict[str, asyncio.Future], key: str, task: asyncio.Future) -> None:
+        if calls.get(key) is task:
+            del calls[key]
+        if not task.cancelled():
+            task.exception()  # mark as retrieved even if every waiter went away
+
+    def _forget_stream(self, key: str, flight: _StreamFlight) -> None:
+        if self._streams.get(key) is flight:
+            del self._streams[key]
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for monitoring"""
+        return {
+            "in_flight": len(self._calls) + len(self._streams),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+        }
@@ -0,0 +1,73 @@
+from __future__ import annotations
+from typing import Any, Dict, Iterable, Optional
+
+from .llm_metrics import Histogram
+
+
+class _TierStats:
+    def __init__(self, model: str):
+        self.model = model
+        self.calls = 0
+        self.escalations = 0
+        self.latency = Histogram()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "calls": self.calls,
+            "escalations": self.escalations,
+            "escalation_rate": self.escalations / self.calls if self.calls else 0.0,
+            "latency_seconds": self.latency.snapshot(),
+        }
+
+
+class TierPolicy:
+    """
+    Which model tier serves a request, and how each tier performs
+
+    Requests go to the small model when their profile is one of
+    `small_profiles`, the prompt is at most `max_prompt_chars` long and the
+    caller's complexity score (0-1, optional) is at most `max_complexity`.
+    Everything else goes to the large model. When small-model output fails
+    validation, `escalate` names the large model to retry with.
+    """
+
+    def __init__(self, small_model: str, large_model: str, small_profiles: Iterable[str],
+                 max_prompt_chars: int = 4000, max_complexity: float = 0.5):
+        self.small_model = small_model
+        self.large_model = large_model
+        self.small_profiles = frozenset(small_profiles)
+        self.max_prompt_chars = max_prompt_chars
+        self.max_complexity = max_complexity
+        self.tiers = {"small": _TierStats(small_model), "large": _TierStats(large_model)}
+
+    def choose(self, profile: str, prompt: str, complexity: Optional[float] = None) -> str:
+        """Model for a new request"""
+        if (profile in self.small_profiles and len(prompt) <= self.max_prompt_chars
+                and (complexity is None or complexity <= self.max_complexity)):
+            return self.small_model
+        return self.large_model
+
+    def tier_of(self, model: str) -> Optional[str]:
+        if model == self.small_model:
+            return "small"
+        if model == self.large_model:
+            return "large"
+        return None
+
+    def escalate(self, model: str) -> Optional[str]:
+        """Larger model to retry invalid output with, or None if `model` is already the largest"""
+        if model != self.small_model:
+            return None
+        self.tiers["small"].escalations += 1
+        return self.large_model
+
+    def record(self, model: str, wall_seconds: float) -> None:
+        tier = self.tier_of(model)
+        if tier is not None:
+            stats = self.tiers[tier]
+            stats.calls += 1
+            stats.latency.observe(wall_seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        return {name: tier.snapshot() for name, tier in self.tiers.items()}
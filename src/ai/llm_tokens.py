@@ -0,0 +1,122 @@
+from __future__ import annotations
+import logging
+import math
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, List, Optional, Sequence, Tuple, Union
+
+try:  # Optional: exact counts with the model's own tokenizer
+    from tokenizers import Tokenizer
+except ImportError:  # pragma: no cover - depends on the environment
+    Tokenizer = None
+
+logger = logging.getLogger(__name__)
+
+# Characters per token assumed without a tokenizer; on the low side, so budgets err safe
+CHARS_PER_TOKEN = 3.5
+
+REQUIRED = math.inf  # priority of sections that are never trimmed
+
+
+@dataclass(frozen=True)
+class PromptSection:
+    """
+    Part of a prompt that may be trimmed to fit the token budget
+
+    Sections are concatenated as-is, so include separators in `text`. When a
+    prompt is over budget the lowest-`priority` sections are cut first,
+    keeping their `keep` end ("head" or "tail", e.g. the latest history).
+    """
+    text: str
+    priority: float = REQUIRED
+    keep: str = "head"
+    name: str = ""
+
+
+Prompt = Union[str, Sequence[PromptSection]]
+
+
+@lru_cache(maxsize=8)
+def load_tokenizer(name: str) -> Optional[Any]:
+    """HF tokenizer from a tokenizer.json path or hub id, loaded once per process; None if unavailable"""
+    if Tokenizer is None:
+        logger.warning("tokenizers is not installed; estimating token counts from length")
+        return None
+    try:
+        if os.path.exists(name):
+            return Tokenizer.from_file(name)
+        return Tokenizer.from_pretrained(name)
+    except Exception as e:
+        logger.warning("Could not load tokenizer %s (%s); estimating token counts from length", name, e)
+        return None
+
+
+class TokenCounter:
+    """Local prompt token counts, exact with a tokenizer and estimated otherwise"""
+
+    def __init__(self, tokenizer: Optional[str] = None, cache_size: int = 4096):
+        """
+        Args:
+            tokenizer: tokenizer.json path or HF hub id matching the served model;
+                None uses the length heuristic
+            cache_size: Texts whose counts are memoised (prompt preambles repeat)
+        """
+        self.tokenizer = load_tokenizer(tokenizer) if tokenizer else None
+        self.count = lru_cache(maxsize=cache_size)(self._count)
+
+    @property
+    def exact(self) -> bool:
+        return self.tokenizer is not None
+
+    def _count(self, text: str) -> int:
+        if not text:
+            return 0
+        if self.tokenizer is not None:
+            return len(self.tokenizer.encode(text, add_special_tokens=False).ids)
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+    def truncate(self, text: str, max_tokens: int, keep: str = "head") -> str:
+        """Longest head (or tail) of `text` within `max_tokens`"""
+        if max_tokens <= 0:
+            return ""
+        if self.tokenizer is not None:
+            offsets = self.tokenizer.encode(text, add_special_tokens=False).offsets
+            if len(offsets) <= max_tokens:
+                return text
+            if keep == "tail":
+                return text[offsets[-max_tokens][0]:]
+            return text[:offsets[max_tokens - 1][1]]
+        chars = int(max_tokens * CHARS_PER_TOKEN)
+        return text[-chars:] if keep == "tail" else text[:chars]
+
+
+def fit_prompt(sections: Sequence[PromptSection], budget: int,
+               counter: TokenCounter) -> Tuple[str, int, List[str]]:
+    """
+    Join sections, trimming the lowest-priority ones until the prompt fits `budget` tokens
+
+    Returns:
+        (prompt, token count, names of trimmed sections). The count can still
+        exceed the budget when the required sections alone do.
+    """
+    texts = [section.text for section in sections]
+    counts = [counter.count(text) for text in texts]
+    total = sum(counts)
+    trimmed: List[str] = []
+    trimmable = sorted((i for i, s in enumerate(sections) if s.priority != REQUIRED),
+                       key=lambda i: sections[i].priority)
+    for index in trimmable:
+        if total <= budget:
+            break
+        section = sections[index]
+        excess = total - budget
+        if counts[index] <= excess:
+            texts[index] = ""
+        else:
+            texts[index] = counter.truncate(texts[index], counts[index] - excess, section.keep)
+        total -= counts[index]
+        counts[index] = counter.count(texts[index])
+        total += counts[index]
+        trimmed.append(section.name or f"section {index}")
+    return "".join(texts), total, trimmed
@@ -0,0 +1,73 @@
+from __future__ import annotations
+import asyncio
+import logging
+from datetime import datetime, time as dtime
+from typing import TYPE_CHECKING, Iterable, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+if TYPE_CHECKING:
+    from .llm_service import LLMService
+
+logger = logging.getLogger(__name__)
+
+
+def parse_hours(spec: str) -> Tuple[dtime, dtime]:
+    """Parse "HH:MM-HH:MM" into a (start, end) pair; end may wrap past midnight"""
+    try:
+        start, end = (dtime.fromisoformat(part.strip()) for part in spec.split("-"))
+    except ValueError as e:
+        raise ValueError(f"Invalid hours window {spec!r}, expected HH:MM-HH:MM") from e
+    return start, end
+
+
+class ModelKeeper:
+    """Background task that keeps the models (every tier's) loaded in Ollama during business hours"""
+
+    def __init__(self, llm: "LLMService", hours: str, weekdays: Iterable[int],
+                 interval_seconds: float, timezone: Optional[str] = None):
+        """
+        Args:
+            llm: Service whose hosts are pinged
+            hours: Daily window such as "08:00-18:00"
+            weekdays: Days the window applies (0 = Monday)
+            interval_seconds: Ping period; each ping keeps the model for twice this
+            timezone: IANA zone for the window; None uses the server's local time
+        """
+        self.llm = llm
+        self.start, self.end = parse_hours(hours)
+        self.weekdays = frozenset(weekdays)
+        self.interval_seconds = interval_seconds
+        self.tz = ZoneInfo(timezone) if timezone else None
+        self.pings = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def in_window(self, now: Optional[datetime] = None) -> bool:
+        now = now or datetime.now(self.tz)
+        if now.weekday() not in self.weekdays:
+            return False
+        current = now.time()
+        if self.start <= self.end:
+            return self.start <= current < self.end
+        return current >= self.start or current < self.end
+
+    def start_background(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            if self.in_window():
+                # Keep-alive outlasts the next ping, so outside the window the
+                # model unloads on Ollama's normal schedule
+                await self.llm.warmup(keep_alive=int(self.interval_seconds * 2))
+                self.pings += 1
+            await asyncio.sleep(self.interval_seconds)
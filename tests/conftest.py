@@ -0,0 +1,32 @@
+import httpx
+import pytest
+import pytest_asyncio
+from src.ai import llm_retry
+from src.ai.config import settings
+
+
+@pytest_asyncio.fixture
+async def mock_client():
+    """Factory for httpx clients answered in-process by a MockTransport handler; closed after the test"""
+    clients = []
+
+    def make(handler, base_url: str = "http://ollama.test") -> httpx.AsyncClient:
+        client = httpx.AsyncClient(base_url=base_url, transport=httpx.MockTransport(handler))
+        clients.append(client)
+        return client
+
+    yield make
+    for client in clients:
+        await client.aclose()
+
+
+@pytest.fixture(autouse=True)
+def _no_health_prober(monkeypatch):
+    """Mock transports only answer the endpoints a test is about; probing them would mark hosts down"""
+    monkeypatch.setattr(settings, "LLM_HEALTH_PROBE_ENABLED", False)
+
+
+@pytest.fixture(autouse=True)
+def _fresh_retry_budget(monkeypatch):
+    """The retry budget is process-wide; give each test a full one"""
+    monkeypatch.setattr(llm_retry, "_process_budget", None)
@@ -0,0 +1,91 @@
+"""Minimal stand-in for an Ollama daemon, for routing and resilience tests
+
+Run several as separate processes with:
+    python tests/fake_ollama.py --port 11435 --name a
+or start one in-process with FakeOllama().
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeOllama:
+    """Threaded HTTP server answering /api/generate, /api/tags and /api/ps like Ollama"""
+
+    def __init__(self, name: str = "fake", port: int = 0, delay: float = 0.0):
+        self.name = name
+        self.delay = delay
+        self.fail_status = None  # set to e.g. 500 to make every generate fail
+        self.requests = []
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body: bytes, content_type="application/json"):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path in ("/api/tags", "/api/ps"):
+                    self._send(200, json.dumps({"models": [{"name": "llama3.1:latest"}]}).encode())
+                else:
+                    self._send(404, b"{}")
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                fake.requests.append(payload)
+                time.sleep(fake.delay)
+                if fake.fail_status:
+                    self._send(fake.fail_status, b'{"error": "injected failure"}')
+                    return
+                words = [fake.name, "says", "hello."]
+                final = {"done": True, "model": payload.get("model"), "eval_count": len(words),
+                         "prompt_eval_count": len(payload.get("prompt", "").split())}
+                if payload.get("stream"):
+                    lines = [{"response": w + " ", "done": False} for w in words]
+                    lines.append({"response": "", **final})
+                    body = "".join(json.dumps(line) + "\n" for line in lines).encode()
+                    self._send(200, body, "application/x-ndjson")
+                else:
+                    self._send(200, json.dumps({"response": " ".join(words), **final}).encode())
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.server.daemon_threads = True
+        # Clients hang up on purpose (hedging, early stop); don't spam tracebacks
+        self.server.handle_error = lambda request, client_address: None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "FakeOllama":
+        self._thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--name", default="fake")
+    parser.add_argument("--delay", type=float, default=0.0)
+    args = parser.parse_args()
+    fake = FakeOllama(args.name, args.port, args.delay)
+    print(f"Fake Ollama '{args.name}' listening on {fake.url}")
+    fake.server.serve_forever()
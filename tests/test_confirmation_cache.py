@@ -0,0 +1,112 @@
+import json
+import httpx
+import pytest
+from src.ai.chat_service import ChatService
+from src.ai.confirmation_cache import ConfirmationCache, templatize
+from src.ai.llm_service import LLMService
+
+pytestmark = pytest.mark.asyncio
+
+
+def _entities(name, business_type="LLC", state_code="TX"):
+    return {"business_type": business_type, "state_code": state_code, "state": "Texas",
+            "business_name": name, "owner_name": None}
+
+
+async def test_templates_render_new_names_after_variants_fill():
+    cache = ConfirmationCache(variants=2)
+    assert cache.get(_entities("Acme")) is None
+    assert cache.put(_entities("Acme"), "I'll help you form Acme as a Texas LLC.")
+    assert cache.get(_entities("Acme")) is None        # second variant still to generate
+    assert cache.put(_entities("Bolt"), "I'll help you register Bolt in Texas.")
+
+    rendered = {cache.get(_entities("Zenith")) for _ in range(4)}
+    assert rendered == {"I'll help you form Zenith as a Texas LLC.",
+                        "I'll help you register Zenith in Texas."}
+    assert cache.get(_entities("Zenith", state_code="FL")) is None
+    assert cache.get(_entities(None)) is None          # no name: different signature
+
+
+async def test_unusable_confirmations_are_not_stored():
+    cache = ConfirmationCache(variants=1)
+    assert not cache.put(_entities("Acme"), "I'll help you form your Texas LLC.")
+    assert not cache.put({"business_type": None, "state_code": "TX"}, "I'll help you.")
+    assert not cache.put(_entities("Acme"), "I'll help you register ACME in Texas.")
+
+
+async def test_templatize_only_replaces_one_whole_value():
+    assert (templatize("I'll help you register Help LLC in Texas.", _entities("Help"))
+            == "I'll help you register {business_name} LLC in Texas.")
+    assert (templatize("I'll help you register Tex LLC in Texas.", _entities("Tex"))
+            == "I'll help you register {business_name} LLC in Texas.")
+    assert templatize("Help is here: I'll register Help LLC.", _entities("Help")) is None
+    assert templatize("I'll help you register your LLC in Texas.", _entities("Tex")) is None
+    assert templatize("I'll register Texas in Texas.", _entities("Texas")) is None
+    assert templatize("I'll register Texas Tacos LLC.", _entities("Texas Tacos")) is None
+
+    cache = ConfirmationCache(variants=1)
+    assert cache.put(_entities("Help"), "I'll help you register Help LLC in Texas.")
+    assert cache.get(_entities("Acme")) == "I'll help you register Acme LLC in Texas."
+
+
+async def test_templates_retire_after_max_uses():
+    cache = ConfirmationCache(variants=1, max_uses=2)
+    cache.put(_entities("Acme"), "I'll help you form Acme.")
+    assert cache.get(_entities("A")) == "I'll help you form A."
+    assert cache.get(_entities("B")) == "I'll help you form B."
+    assert cache.get(_entities("C")) is None
+    assert cache.stats()["retired"] == 1
+
+
+class _StubNLU:
+    def __init__(self):
+        self.entities = None
+
+    async def extract_entities(self, text):
+        return self.entities
+
+
+async def test_chat_service_skips_llm_for_known_signature(mock_client):
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        name = "Acme" if "Acme" in json.loads(request.content)["prompt"] else "Bolt"
+        line = json.dumps({"response": f"I'll help you form {name} in Texas.", "done": True})
+        return httpx.Response(200, content=line + "\n")
+
+    client = mock_client(handler)
+    nlu = _StubNLU()
+    chat = ChatService(llm=LLMService(client=client, cache=None), nlu=nlu)
+    chat.confirmations = ConfirmationCache(variants=1)
+
+    nlu.entities = _entities("Acme")
+    first = await chat.process_registration_request("Form Acme LLC in Texas")
+    nlu.entities = _entities("Bolt")
+    second = await chat.process_registration_request("Form Bolt LLC in Texas")
+
+    assert first["confirmation"] == "I'll help you form Acme in Texas."
+    assert second["confirmation"] == "I'll help you form Bolt in Texas."
+    assert calls == 1
+
+
+async def test_chat_service_does_not_cache_invalid_confirmation(mock_client):
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        return httpx.Response(200, content=json.dumps({"response": "Sure thing.", "done": True}) + "\n")
+
+    client = mock_client(handler)
+    nlu = _StubNLU()
+    nlu.entities = _entities(None)
+    chat = ChatService(llm=LLMService(client=client, cache=None), nlu=nlu)
+    chat.confirmations = ConfirmationCache(variants=1)
+
+    await chat.process_registration_request("Form an LLC in Texas")
+    await chat.process_registration_request("Form an LLC in Texas")
+
+    assert calls == 2
+    assert chat.confirmations.stats()["signatures"] == 0
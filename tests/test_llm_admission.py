@@ -0,0 +1,108 @@
+import asyncio
+import pytest
+from src.ai.llm_admission import AdmissionController
+from src.ai.llm_errors import LLMOverloadedError
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_queue_then_fail_fast_when_full():
+    admission = AdmissionController(max_in_flight=1, max_queue=1)
+    release = asyncio.Event()
+
+    async def hold():
+        async with admission.slot():
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    assert (admission.in_flight, admission.queued) == (1, 1)
+
+    with pytest.raises(LLMOverloadedError):
+        await admission.acquire()
+
+    release.set()
+    await asyncio.gather(holder, waiter)
+    stats = admission.stats()
+    assert stats["in_flight"] == 0 and stats["queued"] == 0
+    assert stats["admitted"] == 2 and stats["rejected"] == 1
+    assert stats["wait_seconds"]["count"] == 2
+
+
+async def test_max_wait_rejects_and_cancelled_waiters_leave_queue():
+    admission = AdmissionController(max_in_flight=1, max_queue=4, max_wait_seconds=0.01)
+    await admission.acquire()
+
+    with pytest.raises(LLMOverloadedError):
+        await admission.acquire()
+    assert admission.queued == 0 and admission.timed_out == 1
+
+    admission.max_wait_seconds = None
+    waiter = asyncio.create_task(admission.acquire())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert admission.queued == 0
+
+    admission.release()
+    assert admission.in_flight == 0
+
+
+async def test_interactive_first_and_batch_capped_while_chat_is_active():
+    admission = AdmissionController(max_in_flight=2, max_queue=8, max_batch_in_flight=1,
+                                    batch_aging_seconds=None)
+    order = []
+    release = asyncio.Event()
+
+    async def run(name, priority):
+        async with admission.slot(priority):
+            order.append(name)
+            await release.wait()
+
+    await admission.acquire("interactive")
+    first_batch = asyncio.create_task(run("b1", "batch"))
+    await asyncio.sleep(0)
+    second_batch = asyncio.create_task(run("b2", "batch"))
+    await asyncio.sleep(0)
+    # One slot is free, but batch already holds its share while chat is running
+    assert order == ["b1"] and admission.classes["batch"].waiters
+
+    chat = asyncio.create_task(run("i1", "interactive"))
+    await asyncio.sleep(0)
+    admission.release("interactive")
+    await asyncio.sleep(0)
+    assert order == ["b1", "i1"]
+
+    release.set()
+    await asyncio.gather(first_batch, second_batch, chat)
+    assert order == ["b1", "i1", "b2"]
+    classes = admission.stats()["classes"]
+    assert classes["batch"]["admitted"] == 2 and classes["interactive"]["admitted"] == 2
+    assert classes["batch"]["wait_seconds"]["count"] == 2
+
+
+async def test_aged_batch_request_is_not_starved():
+    admission = AdmissionController(max_in_flight=1, max_queue=8, batch_aging_seconds=0.01)
+    await admission.acquire("interactive")
+    batch = asyncio.create_task(admission.acquire("batch"))
+    await asyncio.sleep(0.02)
+    chat = asyncio.create_task(admission.acquire("interactive"))
+    await asyncio.sleep(0)
+
+    admission.release("interactive")
+    await asyncio.sleep(0)
+    assert batch.done() and not chat.done()
+    assert admission.classes["batch"].promoted == 1
+
+    admission.release("batch")
+    await chat
+    admission.release("interactive")
+    assert admission.in_flight == 0
+
+
+async def test_unknown_priority():
+    with pytest.raises(ValueError):
+        await AdmissionController(max_in_flight=1, max_queue=1).acquire("urgent")
@@ -0,0 +1,82 @@
+import json
+import httpx
+import pytest
+from src.ai.llm_backends import FakeBackend, OpenAICompatibleBackend, create_backend
+from src.ai.llm_service import LLMService
+
+pytestmark = pytest.mark.asyncio
+
+
+def _openai_handler(request: httpx.Request) -> httpx.Response:
+    if request.url.path == "/v1/embeddings":
+        return httpx.Response(200, json={"data": [{"index": 1, "embedding": [0.0, 1.0]},
+                                                  {"index": 0, "embedding": [1.0, 0.0]}]})
+    if request.url.path == "/v1/models":
+        return httpx.Response(200, json={"data": []})
+    assert request.url.path == "/v1/chat/completions"
+    body = json.loads(request.content)
+    assert request.headers["authorization"] == "Bearer secret"
+    assert body["messages"] == [{"role": "user", "content": "Say hi"}]
+    assert body["max_tokens"] == 7
+    usage = {"prompt_tokens": 3, "completion_tokens": 2}
+    if not body["stream"]:
+        return httpx.Response(200, json={
+            "choices": [{"message": {"role": "assistant", "content": " Hi there "},
+                         "finish_reason": "length"}],
+            "usage": usage})
+    events = [{"choices": [{"delta": {"content": "Hi"}, "finish_reason": None}]},
+              {"choices": [{"delta": {"content": " there"}, "finish_reason": "stop"}]},
+              {"choices": [], "usage": usage}]
+    sse = "".join(f"data: {json.dumps(e)}\n\n" for e in events) + "data: [DONE]\n\n"
+    return httpx.Response(200, content=sse, headers={"content-type": "text/event-stream"})
+
+
+async def test_openai_compatible_backend(mock_client):
+    client = mock_client(_openai_handler, "http://vllm.test")
+    llm = LLMService(client=client, cache=None, backend=OpenAICompatibleBackend(api_key="secret"))
+
+    response = await llm._generate("Say hi", max_tokens=7)
+    assert response.text == "Hi there"
+    assert response.stats["eval_count"] == 2 and response.stats["done_reason"] == "length"
+
+    chunks = [c async for c in llm.generate_stream("Say hi", max_tokens=7)]
+    assert "".join(c.text for c in chunks) == "Hi there"
+    assert chunks[-1].done and chunks[-1].stats["prompt_eval_count"] == 3
+
+    assert await llm.embed(["a", "b"]) == [[1.0, 0.0], [0.0, 1.0]]
+    assert await llm.health_check()
+
+
+async def test_fake_backend_is_deterministic_and_honours_options():
+    backend = FakeBackend(responder=lambda prompt: "one two three four. five six")
+    async with LLMService(cache=None, backend=backend) as llm:
+        assert await llm.generate("x", max_tokens=3) == "one two three"
+        assert llm.profile_report()["default"]["truncated"] == 1
+
+        chunks = [c.text async for c in llm.generate_stream("x", profile="confirmation")]
+        assert "".join(chunks) == "one two three four. five six"
+
+        turn = llm.conversation("c1")
+        await turn.generate("hello")
+        assert turn.has_context
+
+        first, second = await llm.embed(["form an LLC in Texas", "form a Texas LLC"])
+        assert sum(a * b for a, b in zip(first, second)) > 0.5
+        assert await llm.health_check()
+    assert backend.calls == 3
+
+
+async def test_unknown_backend():
+    with pytest.raises(ValueError):
+        create_backend("tgi")
+
+
+async def test_incomplete_backend_fails_at_construction():
+    from src.ai.llm_backends import LLMBackend
+
+    class GenerateOnly(LLMBackend):
+        async def generate(self, client, payload):
+            raise AssertionError
+
+    with pytest.raises(TypeError):
+        GenerateOnly()
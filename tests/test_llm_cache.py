@@ -0,0 +1,75 @@
+import threading
+import time
+import pytest
+from src.ai.llm_cache import ResponseCache
+
+
+def test_lru_eviction_by_entries_and_bytes():
+    cache = ResponseCache(max_entries=2, max_bytes=10, ttl_seconds=None)
+    cache.put("a", "1234")
+    cache.put("b", "1234")
+    assert cache.get("a") == "1234"  # a becomes most recently used
+    cache.put("c", "1234")           # over 2 entries and 10 bytes -> evicts b
+    assert cache.get("b") is None
+    assert cache.get("a") == "1234" and cache.get("c") == "1234"
+    assert cache.stats()["evictions"] == 1
+
+    cache.put("huge", "x" * 11)      # larger than the whole cache: never stored
+    assert cache.get("huge") is None
+
+
+def test_ttl_expiry(monkeypatch):
+    cache = ResponseCache(ttl_seconds=10)
+    cache.put("k", "v")
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 11)
+    assert cache.get("k") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_persistent_tier_survives_restart(tmp_path):
+    path = str(tmp_path / "llm_cache.sqlite")
+    key = ResponseCache.make_key("llama3.1:latest", "hi", 0.0, 64)
+
+    first = ResponseCache(path=path)
+    first.put(key, "hello")
+    first.close()
+
+    second = ResponseCache(path=path)
+    assert second.get(key) == "hello"
+    stats = second.stats()
+    assert stats["hits"] == 1 and stats["disk_hits"] == 1
+    second.close()
+
+
+def test_key_depends_on_generation_options():
+    base = ResponseCache.make_key("m", "p", 0.0, 64)
+    assert base == ResponseCache.make_key("m", "p", 0.0, 64)
+    assert base != ResponseCache.make_key("m", "p", 0.0, 128)
+    assert base != ResponseCache.make_key("m", "p", 0.2, 64)
+
+
+@pytest.mark.asyncio
+async def test_async_api_keeps_disk_io_off_the_event_loop(tmp_path):
+    path = str(tmp_path / "llm_cache.sqlite")
+    cache = ResponseCache(path=path)
+    loop_thread = threading.get_ident()
+    disk_threads = []
+    for name in ("_flush", "_disk_get"):
+        method = getattr(cache, name)
+
+        def traced(*args, _method=method):
+            disk_threads.append(threading.get_ident())
+            return _method(*args)
+        setattr(cache, name, traced)
+
+    for i in range(20):
+        await cache.aput(f"k{i}", f"v{i}")
+    assert await cache.aget("k3") == "v3"      # memory tier: no disk access
+    assert await cache.aget("missing") is None
+    await cache.aclose()
+    assert disk_threads and loop_thread not in disk_threads
+
+    reopened = ResponseCache(path=path)
+    assert all(reopened.get(f"k{i}") == f"v{i}" for i in range(20))
+    reopened.close()
@@ -0,0 +1,46 @@
+import json
+import httpx
+import pytest
+from src.ai.llm_conversations import ConversationStore
+from src.ai.llm_service import LLMService
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_store_bounded_by_count_and_bytes():
+    store = ConversationStore(max_conversations=2, max_bytes=40, max_context_tokens=100)
+    store.put("a", [1, 2, 3])
+    store.put("b", [4, 5, 6])
+    store.get("a")
+    store.put("c", [7])                  # count cap: evicts b (least recent)
+    assert "b" not in store and store.get("a") == [1, 2, 3]
+
+    store.put("d", list(range(9)))       # 36 bytes: pushes total over 40
+    assert store.stats()["bytes"] <= 40
+    assert "d" in store
+
+    store.put("a", list(range(101)))     # too long for the window: dropped
+    assert "a" not in store and store.stats()["resets"] == 1
+
+
+async def test_follow_up_turn_sends_previous_context(mock_client):
+    sent = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        sent.append(body)
+        context = body.get("context", []) + [len(sent)]
+        return httpx.Response(200, json={"response": "ok", "done": True, "context": context})
+
+    client = mock_client(handler)
+    llm = LLMService(client=client)
+    conversation = llm.conversation("conv-1")
+    assert not conversation.has_context
+
+    await conversation.generate("system preamble + turn 1")
+    assert conversation.has_context
+    await conversation.generate("turn 2")
+
+    assert "context" not in sent[0]
+    assert sent[1]["context"] == [1] and sent[1]["prompt"] == "turn 2"
+    assert llm.conversations.get("conv-1") == [1, 2]
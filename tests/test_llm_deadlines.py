@@ -0,0 +1,109 @@
+import asyncio
+import json
+import time
+import httpx
+import pytest
+from src.ai.llm_deadlines import AdaptiveTimeouts, llm_deadline, remaining
+from src.ai.llm_errors import LLMTimeoutError
+from src.ai.llm_predicates import SentenceBoundary
+from src.ai.llm_service import LLMService
+
+pytestmark = pytest.mark.asyncio
+
+
+
+async def test_nested_deadlines_only_tighten():
+    assert remaining() is None
+    with llm_deadline(10) as outer:
+        with llm_deadline(60) as inner:
+            assert inner == outer
+        with llm_deadline(1):
+            assert remaining() <= 1
+        assert 9 < remaining() <= 10
+    assert remaining() is None
+
+
+async def test_adaptive_timeout_learns_from_latency():
+    timeouts = AdaptiveTimeouts(percentile=99, multiplier=2, floor_seconds=1, min_samples=5)
+    assert timeouts.timeout_for("confirmation", 30) == 30
+    for _ in range(5):
+        timeouts.record("confirmation", 2.0)
+    assert timeouts.timeout_for("confirmation", 30) == 4.0
+    assert timeouts.timeout_for("confirmation", 3) == 3
+    for _ in range(100):
+        timeouts.record("fast", 0.01)
+    assert timeouts.timeout_for("fast", 30) == 1
+
+
+async def test_deadline_cancels_request_on_the_wire(mock_client):
+    cancelled = asyncio.Event()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return httpx.Response(200, json={"response": "late", "done": True})
+
+    llm = LLMService(client=mock_client(handler), cache=None)
+    started = time.perf_counter()
+    with llm_deadline(0.05):
+        with pytest.raises(LLMTimeoutError):
+            await llm.generate("hi")
+    assert time.perf_counter() - started < 1
+    await asyncio.sleep(0.01)
+    assert cancelled.is_set() and llm.admission.in_flight == 0
+
+    with llm_deadline(-1):
+        with pytest.raises(LLMTimeoutError):
+            await llm.generate("hi", use_cache=False)
+    await llm.aclose()
+
+
+async def test_deadline_closes_stalled_stream(mock_client):
+    closed = asyncio.Event()
+
+    async def body():
+        try:
+            yield (json.dumps({"response": "I'll", "done": False}) + "\n").encode()
+            await asyncio.sleep(5)
+        finally:
+            closed.set()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=body())
+
+    llm = LLMService(client=mock_client(handler), cache=None)
+    with pytest.raises(LLMTimeoutError):
+        await llm.generate_until("hi", SentenceBoundary(), timeout=0.05)
+    await asyncio.sleep(0)
+    assert closed.is_set() and llm.admission.in_flight == 0
+    await llm.aclose()
+
+
+async def test_profile_timeout_bounds_streams_and_learns_from_them(mock_client, monkeypatch):
+    import dataclasses
+    from src.ai import llm_service
+
+    profile = dataclasses.replace(llm_service.get_profile("confirmation"), timeout_seconds=0.1)
+    monkeypatch.setattr(llm_service, "get_profile", lambda name: profile)
+    stall = True
+
+    async def body():
+        yield (json.dumps({"response": "I'll help you.", "done": False}) + "\n").encode()
+        if stall:
+            await asyncio.sleep(5)
+        yield (json.dumps({"response": " More", "done": False}) + "\n").encode()
+
+    llm = LLMService(client=mock_client(lambda request: httpx.Response(200, content=body())), cache=None)
+    started = time.perf_counter()
+    with pytest.raises(LLMTimeoutError):
+        await llm.generate_until("hi", SentenceBoundary(2), profile="confirmation")
+    assert time.perf_counter() - started < 1
+
+    stall = False
+    result = await llm.generate_until("hi", SentenceBoundary(), profile="confirmation")
+    assert result.text == "I'll help you."
+    assert llm.timeouts.latency["confirmation"].count == 1
+    await llm.aclose()
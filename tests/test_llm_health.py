@@ -0,0 +1,104 @@
+import asyncio
+import httpx
+import pytest
+from src.ai.config import settings
+from src.ai.llm_backends import FakeBackend
+from src.ai.llm_errors import LLMOverloadedError
+from src.ai.llm_router import OllamaHost
+from src.ai.llm_service import LLMService
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture(autouse=True)
+def _probing(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_HEALTH_PROBE_ENABLED", True)
+
+
+def _ollama_host(mock_client, url: str, up: dict) -> OllamaHost:
+    def handler(request: httpx.Request) -> httpx.Response:
+        if not up["value"]:
+            raise httpx.ConnectError("connection refused", request=request)
+        assert request.url.path == "/api/ps"
+        return httpx.Response(200, json={"models": [{"name": "llama3.1:latest"}]})
+
+    return OllamaHost(url, client=mock_client(handler, url), owns_client=False)
+
+
+async def test_probe_caches_status_and_steers_routing(mock_client):
+    a_up, b_up = {"value": True}, {"value": False}
+    a, b = _ollama_host(mock_client, "http://a", a_up), _ollama_host(mock_client, "http://b", b_up)
+    llm = LLMService(cache=None, hosts=[a, b])
+    assert llm.prober is not None and not llm.prober.probed
+
+    for _ in range(llm.prober.max_failures):
+        await llm.prober.probe_once()
+    status = {s["url"]: s for s in llm.metrics_snapshot()["health"]}
+    assert status["http://a"]["healthy"] and status["http://a"]["loaded_models"] == ["llama3.1:latest"]
+    assert status["http://a"]["latency_seconds"] is not None
+    assert not status["http://b"]["healthy"] and "refused" in status["http://b"]["last_error"]
+    assert not b.healthy
+    assert all(llm.router.pick(llm.model) is a for _ in range(10))
+    assert await llm.health_check()
+
+    b_up["value"] = True
+    await llm.prober.probe_once()
+    assert b.healthy and llm.prober.status["http://b"].consecutive_failures == 0
+
+
+async def test_admission_rejects_while_every_host_is_down():
+    backend = FakeBackend()
+    llm = LLMService(cache=None, backend=backend)
+    backend.healthy = False
+    for _ in range(llm.prober.max_failures):
+        await llm.prober.probe_once()
+    assert not await llm.health_check()
+    with pytest.raises(LLMOverloadedError):
+        await llm.generate("hi", use_cache=False)
+    assert backend.calls == 0
+    assert llm.admission.stats()["unavailable"] == 1
+
+    backend.healthy = True
+    await llm.prober.probe_once()
+    assert await llm.health_check()
+    assert (await llm.generate("hi", use_cache=False)).startswith("Echo")
+
+
+async def test_single_failed_probe_does_not_reject_requests():
+    backend = FakeBackend()
+    llm = LLMService(cache=None, backend=backend)
+    backend.healthy = False
+    await llm.prober.probe_once()
+    assert llm.prober.status[llm.router.hosts[0].url].consecutive_failures == 1
+    assert await llm.health_check()
+
+    backend.healthy = True
+    assert (await llm.generate("hi", use_cache=False)).startswith("Echo")
+    assert llm.admission.stats()["unavailable"] == 0
+    await llm.prober.probe_once()
+    assert llm.prober.status[llm.router.hosts[0].url].consecutive_failures == 0
+
+
+async def test_background_prober_runs_until_closed():
+    llm = LLMService(cache=None, backend=FakeBackend())
+    llm.prober.interval_seconds = 0.01
+    llm.start_health_prober()
+    await asyncio.sleep(0.05)
+    assert llm.prober.rounds >= 2
+    await llm.aclose()
+    rounds = llm.prober.rounds
+    await asyncio.sleep(0.03)
+    assert llm.prober.rounds == rounds
+
+
+async def test_first_health_check_starts_the_prober():
+    backend = FakeBackend()
+    llm = LLMService(cache=None, backend=backend)
+    llm.prober.interval_seconds = 0.01
+    assert await llm.health_check()  # live check while nothing is cached
+    await asyncio.sleep(0.03)
+    assert llm.prober.probed
+    backend.healthy = False
+    await asyncio.sleep(0.01 * (llm.prober.max_failures + 3))
+    assert not await llm.health_check()
+    await llm.aclose()
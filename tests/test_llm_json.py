@@ -0,0 +1,64 @@
+import json
+import httpx
+import pytest
+from pydantic import BaseModel
+from src.ai.llm_errors import LLMOutputError
+from src.ai.llm_json import IncrementalJSONObject
+from src.ai.llm_service import LLMService
+
+pytestmark = pytest.mark.asyncio
+
+
+class Registration(BaseModel):
+    business_name: str
+    state_code: str
+    owners: list[str] = []
+
+
+def _ndjson(text: str, step: int = 4) -> bytes:
+    lines = [{"response": text[i:i + step], "done": False} for i in range(0, len(text), step)]
+    lines.append({"response": "", "done": True})
+    return "".join(json.dumps(line) + "\n" for line in lines).encode()
+
+
+async def test_incremental_parser_emits_fields_as_they_close():
+    parser = IncrementalJSONObject()
+    assert parser.feed('{"business_name": "Tech, {Sol') == []
+    assert parser.feed('utions}", "owners": ["a", ') == [("business_name", "Tech, {Solutions}")]
+    assert parser.feed('"b"], "state_code": "TX"}') == [("owners", ["a", "b"]), ("state_code", "TX")]
+    assert parser.done
+
+
+async def test_generate_json_streams_fields_and_validates(mock_client):
+    sent = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent.append(json.loads(request.content))
+        return httpx.Response(200, content=_ndjson('{"business_name": "Acme", "state_code": "TX"}'))
+
+    client = mock_client(handler)
+    llm = LLMService(client=client, cache=None)
+    fields = []
+    result = await llm.generate_json("extract", Registration, on_field=lambda k, v: fields.append(k))
+
+    assert result == Registration(business_name="Acme", state_code="TX")
+    assert fields == ["business_name", "state_code"]
+    assert sent[0]["format"]["title"] == "Registration"
+
+
+async def test_generate_json_repairs_once_then_gives_up(mock_client):
+    answers = iter(['{"business_name": "Acme"}', '{"business_name": "Acme", "state_code": "TX"}'])
+    prompts = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        prompts.append(json.loads(request.content)["prompt"])
+        return httpx.Response(200, content=_ndjson(next(answers, "{}")))
+
+    client = mock_client(handler)
+    llm = LLMService(client=client, cache=None)
+    assert (await llm.generate_json("extract", Registration)).state_code == "TX"
+    assert "state_code" in prompts[1] and "not valid" in prompts[1]
+
+    with pytest.raises(LLMOutputError):
+        await llm.generate_json("extract again", Registration)
+    assert len(prompts) == 4
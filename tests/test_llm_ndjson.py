@@ -0,0 +1,40 @@
+import json
+import httpx
+import pytest
+from src.ai.llm_backends import OllamaBackend
+from src.ai.llm_ndjson import NDJSONDecoder
+
+RECORDS = [{"response": "héllo"}, {"response": " wörld\n"}, {"done": True, "eval_count": 2}]
+BODY = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in RECORDS).encode()
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, len(BODY)])
+def test_decodes_lines_split_across_chunks(size):
+    decoder = NDJSONDecoder()
+    decoded = []
+    for i in range(0, len(BODY), size):
+        decoded.extend(decoder.feed(BODY[i:i + size]))
+    assert decoded + decoder.close() == RECORDS
+
+
+def test_blank_lines_and_missing_final_newline():
+    decoder = NDJSONDecoder()
+    assert decoder.feed(b'{"a": 1}\n\n  \n{"b"') == [{"a": 1}]
+    assert decoder.feed(b": 2}") == []
+    assert decoder.close() == [{"b": 2}]
+    assert decoder.close() == []
+
+
+@pytest.mark.asyncio
+async def test_ollama_generate_accepts_chunked_ndjson(mock_client):
+    async def body():
+        for i in range(0, len(BODY), 5):
+            yield BODY[i:i + 5]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=body(), headers={"content-type": "application/x-ndjson"})
+
+    response = await OllamaBackend().generate(mock_client(handler),
+                                              {"model": "m", "prompt": "hi", "stream": False})
+    assert response.text == "héllo wörld"
+    assert response.stats["eval_count"] == 2
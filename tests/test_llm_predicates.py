@@ -0,0 +1,69 @@
+import asyncio
+import json
+import httpx
+import pytest
+from src.ai.llm_predicates import BalancedJSON, RegexMatch, SentenceBoundary
+from src.ai.llm_service import LLMService
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_sentence_boundary_skips_abbreviations():
+    predicate = SentenceBoundary()
+    assert predicate("I'll help you form Acme Inc. in Texas") is None
+    text = "I'll help you form Acme Inc. in Texas. Next, we"
+    assert text[:predicate(text)] == "I'll help you form Acme Inc. in Texas."
+    assert SentenceBoundary(2)("One. Two. Three") == len("One. Two.")
+
+
+async def test_sentence_boundary_ends_at_company_suffix_before_capital():
+    text = "I'll help you form your Texas LLC. First, we need the owner's name. Then"
+    assert text[:SentenceBoundary()(text)] == "I'll help you form your Texas LLC."
+    assert SentenceBoundary()("I'll help you form your Texas LLC. ") is None
+    assert SentenceBoundary()("Meet Dr. Smith. Then") == len("Meet Dr. Smith.")
+
+
+async def test_balanced_json_ignores_braces_in_strings():
+    predicate = BalancedJSON()
+    text = 'Here: {"name": "a}b", "tags": ["x"]'
+    assert predicate(text) is None
+    text += '} trailing words'
+    assert text[:predicate(text)].endswith('["x"]}')
+
+
+async def test_regex_match():
+    assert RegexMatch(r"\d{2}-\d{7}")("EIN is 12-3456789 ok") == len("EIN is 12-3456789")
+
+
+async def test_generate_until_hangs_up_after_first_sentence(mock_client):
+    tokens = ["I'll", " help", " you.", " Also", " here", " is", " more", " text", "."]
+    sent = []
+
+    async def body():
+        for token in tokens:
+            sent.append(token)
+            yield (json.dumps({"response": token, "done": False}) + "\n").encode()
+            await asyncio.sleep(0.01)
+        yield (json.dumps({"response": "", "done": True, "eval_count": len(tokens)}) + "\n").encode()
+
+    client = mock_client(lambda r: httpx.Response(200, content=body()))
+    llm = LLMService(client=client, cache=None)
+    result = await llm.generate_until("hi", SentenceBoundary(), profile="confirmation")
+
+    assert result.text == "I'll help you."
+    assert result.stopped_early
+    assert result.tokens_generated == 4  # terminator is confirmed by the following token
+    assert result.tokens_saved > 0
+    assert len(sent) < len(tokens)
+    assert llm.admission.in_flight == 0
+    assert llm.profile_report()["confirmation"]["early_stops"] == 1
+
+
+async def test_predicate_without_call_fails_at_construction():
+    from src.ai.llm_predicates import CompletionPredicate
+
+    class Incomplete(CompletionPredicate):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
@@ -0,0 +1,57 @@
+import asyncio
+import json
+import httpx
+import pytest
+from src.ai.llm_errors import LLMTimeoutError
+from src.ai.llm_profiles import GenerationProfile, get_profile, register_profile
+from src.ai.llm_service import LLMService
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_profile_sets_budget_and_stop_sequences(mock_client):
+    sent = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        options = json.loads(request.content)["options"]
+        sent.append(options)
+        truncated = options["num_predict"] <= 20
+        return httpx.Response(200, json={"response": "I'll help you.", "done": True,
+                                         "eval_count": min(20, options["num_predict"]),
+                                         "done_reason": "length" if truncated else "stop"})
+
+    llm = LLMService(client=mock_client(handler), cache=None)
+    confirmation = get_profile("confirmation")
+    await llm.generate("hi", profile="confirmation")
+    await llm.generate("hi", profile="confirmation", max_tokens=10)
+    await llm.generate("hi")
+
+    assert sent[0] == {"temperature": confirmation.temperature,
+                       "num_predict": confirmation.num_predict,
+                       "stop": list(confirmation.stop)}
+    assert sent[1]["num_predict"] == 10
+    assert "stop" not in sent[2]
+
+    report = llm.profile_report()
+    assert report["confirmation"]["calls"] == 2
+    assert report["confirmation"]["truncated"] == 1  # only the max_tokens=10 call hit its budget
+    assert report["confirmation"]["output_tokens"]["count"] == 2
+    assert report["default"]["calls"] == 1
+
+
+async def test_profile_timeout_cancels_request(mock_client):
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(1)
+        return httpx.Response(200, json={"response": "late", "done": True})
+
+    register_profile(GenerationProfile("tiny_timeout", num_predict=8, temperature=0,
+                                       timeout_seconds=0.05))
+    llm = LLMService(client=mock_client(handler), cache=None)
+    with pytest.raises(LLMTimeoutError):
+        await llm.generate("hi", profile="tiny_timeout")
+    assert llm.admission.in_flight == 0
+
+
+async def test_unknown_profile():
+    with pytest.raises(ValueError):
+        get_profile("no_such_profile")
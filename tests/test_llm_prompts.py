@@ -0,0 +1,36 @@
+import pytest
+from src.ai.llm_prompts import PromptTemplate, Slot, compact, get_template, register_template
+
+
+def test_confirmation_prefix_is_shared_and_suffix_is_compact():
+    template = get_template("confirmation")
+    first = template.render(user_message="Form an LLC in Texas",
+                            entities={"business_type": "LLC", "state": "Texas", "business_name": None})
+    second = template.render(user_message="Start a corporation", entities={"business_type": "Corporation"})
+    assert first[0] is second[0] is template.prefix
+    text = "".join(s.text for s in first)
+    assert "Entities: business_type=LLC; state=Texas\n" in text and "None" not in text
+    assert text.endswith("Response (one sentence):")
+    assert [s.text for s in template.render_suffix(user_message="hi", entities={})] == [
+        s.text for s in template.render(user_message="hi", entities={})[1:]]
+
+
+def test_missing_values_and_versioning():
+    template = get_template("confirmation")
+    with pytest.raises(ValueError):
+        template.render(user_message="hi")
+
+    v1 = register_template(PromptTemplate("greeting", 1, "Be brief.\n", (Slot("Name: {name}\n"),)))
+    assert register_template(PromptTemplate("greeting", 1, "Be brief.\n", (Slot("Name: {name}\n"),))) is v1
+    with pytest.raises(ValueError):
+        register_template(PromptTemplate("greeting", 1, "Be very brief.\n", (Slot("Name: {name}\n"),)))
+    v2 = register_template(PromptTemplate("greeting", 2, "Be very brief.\n", (Slot("Name: {name}\n"),)))
+    assert get_template("greeting") is v2 and get_template("greeting", 1) is v1
+    assert v1.fingerprint != v2.fingerprint
+    with pytest.raises(ValueError):
+        get_template("greeting", 3)
+
+
+def test_compact():
+    assert compact({"a": 1, "b": "", "c": ["x", "y"]}) == "a=1; c=x, y"
+    assert compact(None) == ""
@@ -0,0 +1,77 @@
+import json
+import httpx
+import pytest
+from src.ai.llm_deadlines import llm_deadline
+from src.ai.llm_errors import LLMTimeoutError
+from src.ai.llm_retry import RetryPolicy, is_retryable
+from src.ai.llm_service import LLMService
+
+pytestmark = pytest.mark.asyncio
+
+
+def _status_error(code: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "http://ollama.test/api/generate")
+    return httpx.HTTPStatusError("error", request=request, response=httpx.Response(code, request=request))
+
+
+def _wrapped(exc: BaseException) -> RuntimeError:
+    try:
+        raise RuntimeError("Ollama API call failed") from exc
+    except RuntimeError as e:
+        return e
+
+
+async def test_only_transient_errors_are_retryable():
+    assert is_retryable(_wrapped(httpx.ConnectError("refused")))
+    assert is_retryable(_wrapped(httpx.ReadError("reset")))
+    assert is_retryable(_wrapped(_status_error(503)))
+    assert not is_retryable(_wrapped(_status_error(404)))
+    assert not is_retryable(_wrapped(httpx.ReadTimeout("slow")))
+    assert not is_retryable(LLMTimeoutError("deadline"))
+
+
+async def test_budget_attempts_and_deadline_limit_retries():
+    error = _wrapped(httpx.ConnectError("refused"))
+    policy = RetryPolicy(max_attempts=3, base_delay_seconds=0.01, budget_ratio=0.5, max_burst=1)
+    assert policy.next_delay(error, 0) is not None
+    assert policy.next_delay(error, 0) is None            # bucket empty
+    policy.on_request()
+    policy.on_request()
+    assert policy.next_delay(error, 1) is not None
+    assert policy.next_delay(error, 2) is None            # out of attempts
+    policy.on_request()
+    policy.on_request()
+    policy.backoff = lambda attempt: 1.0
+    with llm_deadline(0.5):
+        assert policy.next_delay(error, 0) is None        # would sleep past the deadline
+    assert policy.stats()["give_ups"] == {"attempts": 1, "budget": 1, "deadline": 1}
+
+
+async def test_services_share_the_process_retry_budget():
+    first, second = LLMService(cache=None), LLMService(cache=None)
+    assert first.retries.budget is second.retries.budget
+    error = _wrapped(httpx.ConnectError("refused"))
+    while first.retries.next_delay(error, 0) is not None:
+        pass
+    assert second.retries.next_delay(error, 0) is None
+    assert second.retries.stats()["give_ups"]["budget"] == 1
+
+
+async def test_generate_and_stream_survive_connection_reset(mock_client):
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        if calls % 2 == 1:
+            raise httpx.ReadError("connection reset by peer")
+        if json.loads(request.content)["stream"]:
+            return httpx.Response(200, content=json.dumps({"response": "ok", "done": True}) + "\n")
+        return httpx.Response(200, json={"response": "ok", "done": True})
+
+    client = mock_client(handler)
+    llm = LLMService(client=client, cache=None)
+    llm.retries = RetryPolicy(base_delay_seconds=0.001)
+    assert await llm.generate("hi") == "ok"
+    assert [c.text async for c in llm.generate_stream("hi")] == ["ok"]
+    assert calls == 4 and llm.metrics_snapshot()["retries"]["retries"] == 2
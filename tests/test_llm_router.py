@@ -0,0 +1,144 @@
+import asyncio
+import time
+import pytest
+from fake_ollama import FakeOllama
+from src.ai.llm_router import HostRouter, OllamaHost
+from src.ai.llm_service import LLMService
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_least_outstanding_routing_honours_weights():
+    heavy, light = OllamaHost("http://a", weight=2), OllamaHost("http://b", weight=1)
+    router = HostRouter([heavy, light])
+    heavy.outstanding, light.outstanding = 2, 1
+    # (2+1)/2 = 1.5 beats (1+1)/1 = 2
+    assert router.pick("m") is heavy
+    heavy.outstanding = 4
+    assert router.pick("m") is light
+
+
+async def test_model_filter():
+    small = OllamaHost("http://a", models=("llama3.2:1b",))
+    anything = OllamaHost("http://b")
+    router = HostRouter([small, anything])
+    assert router.pick("llama3.1:latest") is anything
+    with pytest.raises(RuntimeError):
+        HostRouter([small]).pick("llama3.1:latest")
+
+
+async def test_ejection_and_half_open_probe():
+    bad, good = OllamaHost("http://a"), OllamaHost("http://b")
+    router = HostRouter([bad, good], max_failures=2, eject_seconds=60)
+    router.record_failure(bad)
+    assert not bad.ejected
+    router.record_failure(bad)
+    assert bad.ejected
+    assert all(router.pick("m") is good for _ in range(10))
+
+    bad.ejected_until = time.monotonic() - 1  # cooldown elapsed
+    good.outstanding = 5
+    async with router.route("m") as host:
+        assert host is bad and bad.probing
+        # Only one trial request at a time
+        assert router.pick("m") is good
+    assert not bad.ejected and bad.consecutive_failures == 0
+
+
+async def test_routes_across_fake_ollama_servers():
+    with FakeOllama("a", delay=0.05) as a, FakeOllama("b", delay=0.05) as b, \
+            FakeOllama("c", delay=0.05) as c:
+        c.fail_status = 500
+        llm = LLMService(cache=None, hosts=[OllamaHost(a.url), OllamaHost(b.url), OllamaHost(c.url)])
+        llm.flights = None  # distinct requests, no coalescing needed
+
+        results = await asyncio.gather(*(llm.generate(f"hi {i}") for i in range(4)),
+                                       return_exceptions=True)
+        served = {r.split()[0] for r in results if isinstance(r, str)}
+        assert served <= {"a", "b"} and len(served) == 2
+
+        # Keep failing c until it is ejected; afterwards nothing reaches it
+        for i in range(200):
+            if llm.router.hosts[2].ejected:
+                break
+            try:
+                await llm.generate(f"retry {i}")
+            except RuntimeError:
+                pass
+        assert llm.router.hosts[2].ejected
+        sent_to_c = len(c.requests)
+        await asyncio.gather(*(llm.generate(f"after {i}") for i in range(6)))
+        assert len(c.requests) == sent_to_c
+
+        # A conversation keeps hitting the same host
+        first = await llm.generate("turn 1", session_id="conv-1")
+        for turn in range(2, 6):
+            assert (await llm.generate(f"turn {turn}", session_id="conv-1")).split()[0] == first.split()[0]
+        await llm.aclose()
+
+
+async def test_hedged_request_wins_against_stalled_host():
+    from src.ai.llm_hedging import HedgePolicy
+
+    with FakeOllama("slow", delay=1.0) as slow, FakeOllama("fast") as fast:
+        llm = LLMService(cache=None, hosts=[OllamaHost(slow.url), OllamaHost(fast.url)])
+        llm.flights = None
+        llm.hedging = HedgePolicy(min_delay_seconds=0.05, min_samples=1, budget_ratio=1.0)
+        llm.hedging.latency.observe(0.05)
+        # Force the primary onto the stalled host
+        llm.router.hosts[1].outstanding = 100
+
+        started = time.perf_counter()
+        assert (await llm.generate("hi")).startswith("fast")
+        assert time.perf_counter() - started < 0.9
+        assert llm.hedging.stats()["hedges_issued"] == 1
+        assert llm.hedging.stats()["hedges_won"] == 1
+        llm.router.hosts[1].outstanding -= 100
+        await llm.aclose()
+
+
+async def test_no_hedge_without_another_host_for_the_model():
+    from src.ai.llm_hedging import HedgePolicy
+
+    with FakeOllama("a", delay=0.1) as a, FakeOllama("b") as b:
+        a.fail_status = 503
+        llm = LLMService(cache=None, hosts=[OllamaHost(a.url), OllamaHost(b.url, models=("other",))])
+        llm.flights = None
+        llm.hedging = HedgePolicy(min_delay_seconds=0.01, min_samples=1, budget_ratio=1.0)
+        llm.hedging.latency.observe(0.01)
+
+        with pytest.raises(RuntimeError) as raised:
+            await llm.generate("hi", use_cache=False)
+        assert "503" in str(raised.value)
+        assert llm.hedging.stats()["hedges_issued"] == 0
+        assert llm.retries.stats()["retries"] >= 1
+        assert not b.requests
+        await llm.aclose()
+
+
+async def test_no_hedge_to_an_ejected_host():
+    from src.ai.llm_hedging import HedgePolicy
+
+    with FakeOllama("a", delay=0.1) as a, FakeOllama("b") as b:
+        llm = LLMService(cache=None, hosts=[OllamaHost(a.url), OllamaHost(b.url)])
+        llm.flights = None
+        llm.hedging = HedgePolicy(min_delay_seconds=0.01, min_samples=1, budget_ratio=1.0)
+        llm.hedging.latency.observe(0.01)
+        llm.router.hosts[1].ejected_until = time.monotonic() + 3600
+        assert not llm.router.can_route(llm.model, exclude=[llm.router.hosts[0]])
+
+        assert (await llm.generate("hi", use_cache=False)).startswith("a")
+        assert llm.hedging.stats()["hedges_issued"] == 0
+        assert not b.requests
+        await llm.aclose()
+
+
+async def test_hedge_budget_limits_extra_load():
+    from src.ai.llm_hedging import HedgePolicy
+
+    policy = HedgePolicy(budget_ratio=0.05)
+    granted = 0
+    for _ in range(100):
+        policy.on_request()
+        granted += policy.try_acquire()
+    assert granted == 5
@@ -0,0 +1,75 @@
+import json
+import httpx
+import numpy as np
+import pytest
+from src.ai.llm_semantic_cache import SemanticCache, normalize_request
+from src.ai.llm_service import LLMService
+
+pytestmark = pytest.mark.asyncio
+
+
+def _vector(*values):
+    return list(values) + [0.0] * (8 - len(values))
+
+
+async def test_threshold_namespace_and_eviction():
+    cache = SemanticCache(threshold=0.9, max_entries=2)
+    cache.add(_vector(1, 0), "m", "texas llc")
+    cache.add(_vector(0, 1), "m", "florida corp")
+
+    assert cache.lookup(_vector(1, 0.1), "m")[0] == "texas llc"
+    assert cache.lookup(_vector(1, 1), "m") is None          # cosine ~0.71
+    assert cache.lookup(_vector(1, 0), "other-model") is None
+
+    cache.add(_vector(0, 0, 1), "m", "new")                   # evicts least recently used
+    assert cache.lookup(_vector(0, 1), "m") is None
+    assert cache.lookup(_vector(1, 0), "m")[0] == "texas llc"
+    assert cache.stats()["evictions"] == 1
+
+
+async def test_lsh_index_finds_near_duplicates():
+    rng = np.random.default_rng(1)
+    cache = SemanticCache(threshold=0.95, max_entries=5000, ann_threshold=100)
+    vectors = rng.standard_normal((500, 64))
+    for i, vector in enumerate(vectors):
+        cache.add(vector, "m", f"r{i}")
+    assert cache.stats()["ann"]
+
+    found = sum(
+        (cache.lookup(vector + rng.standard_normal(64) * 0.05, "m") or ("",))[0] == f"r{i}"
+        for i, vector in enumerate(vectors[:50])
+    )
+    assert found >= 45
+
+
+async def test_persistence(tmp_path):
+    path = str(tmp_path / "semantic")
+    cache = SemanticCache(path=path)
+    cache.add(_vector(1, 2, 3), "m", "saved")
+    cache.save()
+    assert SemanticCache(path=path).lookup(_vector(1, 2, 3), "m")[0] == "saved"
+
+
+async def test_generate_serves_paraphrase_from_semantic_cache(mock_client):
+    generations = 0
+    embeddings = {
+        normalize_request("Start an LLC in Texas!"): _vector(1, 0.05),
+        normalize_request("form a texas llc"): _vector(1, 0),
+    }
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal generations
+        body = json.loads(request.content)
+        if request.url.path == "/api/embed":
+            return httpx.Response(200, json={"embeddings": [embeddings[t] for t in body["input"]]})
+        generations += 1
+        return httpx.Response(200, json={"response": "I'll help you form a Texas LLC.", "done": True})
+
+    client = mock_client(handler)
+    llm = LLMService(client=client, cache=None)
+    llm.semantic_cache = SemanticCache(threshold=0.95)
+    first = await llm.generate("prompt 1", semantic_key="Start an LLC in Texas!")
+    second = await llm.generate("prompt 2", semantic_key="form a texas llc")
+
+    assert first == second and generations == 1
+    assert llm.semantic_cache.stats()["hit_rate"] == 0.5
@@ -0,0 +1,236 @@
+import asyncio
+import json
+import httpx
+import pytest
+from src.ai.config import settings
+from src.ai.llm_backends import FakeBackend
+from src.ai.llm_cache import ResponseCache
+from src.ai.llm_service import LLMService
+
+pytestmark = pytest.mark.asyncio
+
+
+
+async def test_generate_reuses_injected_client(mock_client):
+    """generate() and health_check() go through the shared pooled client"""
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.url.path)
+        if request.url.path == "/api/tags":
+            return httpx.Response(200, json={"models": []})
+        body = json.loads(request.content)
+        assert body["stream"] is False
+        return httpx.Response(200, json={"response": "  I'll help you.  ", "done": True})
+
+    client = mock_client(handler)
+    async with LLMService(client=client) as llm:
+        assert await llm.generate("hello") == "I'll help you."
+        assert await llm.health_check() is True
+
+    assert seen == ["/api/generate", "/api/tags"]
+    # Injected clients belong to the caller and stay open
+    assert not client.is_closed
+
+
+async def test_generate_wraps_http_errors(mock_client):
+    client = mock_client(lambda request: httpx.Response(500, text="boom"))
+    llm = LLMService(client=client)
+    with pytest.raises(RuntimeError):
+        await llm.generate("hello")
+
+
+async def test_generate_stream_yields_tokens_then_stats(mock_client):
+    lines = [
+        {"response": "I'll", "done": False},
+        {"response": " help", "done": False},
+        {"response": " you.", "done": False},
+        {"response": "", "done": True, "eval_count": 3, "eval_duration": 1000},
+    ]
+    body = "".join(json.dumps(line) + "\n" for line in lines).encode()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert json.loads(request.content)["stream"] is True
+        return httpx.Response(200, content=body)
+
+    client = mock_client(handler)
+    llm = LLMService(client=client)
+    chunks = [chunk async for chunk in llm.generate_stream("hello")]
+
+    assert "".join(c.text for c in chunks) == "I'll help you."
+    assert chunks[-1].done and chunks[-1].stats["eval_count"] == 3
+    assert not any(c.done for c in chunks[:-1])
+
+
+async def test_cache_only_serves_deterministic_calls_by_default(mock_client):
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(json.loads(request.content)["options"]["temperature"])
+        return httpx.Response(200, json={"response": "ok", "done": True})
+
+    client = mock_client(handler)
+    llm = LLMService(client=client, cache=ResponseCache())
+    await llm.generate("same", temperature=0)
+    await llm.generate("same", temperature=0)
+    await llm.generate("same", temperature=0.7)
+    await llm.generate("same", temperature=0.7)
+    await llm.generate("same", temperature=0.7, use_cache=True)
+    await llm.generate("same", temperature=0.7, use_cache=True)
+
+    assert calls == [0, 0.7, 0.7, 0.7]
+    assert llm.cache.stats()["hits"] == 2
+
+
+async def test_identical_in_flight_requests_are_coalesced(mock_client):
+    calls = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"response": "shared", "done": True})
+
+    client = mock_client(handler)
+    llm = LLMService(client=client)
+    results = await asyncio.gather(*(llm.generate("burst") for _ in range(4)))
+
+    assert results == ["shared"] * 4
+    assert calls == 1
+
+
+async def test_generate_many_bounds_concurrency_and_keeps_order(mock_client):
+    in_flight = 0
+    peak = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, peak
+        prompt = json.loads(request.content)["prompt"]
+        in_flight += 1
+        peak = max(peak, in_flight)
+        # Later prompts finish first to prove results are re-ordered
+        await asyncio.sleep(0.02 * (10 - int(prompt)))
+        in_flight -= 1
+        if prompt == "3":
+            return httpx.Response(500, text="boom")
+        return httpx.Response(200, json={"response": f"r{prompt}", "done": True, "eval_count": 5})
+
+    client = mock_client(handler)
+    llm = LLMService(client=client, cache=ResponseCache())
+    batch = await llm.generate_many([str(i) for i in range(10)], concurrency=3,
+                                    return_exceptions=True)
+
+    assert peak == 3
+    assert isinstance(batch.results[3], RuntimeError)
+    assert [r for i, r in enumerate(batch.results) if i != 3] == [f"r{i}" for i in range(10) if i != 3]
+    assert (batch.completed, batch.failed, batch.tokens) == (9, 1, 45)
+    assert batch.prompts_per_second > 0
+
+    with pytest.raises(RuntimeError):
+        await llm.generate_many(["3"], concurrency=2)
+
+    order = [i async for i, _ in llm.generate_many_as_completed(["1", "9"], concurrency=2)]
+    assert order == [1, 0]
+
+
+async def test_generate_many_waits_its_turn_beyond_the_interactive_queue_limit(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_MAX_IN_FLIGHT", 4)
+    monkeypatch.setattr(settings, "LLM_MAX_QUEUE_WAIT_SECONDS", 0.01)
+    llm = LLMService(cache=None, backend=FakeBackend(token_delay_seconds=0.02))
+    batch = await llm.generate_many([f"p{i}" for i in range(8)], concurrency=8,
+                                    return_exceptions=True)
+    assert (batch.completed, batch.failed) == (8, 0)
+    assert llm.admission.stats()["classes"]["batch"]["timed_out"] == 0
+
+
+async def test_warmup_preloads_model_and_records_cold_start(mock_client):
+    sent = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent.append(json.loads(request.content))
+        return httpx.Response(200, json={"response": "", "done": True, "load_duration": 3_000_000_000})
+
+    client = mock_client(handler)
+    llm = LLMService(client=client)
+    timings = await llm.warmup(keep_alive=600)
+
+    assert list(timings) == [llm.model] and timings[llm.model][llm.host] is not None
+    assert "prompt" not in sent[0] and sent[0]["keep_alive"] == 600
+    assert llm.cold_start_latency.count == 1 and llm.steady_latency.count == 0
+
+
+async def test_warmup_loads_every_tier_model(mock_client, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_SMALL_MODEL", "tiny")
+    sent = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent.append(json.loads(request.content)["model"])
+        return httpx.Response(200, json={"response": "", "done": True})
+
+    client = mock_client(handler)
+    llm = LLMService(client=client, cache=None)
+    timings = await llm.warmup()
+
+    assert sorted(sent) == sorted([llm.model, "tiny"])
+    assert set(timings) == {llm.model, "tiny"}
+
+
+async def test_keeper_business_hours_window():
+    from datetime import datetime
+    from src.ai.llm_warmup import ModelKeeper
+
+    keeper = ModelKeeper(llm=None, hours="08:00-18:00", weekdays=range(5), interval_seconds=60)
+    assert keeper.in_window(datetime(2026, 10, 14, 9, 30))       # Wednesday morning
+    assert not keeper.in_window(datetime(2026, 10, 14, 18, 0))   # closing time
+    assert not keeper.in_window(datetime(2026, 10, 17, 9, 30))   # Saturday
+
+    night = ModelKeeper(llm=None, hours="22:00-06:00", weekdays=range(7), interval_seconds=60)
+    assert night.in_window(datetime(2026, 10, 14, 23, 0))
+    assert night.in_window(datetime(2026, 10, 14, 5, 0))
+    assert not night.in_window(datetime(2026, 10, 14, 12, 0))
+
+
+async def test_metrics_snapshot_breaks_down_ollama_timings(mock_client):
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={
+            "response": "ok", "done": True,
+            "load_duration": 100_000_000,          # 0.1s
+            "prompt_eval_count": 200, "prompt_eval_duration": 500_000_000,   # 400 tok/s
+            "eval_count": 50, "eval_duration": 2_000_000_000,                # 25 tok/s
+            "total_duration": 2_600_000_000,
+        })
+
+    client = mock_client(handler)
+    llm = LLMService(client=client, cache=None)
+    await llm.generate("hello", profile="explanation")
+
+    series = llm.metrics_snapshot()["latency"][llm.model]["explanation"]
+    assert series["calls"] == 1
+    assert series["prefill_tokens_per_second"]["p50"] == pytest.approx(400)
+    assert series["decode_tokens_per_second"]["p50"] == pytest.approx(25)
+    assert series["load_seconds"]["p50"] == pytest.approx(0.1)
+    assert series["ttft_seconds"]["count"] == 1
+
+
+async def test_tiering_routes_routine_profiles_to_small_model_and_escalates(mock_client, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_SMALL_MODEL", "tiny")
+    models = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        models.append(body["model"])
+        text = "I'll help you." if body["model"] != "tiny" or "easy" in body["prompt"] else "Um."
+        return httpx.Response(200, json={"response": text, "done": True})
+
+    llm = LLMService(client=mock_client(handler), cache=None)
+    valid = lambda text: text.startswith("I'll")
+    assert await llm.generate("easy", profile="confirmation", validate=valid) == "I'll help you."
+    assert await llm.generate("hard", profile="confirmation", validate=valid) == "I'll help you."
+    await llm.generate("easy", profile="explanation")
+    await llm.generate("easy", profile="confirmation", complexity=0.9)
+    await llm.aclose()
+
+    assert models == ["tiny", "tiny", settings.OLLAMA_MODEL, settings.OLLAMA_MODEL, settings.OLLAMA_MODEL]
+    tiers = llm.metrics_snapshot()["tiers"]
+    assert tiers["small"]["calls"] == 2 and tiers["small"]["escalations"] == 1
+    assert tiers["large"]["calls"] == 3
@@ -0,0 +1,85 @@
+import asyncio
+import pytest
+from src.ai.llm_singleflight import SingleFlight
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_concurrent_callers_share_one_call():
+    flights = SingleFlight()
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "answer"
+
+    results = await asyncio.gather(*(flights.do("k", work) for _ in range(5)))
+    assert results == ["answer"] * 5
+    assert calls == 1
+    assert flights.stats() == {"in_flight": 0, "leaders": 1, "coalesced": 4}
+
+    # Once finished, the next call starts a fresh flight
+    await flights.do("k", work)
+    assert calls == 2
+
+
+async def test_errors_propagate_to_every_caller():
+    flights = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    results = await asyncio.gather(flights.do("k", fail), flights.do("k", fail),
+                                   return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+async def test_late_stream_subscriber_replays_buffer():
+    flights = SingleFlight()
+    second_may_join = asyncio.Event()
+    release = asyncio.Event()
+    starts = 0
+
+    async def source():
+        nonlocal starts
+        starts += 1
+        yield "a"
+        yield "b"
+        second_may_join.set()
+        await release.wait()
+        yield "c"
+
+    async def first():
+        return [item async for item in flights.stream("k", source)]
+
+    async def second():
+        await second_may_join.wait()
+        items = []
+        async for item in flights.stream("k", source):
+            items.append(item)
+            release.set()
+        return items
+
+    assert await asyncio.gather(first(), second()) == [["a", "b", "c"], ["a", "b", "c"]]
+    assert starts == 1
+
+
+async def test_stream_cancelled_when_all_subscribers_leave():
+    flights = SingleFlight()
+    cancelled = asyncio.Event()
+
+    async def source():
+        try:
+            while True:
+                yield "tok"
+                await asyncio.sleep(0)
+        finally:
+            cancelled.set()
+
+    stream = flights.stream("k", source)
+    assert await stream.__anext__() == "tok"
+    await stream.aclose()
+    await asyncio.wait_for(cancelled.wait(), 1)
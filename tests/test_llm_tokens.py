@@ -0,0 +1,54 @@
+import json
+import httpx
+import pytest
+from src.ai.llm_profiles import GenerationProfile, register_profile
+from src.ai.llm_service import LLMService
+from src.ai.llm_tokens import PromptSection, TokenCounter, fit_prompt
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_estimated_counts_and_truncation():
+    counter = TokenCounter()
+    assert not counter.exact
+    assert counter.count("") == 0
+    assert counter.count("x" * 35) == 10
+    assert counter.truncate("abcdefghij", 2, keep="head") == "abcdefg"
+    assert counter.truncate("abcdefghij", 2, keep="tail") == "defghij"
+
+
+async def test_fit_prompt_trims_lowest_priority_first():
+    counter = TokenCounter()
+    sections = [
+        PromptSection("R" * 35),                                      # 10 tokens, required
+        PromptSection("H" * 70, priority=2, keep="tail", name="history"),  # 20
+        PromptSection("E" * 70, priority=1, name="entities"),             # 20
+    ]
+    text, tokens, trimmed = fit_prompt(sections, 50, counter)
+    assert (tokens, trimmed) == (50, []) and len(text) == 175
+
+    text, tokens, trimmed = fit_prompt(sections, 25, counter)
+    assert trimmed == ["entities", "history"]
+    assert text == "R" * 35 + "H" * 52 and tokens == 25
+
+    text, tokens, trimmed = fit_prompt(sections, 5, counter)
+    assert text == "R" * 35 and tokens == 10  # required text is never cut
+
+
+async def test_generate_enforces_profile_prompt_budget(mock_client):
+    prompts = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        prompts.append(json.loads(request.content)["prompt"])
+        return httpx.Response(200, json={"response": "ok", "done": True})
+
+    register_profile(GenerationProfile("tiny_prompt", num_predict=8, temperature=0,
+                                       max_prompt_tokens=20))
+    client = mock_client(handler)
+    llm = LLMService(client=client, cache=None)
+    await llm.generate([PromptSection("Answer: "), PromptSection("x" * 700, priority=1)],
+                       profile="tiny_prompt")
+
+    assert llm.tokens.count(prompts[0]) <= 20 and prompts[0].startswith("Answer: x")
+    stats = llm.profile_report()["tiny_prompt"]
+    assert stats["prompts_trimmed"] == 1 and stats["prompt_tokens"]["count"] == 1